@@ -1,69 +1,76 @@
+import os
+import sys
+
 import cv2
-from ultralytics import YOLO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, roi  # noqa: E402
+from Object_detection.detection_cache import DetectionCache  # noqa: E402
+from Object_detection.frame_gate import SceneChangeGate  # noqa: E402
+from Object_detection.phases import TurnaroundPhases, format_seconds  # noqa: E402
+from Object_detection.pipeline import VisionPipeline, format_stats  # noqa: E402
+from Object_detection.tracker import tracker_for  # noqa: E402
 
 # --- CONFIG ---
-video_path = 'turnaround clip.mp4'
-model = YOLO('best.pt')
-cap = cv2.VideoCapture(video_path)
-cap = cv2.VideoCapture(video_path)
+video_path = detector.VIDEO_PATH
+model = detector.load_model()
+rois = roi.load_rois(roi.camera_name(video_path))  # stand ROIs of this camera, None = full frame
+predict = roi.roi_predictor(model, rois) if rois else (lambda frames: detector.predict(model, frames))
 
-# Logic Variables
-phases = {
-    "DEBOARDING": False,
-    "CLEANING": False,
-    "BOARDING": False,
-    "LUGGAGE": False
-}
-cleaning_seen_count = 0
+# Phase engine (debounced, timestamped from the video PTS)
+phases = TurnaroundPhases()
+# Vehicle tracks (persistent IDs, dwell times); gated frames move the tracks by prediction
+tracker = tracker_for(model.names)
 
-cap = cv2.VideoCapture(video_path)
 print("Analyzing video... (Press 'q' to quit early)")
 
-while cap.isOpened():
-    success, frame = cap.read()
-    if not success: break
-
-    # Run AI
-    results = model(frame, verbose=False)
-    detected = []
-
-    # See what objects are in this frame
-    for box in results[0].boxes:
-        cls_id = int(box.cls[0])
-        label = model.names[cls_id]
-        detected.append(label)
+# Decode, inference and box drawing run on separate threads. Offline analysis must see every
+# frame, so the queues block (backpressure) instead of dropping frames, and frames are sent to
+# the model in batches of detector.BATCH_SIZE. Frames without a scene change reuse the last detections,
+# and frames analysed before with this model come from the detection cache instead of YOLO.
+pipeline = VisionPipeline(video_path, infer=predict,
+                          render=lambda packet: detector.annotate(packet["result"], packet["frame"], model.names),
+                          live=False,
+                          batch_size=detector.BATCH_SIZE, gate=SceneChangeGate(),
+                          cache=DetectionCache(video_path, model, rois=rois))
 
-    # --- THE LOGIC ---
-    # 1. Check for Cleaning Crew (The Sandwich Separator)
-    if "cleaning_crew_vehicle" in detected:
-        cleaning_seen_count += 1
-        phases["CLEANING"] = True
+with pipeline:
+    for packet in pipeline:
+        detected = detector.detected_labels(packet["result"], model.names)
+        if packet["reused"]:
+            tracker.predict(packet["pts"])
+        else:
+            xyxy, cls, _ = detector.boxes_of(packet["result"])
+            tracker.update(xyxy, cls, packet["pts"])
 
-    # 2. Check for Luggage
-    if "luggage_vehicle" in detected:
-        phases["LUGGAGE"] = True
+        # --- THE LOGIC ---
+        n_events = len(phases.events)
+        if phases.update(detected, packet["pts"]):
+            for pts, phase, event in phases.events[n_events:]:
+                print(f"[{format_seconds(pts)}] {phase} {event}")
 
-    # 3. Check for Bridge (Deboarding vs Boarding)
-    if "bridge_connected" in detected:
-        # If we haven't seen cleaning yet -> It's DEBOARDING
-        if cleaning_seen_count < 10:
-            phases["DEBOARDING"] = True
-        # If we HAVE seen cleaning (and it's gone or active) -> It's BOARDING
-        else:
-            phases["BOARDING"] = True
+        # Show the video with boxes
+        cv2.imshow('Turnaround AI', packet["image"])
+        if cv2.waitKey(1) & 0xFF == ord('q'): break
 
-    # Show the video with boxes
-    cv2.imshow('Turnaround AI', results[0].plot())
-    if cv2.waitKey(1) & 0xFF == ord('q'): break
+    stats = pipeline.stats()
 
-cap.release()
 cv2.destroyAllWindows()
 
 # --- FINAL REPORT ---
 print("\n" + "=" * 30)
 print("   TURNAROUND REPORT")
 print("=" * 30)
-print(f"✅ Deboarding Phase: {'DETECTED' if phases['DEBOARDING'] else 'Not Detected'}")
-print(f"✅ Cleaning Phase:   {'DETECTED' if phases['CLEANING'] else 'Not Detected'}")
-print(f"✅ Boarding Phase:   {'DETECTED' if phases['BOARDING'] else 'Not Detected'}")
-print(f"✅ Luggage Handling: {'DETECTED' if phases['LUGGAGE'] else 'Not Detected'}")
\ No newline at end of file
+for phase, info in phases.timeline().items():
+    if info["start"] is None:
+        print(f"⬜ {phase:<11} Not Detected")
+    else:
+        print(f"✅ {phase:<11} {format_seconds(info['start'])} – {format_seconds(info['end'])} "
+              f"({info['duration']:.0f}s, {info['intervals']} interval(s))")
+
+vehicles = tracker.vehicles()
+print(f"\n🚚 Vehicles: {', '.join(f'{n} {label}' for label, n in tracker.counts(model.names).items())}")
+for v in vehicles:
+    print(f"   #{v['id']:<3} {model.names[v['cls']]:<22} {format_seconds(v['first_seen'])} – "
+          f"{format_seconds(v['last_seen'])} (dwell {v['dwell_s']:.0f}s)")
+print(f"\n⏱️ {format_stats(stats)}")
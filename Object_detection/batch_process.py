@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Headless turnaround analysis for many clips.
+
+    python -m Object_detection.batch_process "/data/turnarounds/*.mp4" --out runs/batch --workers 4
+
+Each clip gets <name>.detections.jsonl (or .parquet) and <name>.phases.json in the output folder.
+The phases file is written last, so clips that already have one are skipped on the next run (resume).
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, roi  # noqa: E402
+from Object_detection.detection_cache import DetectionCache  # noqa: E402
+from Object_detection.frame_gate import SceneChangeGate  # noqa: E402
+from Object_detection.phases import TurnaroundPhases  # noqa: E402
+from Object_detection.pipeline import VisionPipeline  # noqa: E402
+
+# --- CONFIG ---
+OUTPUT_DIR = os.path.join(detector.BASE_DIR, 'runs', 'batch')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+OUTPUT_FORMATS = ('jsonl', 'parquet')
+
+
+# =========================================================
+# Inputs and outputs
+# =========================================================
+def find_videos(inputs):
+    """Expand directories and glob patterns into a sorted, de-duplicated list of video files."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = [os.path.join(item, f) for f in os.listdir(item)]
+        else:
+            matches = glob.glob(item, recursive=True)
+        paths.update(os.path.abspath(p) for p in matches if p.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(paths)
+
+
+def output_paths(video_path, out_dir, fmt):
+    name = os.path.splitext(os.path.basename(video_path))[0].replace(' ', '_')
+    return (os.path.join(out_dir, f"{name}.detections.{fmt}"), os.path.join(out_dir, f"{name}.phases.json"))
+
+
+def _write_detections(rows, path, fmt, names):
+    tmp_path = path + ".tmp"
+    if fmt == 'parquet':
+        import pandas as pd
+        # One row per box; frames without boxes are implied by the frame count in the phases file
+        records = [{"frame": r["frame"], "pts": r["pts"], "reused": r["reused"], "cls": int(c),
+                    "label": names[int(c)], "conf": float(conf), "x1": float(b[0]), "y1": float(b[1]),
+                    "x2": float(b[2]), "y2": float(b[3])}
+                   for r in rows for b, c, conf in zip(r["xyxy"], r["cls"], r["conf"])]
+        pd.DataFrame.from_records(records, columns=["frame", "pts", "reused", "cls", "label", "conf",
+                                                    "x1", "y1", "x2", "y2"]).to_parquet(tmp_path, index=False)
+    else:
+        with open(tmp_path, 'w') as f:
+            for r in rows:
+                boxes = [[round(float(v), 1) for v in b] + [int(c), round(float(conf), 4)]
+                         for b, c, conf in zip(r["xyxy"], r["cls"], r["conf"])]
+                f.write(json.dumps({"frame": r["frame"], "pts": round(r["pts"], 3), "reused": r["reused"],
+                                    "boxes": boxes}) + "\n")
+    os.replace(tmp_path, path)
+
+
+# =========================================================
+# Worker side (one model per process, loaded once)
+# =========================================================
+_WORKER = {}
+
+
+def _init_worker(runtime, threads):
+    # Cores are shared between workers instead of every worker spawning one thread per core
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    threadpool_limits(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _WORKER['model'] = detector.load_model(runtime=runtime)
+
+
+def detect_frames(video_path, batch_size=detector.BATCH_SIZE, use_gate=True, start_frame=0, end_frame=None,
+                  use_cache=True):
+    """
+    Detection rows (frame, pts, reused, xyxy, cls, conf) for a clip or one segment of it, in frame order,
+    and the number of frames YOLO actually ran on. Frames in the detection cache are not inferred again.
+    """
+    model = _WORKER['model']
+    rois = roi.load_rois(roi.camera_name(video_path))
+    predict = roi.roi_predictor(model, rois, max_batch=batch_size) if rois else (
+        lambda frames: detector.predict(model, frames))
+    rows = []
+    pipeline = VisionPipeline(video_path, infer=predict, live=False,
+                              batch_size=batch_size, gate=SceneChangeGate() if use_gate else None,
+                              start_frame=start_frame, end_frame=end_frame,
+                              cache=DetectionCache(video_path, model, rois=rois) if use_cache else None)
+    with pipeline:
+        for packet in pipeline:
+            xyxy, cls, conf = detector.boxes_of(packet["result"])
+            rows.append({"frame": packet["index"], "pts": packet["pts"], "reused": packet["reused"],
+                         "xyxy": xyxy, "cls": cls, "conf": conf})
+        stats = pipeline.stats()
+    return rows, stats.get("gate", {}).get("inferences", len(rows)) - stats.get("cache", {}).get("hits", 0)
+
+
+def save_outputs(video_path, rows, out_dir, fmt, names, **extra):
+    """Run the phase engine over the (ordered) rows and write the detection log and phases file."""
+    detections_path, phases_path = output_paths(video_path, out_dir, fmt)
+    phases = TurnaroundPhases()
+    for r in rows:
+        phases.update([names[int(c)] for c in r["cls"]], r["pts"])
+    _write_detections(rows, detections_path, fmt, names)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    cap.release()
+    summary = {"video": video_path, "frames": len(rows), "video_s": len(rows) / fps if fps else None, **extra,
+               "timeline": phases.timeline(), "events": phases.events}
+    tmp_path = phases_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, phases_path)  # written last: marks the clip as done
+    return summary
+
+
+def process_clip(video_path, out_dir, fmt='jsonl', batch_size=detector.BATCH_SIZE, use_gate=True, use_cache=True):
+    t0 = time.perf_counter()
+    model = _WORKER['model']
+    rows, inferences = detect_frames(video_path, batch_size, use_gate, use_cache=use_cache)
+    return save_outputs(video_path, rows, out_dir, fmt, model.names,
+                        processing_s=time.perf_counter() - t0,
+                        inferences_saved=1 - inferences / len(rows) if rows else 0.0, runtime=model.runtime)
+
+
+# =========================================================
+# Driver
+# =========================================================
+def run(inputs, out_dir=OUTPUT_DIR, workers=2, fmt='jsonl', batch_size=detector.BATCH_SIZE, use_gate=True,
+        runtime=detector.RUNTIME, resume=True, use_cache=True):
+    videos = find_videos(inputs)
+    os.makedirs(out_dir, exist_ok=True)
+    names = [output_paths(v, out_dir, fmt)[1] for v in videos]
+    if len(set(names)) != len(names):
+        raise ValueError("Several input videos share a file name; give them separate output folders.")
+
+    todo = [v for v in videos if not (resume and os.path.exists(output_paths(v, out_dir, fmt)[1]))]
+    print(f"{len(videos)} videos found, {len(videos) - len(todo)} already done, {len(todo)} to process "
+          f"on {workers} worker(s)")
+    if not todo:
+        return []
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    t0 = time.perf_counter()
+    summaries, failed = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(runtime, threads)) as pool:
+        futures = {pool.submit(process_clip, v, out_dir, fmt, batch_size, use_gate, use_cache): v for v in todo}
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                s = future.result()
+            except Exception as e:
+                failed.append(video)
+                print(f"❌ {os.path.basename(video)}: {e}")
+                continue
+            summaries.append(s)
+            print(f"✅ {os.path.basename(video)}: {s['frames']:,} frames in {s['processing_s']:.1f}s "
+                  f"({s['frames'] / s['processing_s']:.1f} frames/s, {s['inferences_saved']:.0%} inferences saved)")
+
+    elapsed = time.perf_counter() - t0
+    frames = sum(s['frames'] for s in summaries)
+    video_s = sum(s['video_s'] or 0 for s in summaries)
+    print(f"\n⏱️ {len(summaries)} clips ({len(failed)} failed) | {frames:,} frames in {elapsed:.1f}s | "
+          f"{frames / elapsed:.1f} frames/s | {video_s / elapsed:.1f}x real time")
+    return summaries
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless turnaround phase analysis for a set of videos.")
+    parser.add_argument("inputs", nargs="+", help="video files, directories or glob patterns")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="output folder")
+    parser.add_argument("--workers", type=int, default=2, help="processes, each with its own model")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='jsonl', help="detection log format")
+    parser.add_argument("--batch-size", type=int, default=detector.BATCH_SIZE)
+    parser.add_argument("--no-gate", action="store_true", help="run the detector on every frame")
+    parser.add_argument("--runtime", choices=["auto", *detector.RUNTIMES], default=detector.RUNTIME)
+    parser.add_argument("--no-resume", action="store_true", help="reprocess clips that already have outputs")
+    parser.add_argument("--no-cache", action="store_true", help="run YOLO even on frames in the detection cache")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.inputs, out_dir=args.out, workers=args.workers, fmt=args.format, batch_size=args.batch_size,
+        use_gate=not args.no_gate, runtime=args.runtime, resume=not args.no_resume,
+        use_cache=not args.no_cache)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Index and validate a YOLO dataset (images/<split>/*.jpg + labels/<split>/*.txt).
+
+    python -m Object_detection.dataset_index [dataset_dir] [--workers 8] [--full] [--strict] [--require-labels]
+
+Every image and label file is scanned in parallel: content checksum and size of each image (read from the
+file header, no decoding), and per-class box counts and format problems of each label file. The result is
+stored as <dataset>/manifest.parquet. On the next run only files whose size or mtime changed are read
+again, so re-indexing an unchanged dataset costs one directory listing.
+
+Checked for every image / label pair:
+    missing_label     image without a label file (a warning: YOLO trains on it as background, unless
+                      --require-labels makes it an error)
+    empty_label       label file without boxes (fine for true negatives, usually a forgotten export)
+    orphan_label      label file without an image
+    malformed_line    a line that is not "class cx cy w h" (or a polygon)
+    out_of_range      a coordinate outside [0, 1] or a box without area
+    unknown_class     a class id that is not in data.yaml
+    train_val_overlap the same image content in train and val
+    unreadable_image  no image size could be read
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+
+# --- CONFIG ---
+DATASET_DIR = os.path.dirname(detector.DATA_YAML)
+MANIFEST_NAME = 'manifest.parquet'
+SPLITS = ('train', 'val')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+CHUNK_SIZE = 512  # files per worker task
+ERRORS = ('orphan_label', 'malformed_line', 'out_of_range', 'unknown_class', 'train_val_overlap', 'unreadable_image')
+WARNINGS = ('missing_label', 'empty_label')
+
+
+def class_names(dataset_dir):
+    """Class names from the dataset's data.yaml, else the detector's CLASSES."""
+    try:
+        import yaml
+        with open(os.path.join(dataset_dir, 'data.yaml'), 'r') as f:
+            names = yaml.safe_load(f)['names']
+        return [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names)
+    except (ImportError, OSError, KeyError, TypeError):
+        return list(detector.CLASSES)
+
+
+# =========================================================
+# Per-file work (runs in the worker processes)
+# =========================================================
+def image_size(data):
+    """(width, height) from a PNG / JPEG header; other formats (or odd files) are decoded with OpenCV."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', data[16:24])
+    if data[:2] == b'\xff\xd8':
+        pos = 2
+        while pos + 4 <= len(data) and data[pos] == 0xFF:
+            marker = data[pos + 1]
+            if marker in (0xD8, 0x01, 0xFF) or 0xD0 <= marker <= 0xD7:
+                pos += 1 if marker == 0xFF else 2
+                continue
+            # SOF0..SOF15 carry the frame size, except DHT (C4), JPG (C8) and DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+    import cv2
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    return (image.shape[1], image.shape[0]) if image is not None else (-1, -1)
+
+
+def _scan_image(path):
+    # Dataset images are small: one read serves both the checksum and the header
+    with open(path, 'rb') as f:
+        data = f.read()
+    width, height = image_size(data)
+    return {"sha": hashlib.blake2b(data, digest_size=16).hexdigest(), "width": width, "height": height}
+
+
+def _scan_label(path, n_classes):
+    counts = [0] * n_classes
+    issues = set()
+    n_boxes = 0
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            try:
+                cls = int(parts[0])
+                coords = [float(v) for v in parts[1:]]
+            except ValueError:
+                issues.add('malformed_line')
+                continue
+            # Boxes are "cx cy w h"; segmentation labels are polygons of x y pairs
+            if len(coords) < 4 or (len(coords) > 4 and len(coords) % 2):
+                issues.add('malformed_line')
+                continue
+            if min(coords) < 0 or max(coords) > 1 or (len(coords) == 4 and (coords[2] <= 0 or coords[3] <= 0)):
+                issues.add('out_of_range')
+            if 0 <= cls < n_classes:
+                counts[cls] += 1
+            else:
+                issues.add('unknown_class')
+            n_boxes += 1
+    if not n_boxes and not issues:
+        issues.add('empty_label')
+    return {"n_boxes": n_boxes, "class_counts": counts, "label_issues": sorted(issues)}
+
+
+def _scan_chunk(tasks, n_classes):
+    """[(kind, path)] -> [result dict], kind is 'image' or 'label'."""
+    return [_scan_image(path) if kind == 'image' else _scan_label(path, n_classes) for kind, path in tasks]
+
+
+# =========================================================
+# Listing and incremental scan
+# =========================================================
+def _list_files(folder, extensions, kind):
+    """DataFrame of stem, <kind> file name, <kind>_size and <kind>_mtime for the matching files in one folder."""
+    names, sizes, mtimes = [], [], []
+    if os.path.isdir(folder):
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    names.append(entry.name)
+                    sizes.append(stat.st_size)
+                    mtimes.append(stat.st_mtime_ns)
+    return pd.DataFrame({"stem": [n.rpartition('.')[0] for n in names], kind: names,
+                         f"{kind}_size": np.asarray(sizes, np.int64), f"{kind}_mtime": np.asarray(mtimes, np.int64)})
+
+
+def list_dataset(dataset_dir):
+    """One row per image or orphan label: split, stem, image / label file names, sizes and mtimes (-1: no file)."""
+    frames = []
+    for split in SPLITS:
+        images = _list_files(os.path.join(dataset_dir, 'images', split), IMAGE_EXTENSIONS, 'image')
+        labels = _list_files(os.path.join(dataset_dir, 'labels', split), ('.txt',), 'label')
+        frames.append(images.merge(labels, on="stem", how="outer").assign(split=split))
+    listing = pd.concat(frames, ignore_index=True)
+    stats = ["image_size", "image_mtime", "label_size", "label_mtime"]
+    listing[stats] = listing[stats].fillna(-1).astype(np.int64)
+    return listing.sort_values(["split", "stem"], ignore_index=True)[
+        ["split", "stem", "image", *stats[:2], "label", *stats[2:]]]
+
+
+def _reuse(listing, previous, stat_columns, value_columns):
+    """Value columns from the previous manifest where the file's stats are unchanged; a mask of rows to re-scan."""
+    keys = ["split", "stem", *stat_columns]
+    if previous is None or not set(value_columns) <= set(previous.columns):
+        merged = listing.assign(**{c: None for c in value_columns})
+        return merged, np.ones(len(listing), bool)
+    merged = listing.merge(previous[keys + value_columns], on=keys, how='left')
+    return merged, merged[value_columns[0]].isna().to_numpy().copy()
+
+
+def build_index(dataset_dir=DATASET_DIR, workers=None, full=False):
+    """Manifest DataFrame of the dataset, re-using unchanged entries of the previous manifest unless full=True."""
+    names = class_names(dataset_dir)
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    previous = None
+    if not full and os.path.exists(manifest_path):
+        previous = pd.read_parquet(manifest_path)
+        if previous.attrs.get("classes") not in (None, names) or "class_counts" not in previous.columns:
+            previous = None  # class list changed: label counts must be redone
+
+    listing = list_dataset(dataset_dir)
+    index, rescan_images = _reuse(listing, previous, ["image", "image_size", "image_mtime"], ["sha", "width", "height"])
+    index, rescan_labels = _reuse(index, previous, ["label", "label_size", "label_mtime"],
+                                  ["n_boxes", "class_counts", "label_issues"])
+    rescan_images &= index["image"].notna().to_numpy()
+    rescan_labels &= index["label"].notna().to_numpy()
+
+    tasks = [('image', os.path.join(dataset_dir, 'images', r.split, r.image))
+             for r in index[rescan_images].itertuples()]
+    tasks += [('label', os.path.join(dataset_dir, 'labels', r.split, r.label))
+              for r in index[rescan_labels].itertuples()]
+    chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+    results = []
+    if len(chunks) > 1 and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(_scan_chunk, chunks, [len(names)] * len(chunks)):
+                results.extend(chunk_results)
+    else:
+        for chunk in chunks:
+            results.extend(_scan_chunk(chunk, len(names)))
+
+    n_images = int(rescan_images.sum())
+    index = index.astype({c: object for c in ["sha", "width", "height", "n_boxes", "class_counts", "label_issues"]})
+    for column in ["sha", "width", "height"]:
+        index.loc[rescan_images, column] = pd.Series([r[column] for r in results[:n_images]],
+                                                     index=index.index[rescan_images], dtype=object)
+    for column in ["n_boxes", "class_counts", "label_issues"]:
+        index.loc[rescan_labels, column] = pd.Series([r[column] for r in results[n_images:]],
+                                                     index=index.index[rescan_labels], dtype=object)
+    index.attrs["classes"] = names
+    index.attrs["rescanned"] = len(tasks)
+    return index
+
+
+def validate(index):
+    """{issue: DataFrame of the affected rows}, including the checks that need the whole dataset."""
+    issues = {}
+    has_image, has_label = index["image"].notna(), index["label"].notna()
+    issues["missing_label"] = index[has_image & ~has_label]
+    issues["orphan_label"] = index[has_label & ~has_image]
+    issues["unreadable_image"] = index[has_image & (index["width"].fillna(-1).astype(int) <= 0)]
+    label_issues = index["label_issues"].dropna().explode().dropna()
+    for issue in ("malformed_line", "out_of_range", "unknown_class", "empty_label"):
+        issues[issue] = index.loc[label_issues.index[label_issues == issue]]
+
+    train_sha = set(index.loc[(index["split"] == "train") & has_image, "sha"])
+    issues["train_val_overlap"] = index[(index["split"] == "val") & index["sha"].isin(train_sha)]
+    return {issue: rows for issue, rows in issues.items() if len(rows)}
+
+
+def class_box_counts(index, names):
+    """{split: {class name: boxes}}."""
+    counts = {}
+    for split in SPLITS:
+        rows = index.loc[(index["split"] == split) & index["class_counts"].notna(), "class_counts"]
+        totals = np.sum(np.stack([np.asarray(c) for c in rows]), axis=0) if len(rows) else np.zeros(len(names), int)
+        counts[split] = {name: int(n) for name, n in zip(names, totals)}
+    return counts
+
+
+def save_manifest(index, dataset_dir=DATASET_DIR):
+    path = os.path.join(dataset_dir, MANIFEST_NAME)
+    table = index.copy()
+    table["width"] = table["width"].astype("Int64")
+    table["height"] = table["height"].astype("Int64")
+    table["n_boxes"] = table["n_boxes"].astype("Int64")
+    table.attrs = {"classes": index.attrs["classes"]}
+    tmp_path = path + ".tmp"
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def main(dataset_dir=DATASET_DIR, workers=None, full=False, strict=False, require_labels=False, examples=5):
+    t0 = time.perf_counter()
+    names = class_names(dataset_dir)
+    index = build_index(dataset_dir, workers, full)
+    save_manifest(index, dataset_dir)
+    elapsed = time.perf_counter() - t0
+
+    print(f"🔎 {dataset_dir}: {int(index['image'].notna().sum()):,} images, {int(index['label'].notna().sum()):,} "
+          f"label files ({index.attrs['rescanned']:,} files read, the rest unchanged) in {elapsed:.2f}s")
+    for split, counts in class_box_counts(index, names).items():
+        n_images = int(((index["split"] == split) & index["image"].notna()).sum())
+        print(f"   {split:<5} {n_images:>7,} images | " + " | ".join(f"{name} {n:,}" for name, n in counts.items()))
+
+    issues = validate(index)
+    errors = ERRORS + (('missing_label',) if require_labels else ())
+    if not issues:
+        print("✅ All image / label pairs are valid.")
+    for issue, rows in issues.items():
+        icon = "❌" if issue in errors else "⚠️"
+        shown = ", ".join(f"{r.split}/{r.image if pd.notna(r.image) else r.label}"
+                          for r in rows.head(examples).itertuples())
+        print(f"{icon} {issue}: {len(rows):,} ({shown}{', ...' if len(rows) > examples else ''})")
+
+    if "missing_label" in issues and not require_labels:
+        print(f"   {len(issues['missing_label']):,} image(s) without labels are trained as background (no objects).")
+    n_errors = sum(len(rows) for issue, rows in issues.items() if issue in errors)
+    if strict and n_errors:
+        sys.exit(1)
+    return index, issues
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index and validate a YOLO dataset.")
+    parser.add_argument("dataset", nargs="?", default=DATASET_DIR, help="folder with images/ and labels/")
+    parser.add_argument("--workers", type=int, default=None, help="scanning processes (default: one per core)")
+    parser.add_argument("--full", action="store_true", help="re-read every file instead of only changed ones")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 if any error was found")
+    parser.add_argument("--require-labels", action="store_true",
+                        help="count images without a label file as errors instead of background images")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.dataset, args.workers, args.full, args.strict, args.require_labels)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Persistent detection cache, so a video is only run through YOLO once per model.
+
+    python -m Object_detection.detection_cache "turnaround clip.mp4"   # phase timeline from the cache, no decoding
+
+Entries are keyed by the video's content hash, the model weights' hash and the inference settings
+(decode size, stand ROIs, input size, decoder backend); inside an entry detections are looked up by
+frame index.
+Each entry is a folder of append-only parts, one per flush, in a columnar layout of .npy files that
+are memory-mapped on load:
+
+    frames (F,) int64   pts (F,) float64   inferred (F,) bool   offsets (F+1,) int64
+    xyxy (B, 4) float32   cls (B,) int16   conf (B,) float32
+
+Frame i's boxes are rows offsets[i]:offsets[i+1]. Frames that reused the previous detections (scene-change
+gate) are stored with inferred=False and no boxes, so the phase logic can be replayed from the cache alone.
+Parts are written to a temporary folder and renamed into place, so several processes (segment_process)
+can fill the same entry without locking.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, roi  # noqa: E402
+from Object_detection.phases import TurnaroundPhases, format_seconds  # noqa: E402
+from Object_detection.video_source import resolve_backend  # noqa: E402
+
+# --- CONFIG ---
+CACHE_DIR = os.path.join(detector.BASE_DIR, 'runs', 'detection_cache')
+HASH_INDEX_PATH = os.path.join(CACHE_DIR, 'hashes.json')
+HASH_CHUNK = 1 << 20
+FLUSH_EVERY = 500  # new frames kept in memory before they are written out as a part
+MAX_PARTS = 16  # more parts than this are compacted into one on load
+COLUMNS = ('frames', 'pts', 'inferred', 'offsets', 'xyxy', 'cls', 'conf')
+
+_HASHES = {}
+
+
+# =========================================================
+# Content hashes (remembered by path, size and mtime)
+# =========================================================
+def _load_hash_index():
+    if not _HASHES and os.path.exists(HASH_INDEX_PATH):
+        try:
+            with open(HASH_INDEX_PATH, 'r') as f:
+                _HASHES.update(json.load(f))
+        except ValueError:
+            pass
+    return _HASHES
+
+
+def file_hash(path):
+    """BLAKE2b of a file's content (or of every file in a model folder), computed once per file version."""
+    path = os.path.abspath(path)
+    files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names) \
+        if os.path.isdir(path) else [path]
+    stamp = [[os.path.relpath(f, path), os.path.getsize(f), os.stat(f).st_mtime_ns] for f in files]
+
+    index = _load_hash_index()
+    known = index.get(path)
+    if known is not None and known["stamp"] == stamp:
+        return known["hash"]
+
+    digest = hashlib.blake2b(digest_size=16)
+    for f in files:
+        with open(f, 'rb') as fh:
+            while chunk := fh.read(HASH_CHUNK):
+                digest.update(chunk)
+    index[path] = {"stamp": stamp, "hash": digest.hexdigest()}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = HASH_INDEX_PATH + f".{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, HASH_INDEX_PATH)
+    return index[path]["hash"]
+
+
+def model_fingerprint(model):
+    """Hash of the weights the model was loaded from (detector.load_model records the path)."""
+    weights_path = getattr(model, 'weights_path', None)
+    if weights_path is None or not os.path.exists(weights_path):
+        raise ValueError("The model has no weights file to fingerprint; load it with detector.load_model().")
+    return file_hash(weights_path)
+
+
+def cache_key(video_path, model, decode_size=None, rois=None, imgsz=detector.INFERENCE_SIZE, decode_backend='auto'):
+    # The decoders may differ in pixels and frame numbering, so each one gets its own entry
+    settings = json.dumps({"decode_size": decode_size, "rois": rois, "imgsz": imgsz,
+                           "decode_backend": resolve_backend(decode_backend)}, sort_keys=True)
+    return (f"{file_hash(video_path)}/{model_fingerprint(model)}-"
+            f"{hashlib.blake2b(settings.encode(), digest_size=4).hexdigest()}")
+
+
+# =========================================================
+# Cache entry of one (video, model, settings)
+# =========================================================
+def _write_part(entry_dir, columns):
+    tmp_dir = os.path.join(entry_dir, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+    for name in COLUMNS:
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), columns[name])
+    # Part names sort by creation time; newer parts win when frames overlap
+    os.rename(tmp_dir, os.path.join(entry_dir, f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:6]}"))
+
+
+def _concat(parts):
+    """One set of columns from several parts, each frame once (the newest part wins), sorted by frame."""
+    frames = np.concatenate([p['frames'] for p in parts])
+    # Newest first, so np.unique's first occurrence is the newest entry of every frame
+    order = np.argsort(-np.repeat(np.arange(len(parts)), [len(p['frames']) for p in parts]), kind='stable')
+    _, first = np.unique(frames[order], return_index=True)
+    keep = order[first]
+
+    starts = np.concatenate([p['offsets'][:-1] + base for p, base in
+                             zip(parts, np.cumsum([0] + [len(p['cls']) for p in parts[:-1]]))])
+    counts = np.concatenate([np.diff(p['offsets']) for p in parts])[keep]
+    rows = np.concatenate([np.arange(s, s + n) for s, n in zip(starts[keep], counts)]) if counts.sum() else \
+        np.zeros(0, np.int64)
+    return {"frames": frames[keep], "pts": np.concatenate([p['pts'] for p in parts])[keep],
+            "inferred": np.concatenate([p['inferred'] for p in parts])[keep],
+            "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            "xyxy": np.concatenate([p['xyxy'] for p in parts])[rows].reshape(-1, 4),
+            "cls": np.concatenate([p['cls'] for p in parts])[rows],
+            "conf": np.concatenate([p['conf'] for p in parts])[rows]}
+
+
+class DetectionCache:
+    """
+    Cached detections of one video for one model and inference settings (see cache_key()).
+
+    get(index) returns the cached Detections of an inferred frame (None on a miss); put() records a
+    processed frame, flush() writes new frames to disk (also every FLUSH_EVERY frames).
+    """
+
+    def __init__(self, video_path, model, decode_size=None, rois=None, cache_dir=CACHE_DIR, decode_backend='auto'):
+        self.video_path = video_path
+        self.decode_backend = resolve_backend(decode_backend)
+        self.entry_dir = os.path.join(cache_dir, cache_key(video_path, model, decode_size, rois,
+                                                           decode_backend=self.decode_backend))
+        os.makedirs(self.entry_dir, exist_ok=True)
+        self.new = {}
+        self.hits = 0
+        self.misses = 0
+        self.reload()
+
+    @classmethod
+    def for_source(cls, source, model, decode_size=None, rois=None):
+        """A cache for video files; None for cameras / streams (nothing to replay)."""
+        return cls(source, model, decode_size, rois) if isinstance(source, str) and os.path.isfile(source) else None
+
+    # --- reading ---
+    def _part_dirs(self):
+        return sorted(os.path.join(self.entry_dir, d) for d in os.listdir(self.entry_dir) if d.startswith("part-"))
+
+    def reload(self):
+        """Memory-map the parts on disk (picks up parts written by other processes)."""
+        part_dirs = self._part_dirs()
+        if len(part_dirs) > MAX_PARTS:
+            self.compact()
+            part_dirs = self._part_dirs()
+        parts = []
+        for d in part_dirs:
+            try:
+                parts.append({name: np.load(os.path.join(d, f"{name}.npy"), mmap_mode='r') for name in COLUMNS})
+            except FileNotFoundError:
+                pass  # compacted away by another process meanwhile; its merged part is in the listing again
+        if len(parts) < len(part_dirs):
+            parts = [{name: np.load(os.path.join(d, f"{name}.npy"), mmap_mode='r') for name in COLUMNS}
+                     for d in self._part_dirs()]
+        self.parts = parts
+
+    def compact(self):
+        """Merge all parts into one. Parts written meanwhile are left alone."""
+        part_dirs = self._part_dirs()
+        if len(part_dirs) < 2:
+            return
+        parts = [{name: np.load(os.path.join(d, f"{name}.npy")) for name in COLUMNS} for d in part_dirs]
+        _write_part(self.entry_dir, _concat(parts))
+        for d in part_dirs:
+            shutil.rmtree(d, ignore_errors=True)
+
+    def _lookup(self, index):
+        for part in reversed(self.parts):
+            i = np.searchsorted(part['frames'], index)
+            if i < len(part['frames']) and part['frames'][i] == index:
+                return part, i
+        return None, None
+
+    def get(self, index):
+        if index in self.new:
+            entry = self.new[index]
+            if entry["inferred"]:
+                self.hits += 1
+                return detector.Detections(entry["xyxy"], entry["cls"], entry["conf"])
+            self.misses += 1
+            return None
+        part, i = self._lookup(index)
+        if part is None or not part['inferred'][i]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        lo, hi = part['offsets'][i], part['offsets'][i + 1]
+        return detector.Detections(np.asarray(part['xyxy'][lo:hi]), part['cls'][lo:hi].astype(np.int64),
+                                   np.asarray(part['conf'][lo:hi]))
+
+    def columns(self):
+        """All cached frames as one set of columns (sorted by frame), including frames not flushed yet."""
+        parts = [{name: np.asarray(p[name]) for name in COLUMNS} for p in self.parts]
+        if self.new:
+            parts.append(self._new_columns())
+        if not parts:
+            return self._new_columns()
+        return _concat(parts) if len(parts) > 1 else parts[0]
+
+    def __len__(self):
+        return len(self.columns()['frames'])
+
+    # --- writing ---
+    def put(self, index, pts, result=None):
+        """Record a processed frame: its result if it was inferred, None if it reused the previous one."""
+        if result is None:
+            if index not in self.new and self._lookup(index)[0] is None:
+                self.new[index] = {"pts": pts, "inferred": False}
+        else:
+            xyxy, cls, conf = detector.boxes_of(result)
+            self.new[index] = {"pts": pts, "inferred": True, "xyxy": xyxy, "cls": cls, "conf": conf}
+        if len(self.new) >= FLUSH_EVERY:
+            self.flush()
+
+    def _new_columns(self):
+        frames = sorted(self.new)
+        entries = [self.new[f] for f in frames]
+        boxed = [e for e in entries if e["inferred"]]
+        counts = [len(e["cls"]) if e["inferred"] else 0 for e in entries]
+        return {"frames": np.asarray(frames, np.int64),
+                "pts": np.asarray([e["pts"] for e in entries], np.float64),
+                "inferred": np.asarray([e["inferred"] for e in entries], bool),
+                "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+                "xyxy": np.concatenate([e["xyxy"] for e in boxed] or [np.zeros((0, 4))]).astype(np.float32),
+                "cls": np.concatenate([e["cls"] for e in boxed] or [np.zeros(0)]).astype(np.int16),
+                "conf": np.concatenate([e["conf"] for e in boxed] or [np.zeros(0)]).astype(np.float32)}
+
+    def flush(self):
+        if not self.new:
+            return
+        _write_part(self.entry_dir, self._new_columns())
+        self.new = {}
+        self.reload()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# =========================================================
+# Offline replay (no decoding, no inference)
+# =========================================================
+def replay_phases(cache, names):
+    """Phase engine over the cached frames; frames that reused detections carry the previous labels forward."""
+    columns = cache.columns()
+    labels_by_box = np.asarray([names[int(c)] for c in columns['cls']], dtype=object)
+    offsets, inferred = columns['offsets'], columns['inferred']
+    phases = TurnaroundPhases()
+    labels = []
+    for i, pts in enumerate(columns['pts'].tolist()):
+        if inferred[i]:
+            labels = labels_by_box[offsets[i]:offsets[i + 1]].tolist()
+        phases.update(labels, pts)
+    return phases
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay the turnaround phase logic from cached detections.")
+    parser.add_argument("video", nargs="?", default=detector.VIDEO_PATH)
+    parser.add_argument("--decode-size", type=int, default=None,
+                        help="decode width the detections were made at (the vision page uses 640)")
+    parser.add_argument("--runtime", choices=["auto", *detector.RUNTIMES], default=detector.RUNTIME)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    model = detector.load_model(runtime=args.runtime)
+    rois = roi.load_rois(roi.camera_name(args.video))
+    cache = DetectionCache(args.video, model, None if rois else args.decode_size, rois)
+    if not len(cache):
+        sys.exit(f"No cached detections for {args.video} with this model and settings; "
+                 f"run analysis.py or batch_process.py first.")
+
+    t0 = time.perf_counter()
+    phases = replay_phases(cache, model.names)
+    elapsed = time.perf_counter() - t0
+    for p, info in phases.timeline().items():
+        times = f"{format_seconds(info['start'])}–{format_seconds(info['end'])}" if info["start"] is not None else ""
+        print(f"{p:<12} {info['status']:<8} {times}")
+    print(f"\n⏱️ {len(cache):,} cached frames replayed in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+import importlib.util
+import json
+import os
+
+import cv2
+import numpy as np
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEIGHTS_PATH = os.path.join(BASE_DIR, 'best.pt')
+VIDEO_PATH = os.path.join(BASE_DIR, 'turnaround clip.mp4')
+DATA_YAML = os.path.join(BASE_DIR, 'dataset', 'data.yaml')
+CLASSES = ['bridge_connected', 'cleaning_crew_vehicle', 'luggage_vehicle']
+DISPLAY_WIDTH = 640
+INFERENCE_SIZE = 640
+BATCH_SIZE = 8  # frames per inference call in offline analysis
+BOX_COLORS = np.array([(0, 200, 255), (255, 160, 0), (80, 220, 80)], np.uint8)  # BGR, by class id
+BOX_THICKNESS = 2
+
+# Inference runtimes, fastest first on a CPU-only server. Exported models are created by export_model.py;
+# a runtime is available when its model exists and its Python package is installed.
+RUNTIMES = {
+    'openvino_int8': {'path': os.path.join(BASE_DIR, 'best_int8_openvino_model'), 'requires': 'openvino'},
+    'onnx_int8': {'path': os.path.join(BASE_DIR, 'best_int8.onnx'), 'requires': 'onnxruntime'},
+    'openvino': {'path': os.path.join(BASE_DIR, 'best_openvino_model'), 'requires': 'openvino'},
+    'onnx': {'path': os.path.join(BASE_DIR, 'best.onnx'), 'requires': 'onnxruntime'},
+    'pytorch': {'path': WEIGHTS_PATH, 'requires': 'torch'},
+}
+RUNTIME = os.environ.get('VISION_RUNTIME', 'auto')
+RUNTIME_REPORT_PATH = os.path.join(BASE_DIR, 'runtime_report.json')
+BASELINE_RUNTIME = 'pytorch'  # FP32 reference for the INT8 accuracy check
+MAX_INT8_MAP_DROP = float(os.environ.get('VISION_MAX_INT8_MAP_DROP', 0.01))  # mAP50 an INT8 model may lose
+
+
+# =========================================================
+# Runtime selection
+# =========================================================
+def available_runtimes():
+    return [name for name, spec in RUNTIMES.items()
+            if os.path.exists(spec['path']) and importlib.util.find_spec(spec['requires']) is not None]
+
+
+def is_int8(runtime):
+    return runtime.endswith('_int8')
+
+
+def load_runtime_report(path=RUNTIME_REPORT_PATH):
+    """{runtime: report row} from export_model.py's report, or {} without one."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return {row['runtime']: row for row in json.load(f)['runtimes']}
+
+
+def int8_within_tolerance(measured, runtime, max_drop=MAX_INT8_MAP_DROP):
+    """An INT8 runtime qualifies when its mAP50 is at most max_drop below the FP32 baseline's in the report."""
+    baseline = measured.get(BASELINE_RUNTIME) or max(
+        (row for name, row in measured.items() if not is_int8(name)), key=lambda row: row['map50'], default=None)
+    row = measured.get(runtime)
+    if baseline is None or row is None or row.get('map50') is None:
+        return False
+    if row.get('model_mtime_ns') != os.stat(RUNTIMES[runtime]['path']).st_mtime_ns:
+        return False  # re-exported since it was measured
+    return baseline['map50'] - row['map50'] <= max_drop
+
+
+def select_runtime(runtime=RUNTIME, report_path=RUNTIME_REPORT_PATH, max_int8_drop=MAX_INT8_MAP_DROP):
+    """
+    'auto' picks the available runtime with the lowest measured ms/frame in the runtime report
+    (export_model.py), where INT8 runtimes only qualify within max_int8_drop mAP50 of the FP32 baseline.
+    Without a report it takes the first available FP32 runtime in RUNTIMES order.
+    """
+    available = available_runtimes()
+    if runtime != 'auto':
+        if runtime not in available:
+            raise ValueError(f"Runtime '{runtime}' is not available (available: {available})")
+        return runtime
+    if not available:
+        raise FileNotFoundError(f"No model weights found for any runtime (expected {WEIGHTS_PATH})")
+
+    measured = load_runtime_report(report_path)
+    timed = [name for name in available if name in measured
+             and (not is_int8(name) or int8_within_tolerance(measured, name, max_int8_drop))]
+    if timed:
+        return min(timed, key=lambda name: measured[name]['ms_per_frame'])
+    fp32 = [name for name in available if not is_int8(name)]
+    if not fp32:
+        raise FileNotFoundError("Only INT8 models are available and none passed the accuracy check; run "
+                                "export_model.py with best.pt present, or set VISION_RUNTIME explicitly.")
+    return fp32[0]
+
+
+def load_model(weights_path=None, runtime=RUNTIME):
+    """Load an explicit weights file, or the model of the selected runtime (model.runtime says which)."""
+    from ultralytics import YOLO
+    if weights_path is None:
+        runtime = select_runtime(runtime)
+        weights_path = RUNTIMES[runtime]['path']
+    else:
+        runtime = next((name for name, spec in RUNTIMES.items()
+                        if os.path.abspath(spec['path']) == os.path.abspath(weights_path)), 'custom')
+    model = YOLO(weights_path, task='detect')
+    model.runtime = runtime
+    model.weights_path = weights_path  # fingerprinted by the detection cache
+    return model
+
+
+def predict(model, frames):
+    """One inference call for a list of frames; results come back in input order."""
+    return model(frames, verbose=False) if frames else []
+
+
+class Detections:
+    """Plain NumPy detections of one frame, for results that do not come straight from Ultralytics (e.g. ROI crops)."""
+
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+
+
+def boxes_of(result):
+    """(xyxy float32 Nx4, class ids int Nx, confidences float32 Nx) of one result, on the CPU."""
+    if isinstance(result, Detections):
+        return result.xyxy, result.cls, result.conf
+    boxes = result.boxes
+    return (boxes.xyxy.cpu().numpy().astype('float32'), boxes.cls.cpu().numpy().astype('int64'),
+            boxes.conf.cpu().numpy().astype('float32'))
+
+
+def detected_labels(result, names):
+    """Class names of every box in one result."""
+    return [names[int(c)] for c in boxes_of(result)[1]]
+
+
+def annotate(result, frame, names):
+    """Draws the result's boxes onto the frame itself and returns it (no copy, no Ultralytics plotting)."""
+    return draw_boxes(frame, *boxes_of(result), names)
+
+
+def draw_boxes(image, xyxy, cls, conf, names, scale=1.0, thickness=BOX_THICKNESS):
+    """
+    Box outlines and class / confidence labels drawn in place, without copying the frame. Coordinates are
+    scaled, rounded and clipped for all boxes at once; the drawing itself is still one Python iteration
+    per box (outlines as slice assignments, the label with cv2.putText). `scale` maps box coordinates
+    onto an image of another size (e.g. a display-sized copy).
+    """
+    if not len(cls):
+        return image
+    h, w = image.shape[:2]
+    cls = np.asarray(cls)
+    boxes = np.rint(np.asarray(xyxy, np.float32) * scale).astype(np.int32)
+    np.clip(boxes, 0, [w - 1, h - 1, w - 1, h - 1], out=boxes)
+    colors = BOX_COLORS[cls % len(BOX_COLORS)].tolist()
+    t = thickness
+    for (x1, y1, x2, y2), color, c, p in zip(boxes.tolist(), colors, cls.tolist(), np.asarray(conf).tolist()):
+        image[y1:y1 + t, x1:x2 + 1] = color
+        image[max(y2 - t + 1, 0):y2 + 1, x1:x2 + 1] = color
+        image[y1:y2 + 1, x1:x1 + t] = color
+        image[y1:y2 + 1, max(x2 - t + 1, 0):x2 + 1] = color
+        cv2.putText(image, f"{names[int(c)]} {p:.2f}", (x1, max(y1 - 5, 12)), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    color, 1, cv2.LINE_AA)
+    return image
+
+
+def resize_to_width(frame, width=DISPLAY_WIDTH):
+    h, w = frame.shape[:2]
+    if w == width:
+        return frame
+    return cv2.resize(frame, (width, int(h * (width / w))))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Export best.pt for CPU inference and measure every runtime.
+
+    python -m Object_detection.export_model                  # ONNX + OpenVINO, FP32 and INT8, then the report
+    python -m Object_detection.export_model --report-only    # only re-measure the runtimes
+
+INT8 models are calibrated on the frames in dataset/images/train (post-training quantization).
+The report (runtime_report.json: mAP50 on the val split, ms/frame) is what detector.select_runtime('auto')
+uses to pick a runtime; an INT8 model is only picked while its mAP50 stays within
+detector.MAX_INT8_MAP_DROP of the FP32 (pytorch) baseline.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+
+# --- CONFIG ---
+# Train split only: the val images decide (via the mAP50 report) whether an INT8 model may be selected
+CALIBRATION_IMAGES = os.path.join(detector.BASE_DIR, 'dataset', 'images', 'train')
+CALIBRATION_LIMIT = 300  # images used for INT8 calibration
+
+
+# =========================================================
+# Export
+# =========================================================
+def _move(exported, target):
+    exported = str(exported)
+    if os.path.abspath(exported) != os.path.abspath(target):
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        shutil.move(exported, target)
+    return target
+
+
+def export_onnx(imgsz=detector.INFERENCE_SIZE):
+    from ultralytics import YOLO
+    # Dynamic batch axis, so batched offline analysis works with ONNX Runtime too
+    path = YOLO(detector.WEIGHTS_PATH).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+    return _move(path, detector.RUNTIMES['onnx']['path'])
+
+
+def export_openvino(imgsz=detector.INFERENCE_SIZE, int8=False):
+    from ultralytics import YOLO
+    # Ultralytics calibrates OpenVINO INT8 (NNCF) on the dataset from data.yaml; its default split is val,
+    # which the INT8 mAP50 check evaluates on, so calibrate on train like quantize_onnx_int8
+    path = YOLO(detector.WEIGHTS_PATH).export(format='openvino', imgsz=imgsz, dynamic=True, int8=int8,
+                                              data=detector.DATA_YAML, split='train')
+    return _move(path, detector.RUNTIMES['openvino_int8' if int8 else 'openvino']['path'])
+
+
+def letterbox_tensor(image, size=detector.INFERENCE_SIZE):
+    """BGR image -> 1x3xHxW float32 RGB tensor in [0, 1], letterboxed like Ultralytics' preprocessing."""
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return np.ascontiguousarray(canvas[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def quantize_onnx_int8(fp32_path, limit=CALIBRATION_LIMIT):
+    """Static INT8 quantization (QDQ) with ONNX Runtime, calibrated on the training frames."""
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    images = sorted(glob.glob(os.path.join(CALIBRATION_IMAGES, '**', '*.jpg'), recursive=True))[:limit]
+    if not images:
+        raise FileNotFoundError(f"No calibration images in {CALIBRATION_IMAGES}")
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.paths = iter(images)
+
+        def get_next(self):
+            path = next(self.paths, None)
+            return None if path is None else {input_name: letterbox_tensor(cv2.imread(path))}
+
+    int8_path = detector.RUNTIMES['onnx_int8']['path']
+    quantize_static(fp32_path, int8_path, FrameReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+
+    # Keep Ultralytics' metadata (class names, stride, imgsz) so YOLO() can load the quantized model
+    fp32, int8 = onnx.load(fp32_path), onnx.load(int8_path)
+    del int8.metadata_props[:]
+    int8.metadata_props.extend(fp32.metadata_props)
+    onnx.save(int8, int8_path)
+    print(f"INT8 model calibrated on {len(images)} frames -> {int8_path}")
+    return int8_path
+
+
+# =========================================================
+# Accuracy vs. latency report
+# =========================================================
+def runtime_report(runtimes=None, imgsz=detector.INFERENCE_SIZE):
+    """mAP50 on the val split and ms/frame (preprocess + inference + postprocess, batch 1, CPU) per runtime."""
+    rows = []
+    for name in runtimes or detector.available_runtimes():
+        model = detector.load_model(runtime=name)
+        t0 = time.perf_counter()
+        metrics = model.val(data=detector.DATA_YAML, split='val', imgsz=imgsz, batch=1, device='cpu',
+                            plots=False, verbose=False)
+        rows.append({
+            "runtime": name,
+            "map50": float(metrics.box.map50),
+            "map50_95": float(metrics.box.map),
+            "ms_per_frame": float(sum(metrics.speed.values())),
+            "inference_ms": float(metrics.speed['inference']),
+            "val_s": time.perf_counter() - t0,
+            # The INT8 check only trusts a row while the measured model file is unchanged
+            "model_mtime_ns": os.stat(detector.RUNTIMES[name]['path']).st_mtime_ns,
+        })
+
+    report = {"created": time.strftime('%Y-%m-%d %H:%M:%S'), "imgsz": imgsz, "runtimes": rows}
+    with open(detector.RUNTIME_REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report):
+    measured = {row["runtime"]: row for row in report["runtimes"]}
+    print(f"\n{'runtime':<15} {'mAP50':>7} {'mAP50-95':>9} {'ms/frame':>9} {'inference ms':>13}  INT8 check "
+          f"(max. mAP50 drop {detector.MAX_INT8_MAP_DROP:.3f})")
+    for row in sorted(report["runtimes"], key=lambda r: r["ms_per_frame"]):
+        check = ("" if not detector.is_int8(row['runtime']) else
+                 "ok" if detector.int8_within_tolerance(measured, row['runtime']) else "rejected")
+        print(f"{row['runtime']:<15} {row['map50']:>7.3f} {row['map50_95']:>9.3f} "
+              f"{row['ms_per_frame']:>9.1f} {row['inference_ms']:>13.1f}  {check}")
+    print(f"\n💾 Report saved to {detector.RUNTIME_REPORT_PATH} | "
+          f"auto-selected runtime: {detector.select_runtime('auto')}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export best.pt to ONNX / OpenVINO (FP32 + INT8).")
+    parser.add_argument("--formats", nargs="+", choices=["onnx", "openvino"], default=["onnx", "openvino"])
+    parser.add_argument("--no-int8", action="store_true", help="skip INT8 quantization")
+    parser.add_argument("--imgsz", type=int, default=detector.INFERENCE_SIZE)
+    parser.add_argument("--no-report", action="store_true",
+                        help="skip measuring mAP50 / latency (without a report 'auto' never picks INT8)")
+    parser.add_argument("--report-only", action="store_true", help="skip the export, only write the report")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.report_only:
+        if "onnx" in args.formats:
+            onnx_path = export_onnx(args.imgsz)
+            print(f"✅ ONNX: {onnx_path}")
+            if not args.no_int8:
+                quantize_onnx_int8(onnx_path)
+        if "openvino" in args.formats:
+            print(f"✅ OpenVINO: {export_openvino(args.imgsz)}")
+            if not args.no_int8:
+                print(f"✅ OpenVINO INT8: {export_openvino(args.imgsz, int8=True)}")
+    if not args.no_report or args.report_only:
+        print_report(runtime_report(imgsz=args.imgsz))
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Live turnaround monitoring for several stands / cameras with one shared pool of inference workers.
+
+    python -m Object_detection.monitor --config Object_detection/monitor_streams.json --workers 2
+    python -m Object_detection.monitor --stream A12="rtsp://..." --stream B3=recording.mp4
+
+Every stand gets a decode thread; frames that pass its scene-change gate are scheduled fairly onto
+the workers (longest-waiting stand first, stands under the FPS floor before the others) and batched
+across stands. The per-stand phase state is published to runs/monitor (state.json + <stand>.jpg),
+which the Streamlit page polls. The page can also host the service in-process (one per server).
+"""
+import argparse
+import bisect
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, roi  # noqa: E402
+from Object_detection.detection_cache import DetectionCache  # noqa: E402
+from Object_detection.frame_gate import SceneChangeGate  # noqa: E402
+from Object_detection.phases import TurnaroundPhases  # noqa: E402
+from Object_detection.tracker import tracker_for  # noqa: E402
+from Object_detection.video_source import open_source  # noqa: E402
+
+# --- CONFIG ---
+STREAMS_CONFIG = os.path.join(detector.BASE_DIR, 'monitor_streams.json')
+STATE_DIR = os.path.join(detector.BASE_DIR, 'runs', 'monitor')
+INFERENCE_WORKERS = 2
+BATCH_SIZE = 4  # frames per inference call, taken from different stands
+FPS_FLOOR = 5.0  # processed (inferred or reused) frames/s every stand should get; stands below it go first
+DISPLAY_FPS = 5.0  # annotated JPEG frames per stand and second, independent of the inference rate
+JPEG_QUALITY = 75
+PUBLISH_INTERVAL_S = 1 / DISPLAY_FPS
+STALE_AFTER_S = 5.0  # a published state older than this means the service is not running
+IDLE_TIMEOUT_S = 30.0  # in-process service: pause decoding when nobody has looked for this long
+FPS_WINDOW_S = 5.0
+
+
+def load_streams(config_path=STREAMS_CONFIG):
+    """[{stand, source, loop}] from the config file, or the demo clip as a single stand."""
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    return [{"stand": "Demo stand", "source": detector.VIDEO_PATH, "loop": True}]
+
+
+class RateCounter:
+    """
+    Events per second over a sliding time window. Thread-safe: the decode thread and the workers add,
+    the workers' scheduler and the publisher read. Only add() trims the window; rate() counts with bisect.
+    """
+
+    def __init__(self, window_s=FPS_WINDOW_S):
+        self.window_s = window_s
+        self.times = collections.deque()
+        self.lock = threading.Lock()
+
+    def add(self, now):
+        with self.lock:
+            self.times.append(now)
+            cutoff = now - self.window_s
+            while self.times[0] < cutoff:
+                self.times.popleft()
+
+    def rate(self, now):
+        with self.lock:
+            recent = len(self.times) - bisect.bisect_left(self.times, now - self.window_s)
+        return recent / self.window_s
+
+
+# =========================================================
+# One stand / camera
+# =========================================================
+class StandStream:
+    """
+    Decodes one camera (paced to its own clock for files), gates frames by scene change and keeps at most
+    one frame waiting for inference (a newer frame replaces it: drop-oldest). Results are applied in frame
+    order: at most one frame per stand is pending or in flight at any time.
+    """
+
+    def __init__(self, service, stand, source, loop=True, decode_size=detector.DISPLAY_WIDTH):
+        self.service = service
+        self.stand = stand
+        self.source = source
+        self.loop = loop
+        self.rois = roi.load_rois(roi.camera_name(source))
+        # Full-resolution frames when ROIs are cropped out of them, else decoder-scaled frames
+        self.decode_size = None if self.rois else decode_size
+        self.letterbox = roi.RoiLetterbox(self.rois) if self.rois else None
+
+        self.gate = SceneChangeGate()
+        self.phases = TurnaroundPhases()
+        self.tracker = None  # needs the model's class names, set by the service
+        self.cache = None  # detection cache of a video file, set by the service (needs the model)
+        self.lock = threading.Lock()
+        self.pending = None
+        self.in_flight = False
+        self.generation = 0  # bumped when a looping clip restarts; results of older passes are dropped
+        self.last_result = None
+        self.last_served = 0.0
+        self.display_due = 0.0
+        self.display_buffer = None
+        self.jpeg = None
+        self.frame_seq = 0  # bumped with every new JPEG, so subscribers only fetch / push changed frames
+        self.frames = RateCounter()  # decoded
+        self.processed = RateCounter()  # phase state updated (inferred or reused)
+        self.inferences = RateCounter()
+        self.dropped = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._decode_loop, name=f"decode-{stand}", daemon=True)
+
+    # --- decode thread ---
+    def _decode_loop(self):
+        try:
+            source = open_source(self.source, self.decode_size, ring_size=4)
+        except Exception as e:
+            self.error = str(e)
+            return
+        clock_start, first_pts = time.perf_counter(), None
+        try:
+            while not self.service.stop_event.is_set():
+                if not self.service.wait_for_viewers():
+                    clock_start, first_pts = time.perf_counter(), None  # don't race to catch up after a pause
+                    continue
+                success, index, pts, frame = source.read()
+                if not success:
+                    if not self.loop:
+                        break
+                    source.seek(0)
+                    with self.lock:
+                        self.phases, self.tracker = TurnaroundPhases(), tracker_for(self.service.names)
+                        self.generation += 1
+                        self.pending = None
+                        if self.cache is not None:
+                            self.cache.flush()  # the next pass replays from the cache
+                    clock_start, first_pts = time.perf_counter(), None
+                    continue
+                first_pts = pts if first_pts is None else first_pts
+                self.service.stop_event.wait(max(0.0, clock_start + pts - first_pts - time.perf_counter()))
+                self._on_frame(index, pts, frame)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            source.close()
+            with self.lock:
+                if self.cache is not None:
+                    self.cache.flush()
+
+    def _on_frame(self, index, pts, frame):
+        self._process(index, pts, frame)
+        now = time.perf_counter()
+        if now >= self.display_due:
+            self.display_due = now + 1 / DISPLAY_FPS
+            self._encode_display(frame)
+
+    def _process(self, index, pts, frame):
+        self.frames.add(time.perf_counter())
+        if self.gate.should_infer(frame, pts) or self.last_result is None:
+            with self.lock:
+                # Replays of a video file take frames inferred before from the detection cache
+                cached = None if self.cache is None or self.in_flight else self.cache.get(index)
+                if cached is not None:
+                    self.pending = None
+            if cached is not None:
+                self.apply({"index": index, "pts": pts, "frame": frame, "generation": self.generation}, cached,
+                           from_cache=True)
+                return
+            with self.lock:
+                if self.pending is not None:
+                    self.dropped += 1
+                # Own copy: the frame may wait for a worker longer than the decoder's ring lasts
+                self.pending = {"index": index, "pts": pts, "frame": frame.copy(), "since": time.perf_counter(),
+                                "generation": self.generation}
+            self.service.notify()
+            return
+        with self.lock:
+            if self.pending is None and not self.in_flight:
+                # Unchanged scene: reuse the last detections, tracks move on by prediction
+                self.phases.update(detector.detected_labels(self.last_result, self.service.names), pts)
+                self.tracker.predict(pts)
+                self.processed.add(time.perf_counter())
+                if self.cache is not None:
+                    self.cache.put(index, pts)
+
+    # --- worker side ---
+    def apply(self, packet, result, from_cache=False):
+        now = time.perf_counter()
+        if not from_cache:
+            self.inferences.add(now)
+        xyxy, cls, _ = detector.boxes_of(result)
+        with self.lock:
+            if self.cache is not None and not from_cache:
+                self.cache.put(packet["index"], packet["pts"], result)
+            if packet["generation"] != self.generation:
+                # Inferred during the previous pass of a looping clip: its pts belong to the old timeline
+                self.in_flight = False
+                return
+            self.processed.add(now)
+            self.last_result = result
+            self.phases.update([self.service.names[int(c)] for c in cls], packet["pts"])
+            self.tracker.update(xyxy, cls, packet["pts"])
+            self.in_flight = False
+
+    # --- display ---
+    def _encode_display(self, frame):
+        """
+        JPEG of the current frame with the latest boxes, at display width. The boxes are drawn in place:
+        onto the decoder's ring slot (pending frames are copies) or onto a reused display-sized buffer.
+        """
+        h, w = frame.shape[:2]
+        scale = detector.DISPLAY_WIDTH / w
+        image = frame
+        if scale != 1.0:
+            size = (detector.DISPLAY_WIDTH, round(h * scale))
+            if self.display_buffer is None or self.display_buffer.shape[:2] != size[::-1]:
+                self.display_buffer = np.empty((size[1], size[0], 3), np.uint8)
+            image = cv2.resize(frame, size, dst=self.display_buffer, interpolation=cv2.INTER_AREA)
+        result = self.last_result
+        if result is not None:
+            detector.draw_boxes(image, *detector.boxes_of(result), self.service.names, scale=scale)
+        self.jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])[1].tobytes()
+        self.frame_seq += 1
+
+    def state(self, now):
+        with self.lock:
+            timeline = self.phases.timeline()
+            vehicles = self.tracker.counts(self.service.names) if self.tracker else {}
+        fps = self.processed.rate(now)
+        return {"stand": self.stand, "source": str(self.source), "timeline": timeline, "vehicles": vehicles,
+                "decode_fps": self.frames.rate(now), "fps": fps, "inference_fps": self.inferences.rate(now),
+                "below_fps_floor": fps < FPS_FLOOR,
+                "dropped": self.dropped, "error": self.error, "frame_seq": self.frame_seq}
+
+
+# =========================================================
+# Service: decode threads + shared inference workers
+# =========================================================
+class MonitorService:
+
+    def __init__(self, streams, workers=INFERENCE_WORKERS, batch_size=BATCH_SIZE, runtime=detector.RUNTIME,
+                 idle_timeout_s=None):
+        self.streams = [StandStream(self, s["stand"], s["source"], s.get("loop", True)) for s in streams]
+        self.n_workers = workers
+        self.batch_size = batch_size
+        self.runtime = runtime
+        self.idle_timeout_s = idle_timeout_s
+        self.last_viewed = time.perf_counter()
+        self.names = None
+        self.cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        # One model per worker thread: a YOLO object must not run two predictions at once
+        models = [detector.load_model(runtime=self.runtime) for _ in range(self.n_workers)]
+        self.names = models[0].names
+        for stream in self.streams:
+            stream.tracker = tracker_for(self.names)
+            stream.cache = DetectionCache.for_source(stream.source, models[0], stream.decode_size, stream.rois)
+            stream.thread.start()
+        for i, model in enumerate(models):
+            thread = threading.Thread(target=self._worker_loop, args=(model,), name=f"infer-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.notify()
+        for thread in self.threads + [s.thread for s in self.streams]:
+            thread.join(timeout=5)
+
+    def notify(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    # --- viewers (in-process service only) ---
+    def touch(self):
+        self.last_viewed = time.perf_counter()
+
+    def wait_for_viewers(self):
+        """False (after a short sleep) while the in-process service has no viewers."""
+        if self.idle_timeout_s is None or time.perf_counter() - self.last_viewed < self.idle_timeout_s:
+            return True
+        self.stop_event.wait(0.5)
+        return False
+
+    # --- scheduling ---
+    def _take_batch(self):
+        """
+        Up to batch_size pending frames, one per stand: stands under the FPS floor first, then the ones
+        that waited longest since they were last served. Blocks until there is work.
+        """
+        with self.cond:
+            while not self.stop_event.is_set():
+                now = time.perf_counter()
+                ready = [s for s in self.streams if s.pending is not None and not s.in_flight]
+                if ready:
+                    ready.sort(key=lambda s: (s.processed.rate(now) >= FPS_FLOOR, s.last_served))
+                    batch = []
+                    for stream in ready[:self.batch_size]:
+                        with stream.lock:
+                            packet, stream.pending = stream.pending, None
+                            stream.in_flight = True
+                        stream.last_served = now
+                        batch.append((stream, packet))
+                    return batch
+                self.cond.wait(timeout=0.5)
+        return []
+
+    def _worker_loop(self, model):
+        while not self.stop_event.is_set():
+            batch = self._take_batch()
+            if not batch:
+                continue
+            unapplied = [stream for stream, _ in batch]
+            try:
+                inputs, spans = [], []
+                for stream, packet in batch:
+                    crops = stream.letterbox.prepare(packet["frame"]) if stream.letterbox else [packet["frame"]]
+                    spans.append(len(inputs))
+                    inputs.extend(crops)
+                results = detector.predict(model, inputs)
+                for (stream, packet), first in zip(batch, spans):
+                    result = stream.letterbox.merge(results, first) if stream.letterbox else results[first]
+                    stream.apply(packet, result)
+                    unapplied.remove(stream)
+            except Exception as e:
+                for stream in unapplied:
+                    stream.error = str(e)
+            finally:
+                # A failed batch must not leave its stands waiting for a result that never comes
+                for stream in unapplied:
+                    with stream.lock:
+                        stream.in_flight = False
+                self.notify()
+
+    # --- state ---
+    def snapshot(self):
+        """{stand: state} plus the latest JPEG per stand, for in-process subscribers."""
+        now = time.perf_counter()
+        return {s.stand: {**s.state(now), "jpeg": s.jpeg} for s in self.streams}
+
+    def publish(self, state_dir=STATE_DIR, interval_s=PUBLISH_INTERVAL_S):
+        """Write state.json every interval and <stand>.jpg whenever a stand has a new frame (standalone service)."""
+        os.makedirs(state_dir, exist_ok=True)
+        written = {}
+        while not self.stop_event.wait(interval_s):
+            stands = {}
+            for stand, state in self.snapshot().items():
+                jpeg = state.pop("jpeg")
+                image_name = f"{_safe_name(stand)}.jpg"
+                if jpeg is not None and written.get(stand) != state["frame_seq"]:
+                    _atomic_write(os.path.join(state_dir, image_name), jpeg)
+                    written[stand] = state["frame_seq"]
+                state["image"] = image_name if stand in written else None
+                stands[stand] = state
+            _atomic_write(os.path.join(state_dir, "state.json"),
+                          json.dumps({"updated": time.time(), "stands": stands}, indent=2).encode())
+
+
+def _safe_name(stand):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in stand)
+
+
+def _atomic_write(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_published_state(state_dir=STATE_DIR, stale_after_s=STALE_AFTER_S):
+    """
+    {stand: state} of a running standalone service, None if there is none. The JPEGs are not read here
+    (state["jpeg"] is None): fetch them with frame_jpeg() when a stand's frame_seq changed.
+    """
+    try:
+        with open(os.path.join(state_dir, "state.json"), 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - state["updated"] > stale_after_s:
+        return None
+    return {stand: {**info, "jpeg": None, "state_dir": state_dir} for stand, info in state["stands"].items()}
+
+
+def frame_jpeg(state):
+    """Latest JPEG of a stand, from an in-process snapshot or from a published state."""
+    if state["jpeg"] is not None or not state.get("image"):
+        return state["jpeg"]
+    try:
+        with open(os.path.join(state["state_dir"], state["image"]), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Live multi-stand turnaround monitoring service.")
+    parser.add_argument("--config", default=STREAMS_CONFIG, help="JSON list of {stand, source, loop}")
+    parser.add_argument("--stream", action="append", default=[], metavar="STAND=SOURCE",
+                        help="add a stream (file path or RTSP URL); overrides --config")
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--runtime", choices=["auto", *detector.RUNTIMES], default=detector.RUNTIME)
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    streams = ([{"stand": s.split("=", 1)[0], "source": s.split("=", 1)[1], "loop": True} for s in args.stream]
+               or load_streams(args.config))
+    service = MonitorService(streams, workers=args.workers, batch_size=args.batch_size, runtime=args.runtime).start()
+    print(f"Monitoring {len(streams)} stand(s) with {args.workers} inference worker(s); "
+          f"publishing to {args.state_dir} (Ctrl+C to stop)")
+    try:
+        threading.Thread(target=service.publish, args=(args.state_dir,), daemon=True).start()
+        while True:
+            time.sleep(10)
+            now = time.perf_counter()
+            print(" | ".join(f"{s.stand}: {s.processed.rate(now):.1f} fps ({s.inferences.rate(now):.1f} inferred)"
+                             for s in service.streams))
+    except KeyboardInterrupt:
+        service.stop()
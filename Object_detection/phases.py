@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+import collections
+
+# --- CONFIG ---
+BRIDGE, CLEANING_VEHICLE, LUGGAGE_VEHICLE = 'bridge_connected', 'cleaning_crew_vehicle', 'luggage_vehicle'
+PHASES = ['DEBOARDING', 'CLEANING', 'BOARDING', 'LUGGAGE']
+DEBOUNCE_S = 1.5  # seconds of video per class in the sliding window (independent of FPS / frame stride)
+ON_RATIO = 0.6  # a class is present once it was seen for this share of the window ...
+OFF_RATIO = 0.2  # ... and absent again once it drops below this share (hysteresis)
+
+
+class Debouncer:
+    """
+    Sliding-window presence of one class with hysteresis, measured in PTS seconds: each frame stands for
+    the time since the previous one, so the same footage flips at the same time at any FPS or stride.
+    Amortized O(1) per frame. After a flip, changed_at is when the new state first appeared
+    (first sighting still in the window when turning on, first miss after the last window that was
+    confirmed present when turning off).
+    """
+
+    def __init__(self, window=DEBOUNCE_S, on_ratio=ON_RATIO, off_ratio=OFF_RATIO):
+        self.window = window
+        self.segments = collections.deque()  # (previous pts, pts, seen)
+        self.hit_times = collections.deque()  # pts of the frames in the window where the class was seen
+        self.seen_s = 0.0  # seen time of the whole segments in the deque
+        self.on_s = on_ratio * window
+        self.off_s = off_ratio * window
+        self.present = False
+        self.last_pts = None
+        self.missed_since = None
+        self.changed_at = None
+
+    def update(self, seen, pts):
+        """Feed one frame at pts seconds; returns True when the debounced state flips."""
+        prev = pts if self.last_pts is None else min(self.last_pts, pts)
+        self.last_pts = pts
+        self.segments.append((prev, pts, seen))
+        if seen:
+            self.seen_s += pts - prev
+            self.hit_times.append(pts)
+
+        # Drop what left the window (pts - window, pts]; the oldest segment may still overlap it partly
+        cutoff = pts - self.window
+        while self.segments and self.segments[0][1] <= cutoff:
+            start, end, hit = self.segments.popleft()
+            self.seen_s -= (end - start) if hit else 0.0
+        while self.hit_times and self.hit_times[0] <= cutoff:
+            self.hit_times.popleft()
+        seen_s = self.seen_s
+        if self.segments and self.segments[0][2]:
+            seen_s -= max(0.0, cutoff - self.segments[0][0])
+
+        # Stray sightings below the on-level do not move the time the class was last solidly present
+        eps = 1e-9
+        if seen and seen_s >= self.on_s - eps:
+            self.missed_since = None
+        elif not seen and self.missed_since is None:
+            self.missed_since = pts
+
+        if not self.present and seen and seen_s >= self.on_s - eps:
+            self.present = True
+            self.changed_at = self.hit_times[0]
+            return True
+        if self.present and seen_s < self.off_s - eps:
+            self.present = False
+            self.changed_at = pts if self.missed_since is None else self.missed_since
+            return True
+        return False
+
+
+class TurnaroundPhases:
+    """
+    Turnaround phases from per-frame detections, following the BPMN process:
+    DEBOARDING -> CLEANING -> BOARDING on the main path, LUGGAGE in parallel.
+
+      - DEBOARDING starts when the bridge connects, and ends when cleaning starts.
+      - CLEANING runs while the cleaning vehicle is present.
+      - BOARDING starts once cleaning is over and the bridge is connected, and ends when it disconnects.
+      - LUGGAGE runs while a luggage vehicle is present (it may come and go; all intervals are kept).
+
+    Times are video PTS seconds. A phase is reported once the debounce window confirms it, but its start / end
+    is backdated to when the detections first changed, so the timeline does not depend on the frame rate.
+    update() is amortized O(1), so it can run on the display / consumer thread next to inference
+    without slowing it down.
+    """
+
+    def __init__(self, window=DEBOUNCE_S, on_ratio=ON_RATIO, off_ratio=OFF_RATIO):
+        self.debouncers = {label: Debouncer(window, on_ratio, off_ratio)
+                           for label in (BRIDGE, CLEANING_VEHICLE, LUGGAGE_VEHICLE)}
+        self.intervals = {phase: [] for phase in PHASES}  # [start, end or None]
+        self.events = []  # (pts, phase, 'start' | 'end')
+        self.main_phase = None  # current phase on the DEBOARDING -> CLEANING -> BOARDING path
+        self.cleaning_done = False
+        self.last_pts = None
+
+    # --- transitions ---
+    def _start(self, phase, pts):
+        intervals = self.intervals[phase]
+        if intervals:  # backdating must not overlap the previous interval
+            pts = max(pts, intervals[-1][1])
+        intervals.append([pts, None])
+        self.events.append((pts, phase, 'start'))
+
+    def _end(self, phase, pts):
+        if self.intervals[phase] and self.intervals[phase][-1][1] is None:
+            pts = max(pts, self.intervals[phase][-1][0])
+            self.intervals[phase][-1][1] = pts
+            self.events.append((pts, phase, 'end'))
+        return pts
+
+    def _set_main(self, phase, pts):
+        if self.main_phase is not None:
+            pts = self._end(self.main_phase, pts)
+        self.main_phase = phase
+        if phase is not None:
+            self._start(phase, pts)
+
+    def update(self, labels, pts):
+        """Feed the class names detected in one frame. Returns True if any phase started or ended."""
+        self.last_pts = pts
+        n_events = len(self.events)
+        labels = set(labels)
+        # When each flipped class actually appeared / disappeared (backdated, see Debouncer.changed_at)
+        changed = {label: d.changed_at for label, d in self.debouncers.items() if d.update(label in labels, pts)}
+        bridge = self.debouncers[BRIDGE].present
+        cleaning = self.debouncers[CLEANING_VEHICLE].present
+
+        if CLEANING_VEHICLE in changed:
+            if cleaning and self.main_phase != 'CLEANING' and not self.cleaning_done:
+                self._set_main('CLEANING', changed[CLEANING_VEHICLE])
+            elif not cleaning and self.main_phase == 'CLEANING':
+                self.cleaning_done = True
+                self._set_main(None, changed[CLEANING_VEHICLE])
+
+        if self.main_phase is None and bridge:
+            # Whichever came last: the bridge connecting or cleaning ending
+            when = max([changed[k] for k in (BRIDGE, CLEANING_VEHICLE) if k in changed], default=pts)
+            if not self.cleaning_done and not self.intervals['DEBOARDING']:
+                self._set_main('DEBOARDING', when)
+            elif self.cleaning_done and not self.intervals['BOARDING']:
+                self._set_main('BOARDING', when)
+        elif self.main_phase in ('DEBOARDING', 'BOARDING') and not bridge:
+            self._set_main(None, changed.get(BRIDGE, pts))
+
+        if LUGGAGE_VEHICLE in changed:
+            if self.debouncers[LUGGAGE_VEHICLE].present:
+                self._start('LUGGAGE', changed[LUGGAGE_VEHICLE])
+            else:
+                self._end('LUGGAGE', changed[LUGGAGE_VEHICLE])
+
+        return len(self.events) != n_events
+
+    # --- read-out ---
+    def status(self, phase):
+        intervals = self.intervals[phase]
+        if not intervals:
+            return 'pending'
+        return 'active' if intervals[-1][1] is None else 'done'
+
+    def detected(self, phase):
+        return bool(self.intervals[phase])
+
+    def timeline(self):
+        """{phase: {status, start, end, duration}} with start = first start and end = last end (PTS seconds)."""
+        timeline = {}
+        for phase in PHASES:
+            intervals = self.intervals[phase]
+            start = intervals[0][0] if intervals else None
+            end = intervals[-1][1] if intervals else None
+            busy = sum((e if e is not None else self.last_pts) - s for s, e in intervals)
+            timeline[phase] = {"status": self.status(phase), "start": start, "end": end,
+                               "duration": busy if intervals else None, "intervals": len(intervals)}
+        return timeline
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+import collections
+import threading
+import time
+
+from Object_detection.video_source import open_source
+
+# --- CONFIG ---
+QUEUE_SIZE = 2  # small queues keep live display latency low
+_END = object()  # end-of-stream marker passed down the stages
+
+
+# =========================================================
+# Bounded queue with drop-oldest or blocking backpressure
+# =========================================================
+class FrameQueue:
+
+    def __init__(self, maxsize=QUEUE_SIZE, drop_oldest=True, on_drop=None):
+        self.items = collections.deque()
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.on_drop = on_drop  # called with every dropped item
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        """
+        Live mode drops the oldest queued frame when full, so the consumer always sees the newest one.
+        Offline mode blocks until there is room (backpressure). The end marker is never dropped.
+        """
+        with self.cond:
+            while len(self.items) >= self.maxsize and not self.closed:
+                if self.drop_oldest and item is not _END:
+                    dropped = self.items.popleft()
+                    self.dropped += 1
+                    if self.on_drop is not None:
+                        self.on_drop(dropped)
+                    break
+                self.cond.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items or self.closed, timeout):
+                raise TimeoutError
+            if not self.items:
+                return _END
+            item = self.items.popleft()
+            self.cond.notify_all()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+# =========================================================
+# Per-stage timing
+# =========================================================
+class StageStats:
+
+    def __init__(self):
+        self.count = 0
+        self.total_s = 0.0
+        self.last_s = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds, n=1):
+        """Record one stage call that handled n frames (n > 1 for batched inference)."""
+        with self.lock:
+            self.count += n
+            self.total_s += seconds
+            self.last_s = seconds / n
+
+    def as_dict(self):
+        with self.lock:
+            return {"count": self.count,
+                    "mean_ms": self.total_s / self.count * 1000 if self.count else 0.0,
+                    "last_ms": self.last_s * 1000}
+
+
+# =========================================================
+# Decode -> infer -> render pipeline (one thread per stage)
+# =========================================================
+class VisionPipeline:
+    """
+    Runs decoding, inference and rendering on their own threads, connected by bounded queues.
+    OpenCV decoding and PyTorch inference release the GIL, so the stages overlap and the frame
+    rate is set by the slowest stage instead of the sum of all of them.
+
+    Packets are dicts: decode sets index / pts (seconds) / frame, `infer(frames)` adds result,
+    `render(packet)` adds image. Read finished packets with get().
+
+    live=True drops the oldest queued frame whenever a downstream stage falls behind; live=False
+    blocks instead so every frame is processed. realtime=True paces a video file to its own
+    clock, the way a camera would deliver it.
+
+    `infer(frames)` always gets a list of frames (up to batch_size) and returns one result per frame.
+    Offline runs wait for full batches; live runs batch whatever is already queued.
+
+    An optional `gate` (frame_gate.SceneChangeGate) is asked on the decode thread whether a frame
+    changed enough to be worth inferring; other frames reuse the last result (packet["reused"]).
+
+    start_frame / end_frame (exclusive) restrict decoding to one segment of a file; packet indices
+    stay frame numbers of the whole video.
+
+    Frames are decoded into a ring of reused buffers (video_source), scaled to decode_size by the
+    decoder (an output width or (width, height)). A ring slot stays reserved while its packet is queued,
+    inferred, rendered or is the consumer's latest packet; live runs whose decoder laps the ring meanwhile
+    (slow inference, a paused consumer) decode into a fresh array instead of overwriting it. A packet's
+    frame is valid until the next get(); keep a copy if you hold on to frames longer.
+
+    An optional `cache` (detection_cache.DetectionCache of this source) answers frames that were inferred
+    before with the same model (packet["cached"]); newly inferred and gated frames are added to it.
+    """
+
+    def __init__(self, source, infer, render=None, preprocess=None, stride=1, loop=False,
+                 live=True, realtime=False, batch_size=1, gate=None, start_frame=0, end_frame=None,
+                 decode_size=None, decode_backend='auto', cache=None, queue_size=QUEUE_SIZE):
+        self.source = source
+        self.decode_size = decode_size
+        self.decode_backend = decode_backend
+        self.decode_backend_used = None
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.infer = infer
+        self.render = render
+        self.preprocess = preprocess
+        self.stride = stride
+        self.loop = loop
+        self.live = live
+        self.realtime = realtime
+        self.batch_size = batch_size
+        self.gate = gate
+        self.cache = cache
+        self.last_result = None
+
+        self.decoded = FrameQueue(max(queue_size, batch_size), drop_oldest=live, on_drop=self._release)
+        self.inferred = FrameQueue(queue_size, drop_oldest=live, on_drop=self._release)
+        self.output = FrameQueue(queue_size, drop_oldest=live, on_drop=self._release)
+        # Every queue slot, a batch being inferred, one packet per stage thread and one at the consumer
+        self.ring_size = self.decoded.maxsize + self.inferred.maxsize + self.output.maxsize + batch_size + 4
+        self.held_slots = set()  # ring slots of the packets in flight
+        self.held_lock = threading.Lock()
+        self.ring = None
+        self.last_delivered = None
+        self.stats_by_stage = {name: StageStats() for name in ("decode", "infer", "render", "end_to_end")}
+        self.stop_event = threading.Event()
+        self.error = None
+        self.threads = []
+        self.started = None
+        self.delivered = 0
+
+    # --- lifecycle ---
+    def start(self):
+        self.started = time.perf_counter()
+        for target in (self._decode_loop, self._infer_loop, self._render_loop):
+            thread = threading.Thread(target=self._guard, args=(target,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for q in (self.decoded, self.inferred, self.output):
+            q.close()
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _guard(self, target):
+        try:
+            target()
+        except Exception as e:
+            # Surface worker errors to the consumer instead of dying silently
+            self.error = e
+            self.stop_event.set()
+            for q in (self.decoded, self.inferred, self.output):
+                q.close()
+
+    # --- ring slots in flight ---
+    def _slot_held(self, index):
+        with self.held_lock:
+            return index in self.held_slots
+
+    def _release(self, packet):
+        if packet is not None and packet is not _END and packet.get("slot") is not None:
+            with self.held_lock:
+                self.held_slots.discard(packet["slot"])
+
+    # --- stages ---
+    def _decode_loop(self):
+        source = open_source(self.source, self.decode_size, self.ring_size, self.decode_backend)
+        self.decode_backend_used = source.backend
+        if self.cache is not None and self.cache.decode_backend != source.backend:
+            source.close()
+            raise ValueError(f"Detection cache was made with the {self.cache.decode_backend} decoder, "
+                             f"but this pipeline decodes with {source.backend}.")
+        # The decoder never writes into a slot that a packet further down still uses
+        self.ring = source.ring
+        self.ring.in_use = self._slot_held
+        if self.start_frame:
+            # FFmpeg seeks to the keyframe before start_frame and decodes forward from there
+            source.seek(self.start_frame)
+        clock_start, first_pts = time.perf_counter(), None
+        try:
+            while not self.stop_event.is_set():
+                if self.end_frame is not None and source.index >= self.end_frame:
+                    break
+                t0 = time.perf_counter()
+                # Strided-out frames are skipped without being converted into a BGR array
+                success, index, pts, frame = source.read(decode=source.index % self.stride == 0)
+                if not success:
+                    if self.loop and index > self.start_frame:
+                        source.seek(self.start_frame)
+                        clock_start, first_pts = time.perf_counter(), None
+                        continue
+                    break
+                if frame is None:
+                    continue
+                decode_s = time.perf_counter() - t0
+                if self.realtime:
+                    first_pts = pts if first_pts is None else first_pts
+                    self.stop_event.wait(max(0.0, clock_start + pts - first_pts - time.perf_counter()))
+
+                # End-to-end latency counts from the start of the read, without the realtime pacing wait
+                t0 = time.perf_counter()
+                t_start = t0 - decode_s
+                slot = self.ring.index_of(frame)
+                if slot is not None:
+                    with self.held_lock:
+                        self.held_slots.add(slot)
+                if self.preprocess is not None:
+                    frame = self.preprocess(frame)
+                reuse = self.gate is not None and not self.gate.should_infer(frame, pts)
+                self.stats_by_stage["decode"].add(decode_s + time.perf_counter() - t0)
+                self.decoded.put({"index": index, "pts": pts, "frame": frame, "t_start": t_start,
+                                  "reused": reuse, "slot": slot})
+        finally:
+            source.close()
+            self.decoded.put(_END)
+
+    def _next_batch(self):
+        """Up to batch_size packets in decode order, and whether the stream ended."""
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                packet = self.decoded.get(timeout=0 if self.live and batch else None)
+            except TimeoutError:
+                break
+            if packet is _END:
+                return batch, True
+            batch.append(packet)
+        return batch, False
+
+    def _infer_loop(self):
+        try:
+            self._infer_batches()
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
+        self.inferred.put(_END)
+
+    def _infer_batches(self):
+        ended = False
+        while not ended:
+            batch, ended = self._next_batch()
+            if not batch:
+                continue
+            if self.last_result is None:
+                batch[0]["reused"] = False  # nothing to reuse yet (e.g. the first gated frame was dropped)
+            for packet in batch:
+                cached = None if packet["reused"] or self.cache is None else self.cache.get(packet["index"])
+                packet["cached"] = cached is not None
+                if cached is not None:
+                    packet["result"] = cached
+            todo = [p for p in batch if not p["reused"] and not p["cached"]]
+
+            if todo:
+                t0 = time.perf_counter()
+                # One inference call per batch (also for a single frame); results come back in input order
+                for packet, result in zip(todo, self.infer([p["frame"] for p in todo])):
+                    packet["result"] = result
+                self.stats_by_stage["infer"].add(time.perf_counter() - t0, len(todo))
+
+            # Gated frames carry the most recent result before them forward
+            for packet in batch:
+                if packet["reused"]:
+                    packet["result"] = self.last_result
+                if self.cache is not None and not packet["cached"]:
+                    self.cache.put(packet["index"], packet["pts"], None if packet["reused"] else packet["result"])
+                self.last_result = packet["result"]
+                self.inferred.put(packet)
+
+    def _render_loop(self):
+        while True:
+            packet = self.inferred.get()
+            if packet is _END:
+                break
+            if self.render is not None:
+                t0 = time.perf_counter()
+                packet["image"] = self.render(packet)
+                self.stats_by_stage["render"].add(time.perf_counter() - t0)
+            self.output.put(packet)
+        self.output.put(_END)
+
+    # --- consumer side ---
+    def get(self, timeout=None):
+        """Next finished packet, or None once the stream has ended. Re-raises stage errors."""
+        packet = self.output.get(timeout)
+        # The previous packet's frame goes back to the decoder
+        self._release(self.last_delivered)
+        self.last_delivered = None
+        if packet is _END:
+            if self.error is not None:
+                raise self.error
+            return None
+        self.last_delivered = packet
+        self.delivered += 1
+        self.stats_by_stage["end_to_end"].add(time.perf_counter() - packet["t_start"])
+        return packet
+
+    def __iter__(self):
+        while True:
+            packet = self.get()
+            if packet is None:
+                return
+            yield packet
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        stats = {name: s.as_dict() for name, s in self.stats_by_stage.items()}
+        stats["dropped"] = {"decoded": self.decoded.dropped, "inferred": self.inferred.dropped,
+                            "output": self.output.dropped}
+        stats["fps"] = self.delivered / elapsed if elapsed else 0.0
+        if self.gate is not None:
+            stats["gate"] = self.gate.stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        stats["ring_spills"] = self.ring.spilled if self.ring is not None else 0
+        return stats
+
+
+def format_stats(stats):
+    stages = " | ".join(f"{name} {stats[name]['mean_ms']:.1f} ms" for name in ("decode", "infer", "render"))
+    text = (f"{stats['fps']:.1f} FPS | {stages} | latency {stats['end_to_end']['mean_ms']:.0f} ms | "
+            f"dropped {sum(stats['dropped'].values())}")
+    if "gate" in stats:
+        text += f" | inferences saved {stats['gate']['saved_fraction']:.0%}"
+    if "cache" in stats:
+        text += f" | cache hits {stats['cache']['hit_rate']:.0%}"
+    return text
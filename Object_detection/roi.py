@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+import json
+import os
+
+import cv2
+import numpy as np
+
+from Object_detection import detector
+from Object_detection.tracker import iou_matrix
+
+# --- CONFIG ---
+# Stand regions of interest per camera (camera = video file name without extension), as fractions
+# of the frame: {"turnaround clip": [[x1, y1, x2, y2], ...]}. Cameras without an entry use the full frame.
+ROI_CONFIG_PATH = os.path.join(detector.BASE_DIR, 'stand_rois.json')
+PAD_VALUE = 114  # Ultralytics' letterbox grey
+MERGE_IOU = 0.5  # same-class boxes from overlapping ROIs above this IoU are one object
+
+
+def class_nms(xyxy, cls, conf, iou_threshold=MERGE_IOU):
+    """Indices (ascending) of the boxes kept by greedy per-class NMS, the most confident box first."""
+    order = np.argsort(-np.asarray(conf), kind='stable')
+    iou = iou_matrix(xyxy[order], xyxy[order])
+    overlaps = (iou > iou_threshold) & (cls[order][:, None] == cls[order][None, :])
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if not suppressed[i]:
+            keep.append(order[i])
+            suppressed |= overlaps[i]
+    return np.sort(np.asarray(keep, dtype=np.int64))
+
+
+def camera_name(source):
+    return os.path.splitext(os.path.basename(str(source)))[0]
+
+
+def load_rois(camera, config_path=ROI_CONFIG_PATH):
+    """ROIs of one camera as fractions of the frame, or None when the camera has none configured."""
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path, 'r') as f:
+        rois = json.load(f).get(camera)
+    return [tuple(float(v) for v in roi) for roi in rois] if rois else None
+
+
+class RoiLetterbox:
+    """
+    Crops the stand ROIs out of frames and letterboxes each one into a preallocated
+    (max_frames * n_rois, size, size, 3) buffer. Crops are views and the resize writes straight into the
+    buffer, so the only per-frame work is one resize per ROI; the padding is only repainted when the
+    frame size changes (one video source keeps one frame size).
+    """
+
+    def __init__(self, rois, size=detector.INFERENCE_SIZE, max_frames=1):
+        self.rois = np.asarray(rois, dtype=np.float64).reshape(-1, 4)
+        self.size = size
+        self.buffer = np.full((max_frames * len(self.rois), size, size, 3), PAD_VALUE, dtype=np.uint8)
+        self.frame_shape = None
+        self.geometry = []  # per ROI: (x1, y1, x2, y2) in pixels, scale, (left, top) padding, (new_w, new_h)
+
+    def _layout(self, shape):
+        h, w = shape[:2]
+        self.geometry = []
+        self.buffer[...] = PAD_VALUE
+        for fx1, fy1, fx2, fy2 in self.rois:
+            x1, y1 = int(round(fx1 * w)), int(round(fy1 * h))
+            x2, y2 = max(int(round(fx2 * w)), x1 + 1), max(int(round(fy2 * h)), y1 + 1)
+            scale = min(self.size / (x2 - x1), self.size / (y2 - y1))
+            new_w, new_h = int(round((x2 - x1) * scale)), int(round((y2 - y1) * scale))
+            left, top = (self.size - new_w) // 2, (self.size - new_h) // 2
+            self.geometry.append(((x1, y1, x2, y2), scale, (left, top), (new_w, new_h)))
+        self.frame_shape = shape
+
+    def prepare(self, frame, slot=0):
+        """Letterboxed ROI crops of one frame in buffer slot `slot` (views, valid until the slot is reused)."""
+        if frame.shape != self.frame_shape:
+            self._layout(frame.shape)
+        first = slot * len(self.rois)
+        for i, ((x1, y1, x2, y2), _, (left, top), (new_w, new_h)) in enumerate(self.geometry):
+            cv2.resize(frame[y1:y2, x1:x2], (new_w, new_h), interpolation=cv2.INTER_AREA,
+                       dst=self.buffer[first + i, top:top + new_h, left:left + new_w])
+        return list(self.buffer[first:first + len(self.rois)])
+
+    def to_frame(self, xyxy, roi_index):
+        """Map boxes from letterboxed crop coordinates back to full-frame pixels."""
+        (x1, y1, x2, y2), scale, (left, top), _ = self.geometry[roi_index]
+        boxes = (np.asarray(xyxy, dtype=np.float32).reshape(-1, 4) - [left, top, left, top]) / scale
+        boxes += [x1, y1, x1, y1]
+        return np.clip(boxes, [x1, y1, x1, y1], [x2, y2, x2, y2]).astype(np.float32)
+
+    def merge(self, results, first=0):
+        """
+        detector.Detections in full-frame coordinates from the per-ROI results of one frame. An object in the
+        overlap of two ROIs is detected in both; class-wise NMS keeps only the more confident box.
+        """
+        parts = [detector.boxes_of(results[first + r]) for r in range(len(self.rois))]
+        xyxy = np.concatenate([self.to_frame(xyxy, r) for r, (xyxy, _, _) in enumerate(parts)])
+        cls = np.concatenate([cls for _, cls, _ in parts]).astype(np.int64)
+        conf = np.concatenate([conf for _, _, conf in parts]).astype(np.float32)
+        if len(parts) > 1 and len(cls) > 1:
+            keep = class_nms(xyxy, cls, conf)
+            xyxy, cls, conf = xyxy[keep], cls[keep], conf[keep]
+        return detector.Detections(xyxy, cls, conf)
+
+    def pixel_fraction(self):
+        """Share of the frame's pixels that is actually looked at."""
+        return float(sum((x2 - x1) * (y2 - y1) for (x1, y1, x2, y2), *_ in self.geometry)
+                     / (self.frame_shape[0] * self.frame_shape[1]))
+
+
+def roi_predictor(model, rois, size=detector.INFERENCE_SIZE, max_batch=detector.BATCH_SIZE):
+    """
+    predict(frames) for VisionPipeline: runs the model once on the ROI crops of all frames and returns
+    one detector.Detections per frame, in full-frame coordinates.
+    """
+    letterbox = RoiLetterbox(rois, size, max_frames=max_batch)
+    n_rois = len(letterbox.rois)
+
+    def predict(frames):
+        if len(frames) > max_batch:
+            return predict(frames[:max_batch]) + predict(frames[max_batch:])
+        crops = [crop for slot, frame in enumerate(frames) for crop in letterbox.prepare(frame, slot)]
+        results = detector.predict(model, crops)
+
+        return [letterbox.merge(results, i * n_rois) for i in range(len(frames))]
+
+    return predict
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Segment-parallel analysis of one long turnaround video.
+
+    python -m Object_detection.segment_process recording.mp4 --workers 8 [--verify]
+
+The video is cut into keyframe-aligned frame ranges. Each worker seeks to its segment's start, so
+it decodes only its own part. The detection streams are merged back in frame order before the phase engine
+runs, so the phase timeline is computed exactly as in a sequential pass.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import batch_process, detector  # noqa: E402
+from Object_detection.video_source import keyframe_indices  # noqa: E402
+
+# --- CONFIG ---
+SEGMENTS_PER_WORKER = 2  # a few more segments than workers evens out uneven segments
+
+
+# =========================================================
+# Segment planning
+# =========================================================
+def plan_segments(video_path, n_segments):
+    """[(start_frame, end_frame)] covering the whole video; boundaries snap to the nearest keyframe if known."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {video_path}")
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    bounds = np.linspace(0, n_frames, n_segments + 1).round().astype(int)[1:-1]
+    keyframes = keyframe_indices(video_path)
+    if keyframes:
+        keyframes = np.asarray(keyframes)
+        bounds = keyframes[np.abs(keyframes[None, :] - bounds[:, None]).argmin(axis=1)]
+    bounds = sorted(set(int(b) for b in bounds if 0 < b < n_frames))
+    edges = [0, *bounds, n_frames]
+    return list(zip(edges[:-1], edges[1:])), keyframes is not None
+
+
+def _detect_segment(video_path, start_frame, end_frame, batch_size, use_gate):
+    t0 = time.perf_counter()
+    rows, inferences = batch_process.detect_frames(video_path, batch_size, use_gate, start_frame, end_frame)
+    return rows, inferences, time.perf_counter() - t0
+
+
+def merge_segments(segment_rows):
+    """Concatenate per-segment rows into one stream ordered by frame number (PTS order)."""
+    rows = [r for seg in segment_rows for r in seg]
+    rows.sort(key=lambda r: r["frame"])
+    return rows
+
+
+def compare_detections(rows_a, rows_b, atol=1e-3):
+    """Frame numbers whose detections differ between two runs (boxes, classes or confidences)."""
+    if [r["frame"] for r in rows_a] != [r["frame"] for r in rows_b]:
+        return sorted(set(r["frame"] for r in rows_a) ^ set(r["frame"] for r in rows_b))
+    differing = []
+    for a, b in zip(rows_a, rows_b):
+        same = (len(a["cls"]) == len(b["cls"]) and np.array_equal(a["cls"], b["cls"])
+                and np.allclose(a["xyxy"], b["xyxy"], atol=atol) and np.allclose(a["conf"], b["conf"], atol=atol))
+        if not same:
+            differing.append(a["frame"])
+    return differing
+
+
+# =========================================================
+# Driver
+# =========================================================
+def run(video_path, out_dir=batch_process.OUTPUT_DIR, workers=4, n_segments=None, fmt='jsonl',
+        batch_size=detector.BATCH_SIZE, use_gate=True, runtime=detector.RUNTIME, verify=False):
+    video_path = os.path.abspath(video_path)
+    segments, aligned = plan_segments(video_path, n_segments or workers * SEGMENTS_PER_WORKER)
+    print(f"{len(segments)} segments ({'keyframe-aligned' if aligned else 'frame-count split, PyAV not available'}) "
+          f"on {workers} worker(s)")
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=batch_process._init_worker,
+                             initargs=(runtime, threads)) as pool:
+        futures = [pool.submit(_detect_segment, video_path, start, end, batch_size, use_gate)
+                   for start, end in segments]
+        results = [f.result() for f in futures]
+    t_parallel = time.perf_counter() - t0
+
+    rows = merge_segments(r[0] for r in results)
+    inferences = sum(r[1] for r in results)
+    for (start, end), (_, _, seconds) in zip(segments, results):
+        print(f"  frames {start:>7}-{end - 1:<7} {seconds:6.1f}s")
+
+    os.makedirs(out_dir, exist_ok=True)
+    batch_process._init_worker(runtime, os.cpu_count() or 1)  # model names for the outputs / verification
+    names = batch_process._WORKER['model'].names
+    summary = batch_process.save_outputs(video_path, rows, out_dir, fmt, names, processing_s=t_parallel,
+                                         inferences_saved=1 - inferences / len(rows) if rows else 0.0,
+                                         runtime=batch_process._WORKER['model'].runtime, segments=segments)
+    print(f"\n⏱️ {len(rows):,} frames in {t_parallel:.1f}s | {len(rows) / t_parallel:.1f} frames/s")
+
+    if verify:
+        t0 = time.perf_counter()
+        # Uncached, so the comparison checks real detections rather than the segments' cache entries
+        sequential, _ = batch_process.detect_frames(video_path, batch_size, use_gate, use_cache=False)
+        t_sequential = time.perf_counter() - t0
+        differing = compare_detections(sequential, rows)
+        print(f"Sequential run: {t_sequential:.1f}s -> speed-up {t_sequential / t_parallel:.2f}x "
+              f"with {workers} workers")
+        if not differing:
+            print("✅ Segment-parallel detections match the sequential run")
+        else:
+            print(f"❌ {len(differing)} frames differ, first: {differing[:10]}")
+            if use_gate:
+                print("   The scene-change gate restarts at every segment start; use --no-gate for an exact comparison.")
+        summary["verified_identical"] = not differing
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyse one long turnaround video in parallel segments.")
+    parser.add_argument("video")
+    parser.add_argument("--out", default=batch_process.OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--segments", type=int, default=None,
+                        help=f"number of segments (default: {SEGMENTS_PER_WORKER} per worker)")
+    parser.add_argument("--format", choices=batch_process.OUTPUT_FORMATS, default='jsonl')
+    parser.add_argument("--batch-size", type=int, default=detector.BATCH_SIZE)
+    parser.add_argument("--no-gate", action="store_true", help="run the detector on every frame")
+    parser.add_argument("--runtime", choices=["auto", *detector.RUNTIMES], default=detector.RUNTIME)
+    parser.add_argument("--verify", action="store_true", help="also run sequentially and compare detections")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.video, out_dir=args.out, workers=args.workers, n_segments=args.segments, fmt=args.format,
+        batch_size=args.batch_size, use_gate=not args.no_gate, runtime=args.runtime, verify=args.verify)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import numpy as np
+
+# --- CONFIG ---
+TRACKED_CLASSES = ('cleaning_crew_vehicle', 'luggage_vehicle')
+IOU_THRESHOLD = 0.3
+MAX_AGE_S = 2.0  # drop a track that has not been matched for this long
+MIN_HITS = 3  # detections before a track counts as a vehicle
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of two sets of xyxy boxes (N x 4, M x 4) -> N x M."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def _xyxy_to_z(box):
+    x1, y1, x2, y2 = box
+    return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+
+class KalmanBoxTrack:
+    """Constant-velocity Kalman filter on box centre and size: state [cx, cy, w, h, vcx, vcy, vw, vh] (per second)."""
+
+    H = np.hstack([np.eye(4), np.zeros((4, 4))])
+    R = np.diag([1.0, 1.0, 10.0, 10.0])  # measurement noise (px^2)
+
+    def __init__(self, track_id, box, cls, pts):
+        self.id = track_id
+        self.cls = cls
+        self.x = np.concatenate([_xyxy_to_z(box), np.zeros(4)])
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e3, 1e3, 1e3, 1e3])
+        self.first_pts = self.last_seen = self.pts = pts
+        self.hits = 1
+
+    def predict(self, pts):
+        dt = max(pts - self.pts, 0.0)
+        if dt:
+            F = np.eye(8)
+            F[:4, 4:] = np.eye(4) * dt
+            Q = np.diag([1.0, 1.0, 1.0, 1.0, 10.0, 10.0, 10.0, 10.0]) * dt
+            self.x = F @ self.x
+            self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+            self.P = F @ self.P @ F.T + Q
+            self.pts = pts
+        return self.box()
+
+    def update(self, box, pts):
+        y = _xyxy_to_z(box) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+        self.last_seen = pts
+        self.hits += 1
+
+    def box(self):
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+class IoUTracker:
+    """
+    Multi-object tracker (SORT-style, pure NumPy): Kalman-predicted boxes are matched greedily by IoU,
+    per class, to the detections of a keyframe. Between keyframes predict() moves the tracks along,
+    so the detector does not have to run on every frame.
+    """
+
+    def __init__(self, class_ids, iou_threshold=IOU_THRESHOLD, max_age_s=MAX_AGE_S, min_hits=MIN_HITS):
+        self.class_ids = set(class_ids)
+        self.iou_threshold = iou_threshold
+        self.max_age_s = max_age_s
+        self.min_hits = min_hits
+        self.tracks = []
+        self.finished = []
+        self.next_id = 1
+
+    def predict(self, pts):
+        """Advance every track to pts; returns (ids, xyxy, cls) of the confirmed tracks."""
+        for track in self.tracks:
+            track.predict(pts)
+        return self.active()
+
+    def update(self, xyxy, cls, pts):
+        """Match one keyframe's detections (xyxy N x 4, class ids N) and return the confirmed tracks."""
+        keep = np.isin(cls, list(self.class_ids))
+        xyxy, cls = np.asarray(xyxy)[keep], np.asarray(cls)[keep]
+        self.predict(pts)
+
+        unmatched = set(range(len(xyxy)))
+        if self.tracks and len(xyxy):
+            predicted = np.stack([t.box() for t in self.tracks])
+            iou = iou_matrix(predicted, xyxy)
+            iou[np.array([t.cls for t in self.tracks])[:, None] != cls[None, :]] = 0  # never match across classes
+
+            # Greedy assignment, best overlap first
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                t, d = np.unravel_index(flat, iou.shape)
+                if iou[t, d] < self.iou_threshold:
+                    break
+                if d in unmatched and self.tracks[t].last_seen != pts:
+                    self.tracks[t].update(xyxy[d], pts)
+                    unmatched.discard(d)
+
+        for d in sorted(unmatched):
+            self.tracks.append(KalmanBoxTrack(self.next_id, xyxy[d], int(cls[d]), pts))
+            self.next_id += 1
+
+        alive = []
+        for track in self.tracks:
+            if pts - track.last_seen <= self.max_age_s:
+                alive.append(track)
+            elif track.hits >= self.min_hits:
+                self.finished.append(track)
+        self.tracks = alive
+        return self.active()
+
+    def active(self):
+        confirmed = [t for t in self.tracks if t.hits >= self.min_hits]
+        if not confirmed:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.int64)
+        return (np.array([t.id for t in confirmed]), np.stack([t.box() for t in confirmed]),
+                np.array([t.cls for t in confirmed]))
+
+    def vehicles(self):
+        """Every confirmed track so far: id, class id, first / last seen (PTS seconds) and dwell time."""
+        tracks = self.finished + [t for t in self.tracks if t.hits >= self.min_hits]
+        return [{"id": t.id, "cls": t.cls, "first_seen": t.first_pts, "last_seen": t.last_seen,
+                 "dwell_s": t.last_seen - t.first_pts} for t in sorted(tracks, key=lambda t: t.id)]
+
+    def counts(self, names):
+        counts = {names[c]: 0 for c in self.class_ids}
+        for vehicle in self.vehicles():
+            counts[names[vehicle["cls"]]] += 1
+        return counts
+
+
+def tracker_for(names, classes=TRACKED_CLASSES, **kwargs):
+    """IoUTracker for the given class names of a model's {id: name} map."""
+    return IoUTracker([i for i, name in names.items() if name in classes], **kwargs)
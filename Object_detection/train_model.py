@@ -1,7 +1,17 @@
+import os
+import sys
+
 from ultralytics import YOLO
 import torch
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import dataset_index  # noqa: E402
+
 if __name__ == '__main__':
+    # 0. Refuse to train on a broken dataset (orphan labels, bad boxes, train-val overlap);
+    # images without labels are only reported, YOLO trains on them as background
+    dataset_index.main(strict=True)
+
     # 1. Check if GPU is actually available
     if torch.cuda.is_available():
         print(f"✅ GOOD NEWS: GPU Detected: {torch.cuda.get_device_name(0)}")
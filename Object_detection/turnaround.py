@@ -1,55 +1,217 @@
-import cv2
+#!/usr/bin/env python3
+"""
+Training images from turnaround videos.
+
+    python -m Object_detection.turnaround "turnaround clip.mp4" more_clips/ --interval 4 --workers 4
+
+One frame every FRAME_INTERVAL seconds is decoded by seeking to it (frames in between are skipped
+without conversion), scaled by the decoder to the training resolution and kept unless it is a
+near-duplicate (perceptual hash) of a frame already kept from the same video. Videos are processed in
+parallel. Train / val are split by whole video segments with a fixed seed, so neighbouring frames
+never end up on both sides.
+"""
+import argparse
+import glob
 import os
-import shutil
 import random
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+from Object_detection.batch_process import find_videos  # noqa: E402
+from Object_detection.video_source import keyframe_indices, open_source  # noqa: E402
 
 # --- CONFIG ---
-VIDEO_PATH = 'turnaround clip.mp4'
-CLASSES = ['bridge_connected', 'cleaning_crew_vehicle', 'luggage_vehicle']
-OUTPUT_DIR = 'dataset'
+VIDEO_PATH = detector.VIDEO_PATH
+CLASSES = detector.CLASSES
+OUTPUT_DIR = os.path.dirname(detector.DATA_YAML)
 FRAME_INTERVAL = 4  # Extract 1 image every 4 seconds
+IMAGE_SIZE = detector.INFERENCE_SIZE  # longest image side, as trained (never upscaled)
+DEDUP_DISTANCE = 6  # max. differing bits of the 64-bit perceptual hash for a near-duplicate
+SEGMENT_S = 60  # split groups: frames of the same minute of a video stay in the same subset
+VAL_FRACTION = 0.2
+SEED = 42
+JPEG_QUALITY = 95
 
 
-def main():
-    # 1. Reset Folders
-    if os.path.exists(OUTPUT_DIR):
-        shutil.rmtree(OUTPUT_DIR)
+# =========================================================
+# Perceptual hash (DCT of a 32x32 thumbnail, 8x8 low frequencies vs their median)
+# =========================================================
+def phash(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    low = cv2.dct(cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32))[:8, :8].ravel()
+    bits = low > np.median(low[1:])  # the DC term only says how bright the frame is
+    return np.packbits(bits).view('>u8')[0]
 
-    paths = [f"{OUTPUT_DIR}/images/train", f"{OUTPUT_DIR}/images/val",
-             f"{OUTPUT_DIR}/labels/train", f"{OUTPUT_DIR}/labels/val"]
-    for p in paths:
-        os.makedirs(p, exist_ok=True)
 
-    # 2. Extract Frames
-    cap = cv2.VideoCapture(VIDEO_PATH)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    interval_frames = int(fps * FRAME_INTERVAL)
-    count = 0
-    saved = 0
+def hamming_distances(hashes, h):
+    return np.unpackbits((np.asarray(hashes, dtype='>u8') ^ h).view(np.uint8)).reshape(-1, 64).sum(axis=1)
 
-    print("Extracting images...")
-    while True:
-        success, frame = cap.read()
-        if not success: break
-
-        if count % interval_frames == 0:
-            subset = "train" if random.random() < 0.8 else "val"
-            cv2.imwrite(f"{OUTPUT_DIR}/images/{subset}/frame_{saved:04d}.jpg", frame)
-            saved += 1
-        count += 1
 
+# =========================================================
+# Planning: target frames and the grouped split
+# =========================================================
+def probe(video_path):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {video_path}")
+    info = {"fps": cap.get(cv2.CAP_PROP_FPS) or 0.0, "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}
     cap.release()
+    return info
 
-    # 3. Create YAML file for YOLO
-    yaml_content = f"path: {os.path.abspath(OUTPUT_DIR)}\ntrain: images/train\nval: images/val\nnames:\n"
+
+def training_size(width, height, image_size=IMAGE_SIZE):
+    scale = min(1.0, image_size / max(width, height))
+    return int(round(width * scale)), int(round(height * scale))
+
+
+def target_frames(info, interval_s=FRAME_INTERVAL):
+    step = max(1, int(round(info["fps"] * interval_s)))
+    return list(range(0, info["frames"], step))
+
+
+def split_groups(videos, infos, val_fraction=VAL_FRACTION, segment_s=SEGMENT_S, seed=SEED):
+    """
+    {(video, segment): 'train' | 'val'}: a seeded shuffle of all video segments, the first val_fraction of
+    them (at least one, if there are two or more) go to val. The same inputs always give the same split.
+    """
+    groups = sorted((video, seg) for video in videos
+                    for seg in range(int(infos[video]["frames"] / (infos[video]["fps"] or 1) // segment_s) + 1))
+    random.Random(seed).shuffle(groups)
+    n_val = max(1, round(len(groups) * val_fraction)) if len(groups) > 1 else 0
+    return {group: ("val" if i < n_val else "train") for i, group in enumerate(groups)}
+
+
+def image_stem(video_path):
+    return os.path.splitext(os.path.basename(video_path))[0].replace(' ', '_')
+
+
+# =========================================================
+# Worker: one video
+# =========================================================
+def extract_video(video_path, out_dir, splits, interval_s=FRAME_INTERVAL, image_size=IMAGE_SIZE,
+                  dedup_distance=DEDUP_DISTANCE, segment_s=SEGMENT_S):
+    """Write the kept frames of one video; returns {train, val, duplicates, decoded, seconds}."""
+    t0 = time.perf_counter()
+    info = probe(video_path)
+    source = open_source(video_path, training_size(info["width"], info["height"], image_size), ring_size=1)
+    keyframes = np.asarray(keyframe_indices(video_path) or [], dtype=np.int64)
+    counts = {"train": 0, "val": 0, "duplicates": 0, "decoded": 0}
+    kept_hashes = []
+    try:
+        for target in target_frames(info, interval_s):
+            # Seek when a keyframe lies between here and the target (or keyframes are unknown);
+            # otherwise skipping forward is cheaper than decoding from the previous keyframe again
+            between = keyframes[(keyframes > source.index) & (keyframes <= target)]
+            if target < source.index or not len(keyframes) or len(between):
+                source.seek(target)
+            while source.index < target:
+                success = source.read(decode=False)[0]
+                if not success:
+                    break
+            success, index, pts, frame = source.read()
+            if not success:
+                break
+            counts["decoded"] += 1
+
+            h = phash(frame)
+            if kept_hashes and hamming_distances(kept_hashes, h).min() <= dedup_distance:
+                counts["duplicates"] += 1
+                continue
+            kept_hashes.append(h)
+
+            subset = splits[(video_path, int(target / (info["fps"] or 1) // segment_s))]
+            cv2.imwrite(os.path.join(out_dir, "images", subset, f"{image_stem(video_path)}_{target:06d}.jpg"),
+                        frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+            counts[subset] += 1
+    finally:
+        source.close()
+    counts["seconds"] = time.perf_counter() - t0
+    return counts
+
+
+# =========================================================
+# Driver
+# =========================================================
+def write_data_yaml(out_dir):
+    yaml_content = f"path: {os.path.abspath(out_dir)}\ntrain: images/train\nval: images/val\nnames:\n"
     for i, c in enumerate(CLASSES):
         yaml_content += f"  {i}: {c}\n"
-
-    with open(f"{OUTPUT_DIR}/data.yaml", "w") as f:
+    with open(os.path.join(out_dir, "data.yaml"), "w") as f:
         f.write(yaml_content)
 
-    print(f"✅ Done! Created {saved} images in '{OUTPUT_DIR}' folder.")
+
+def main(inputs=(VIDEO_PATH,), out_dir=OUTPUT_DIR, interval_s=FRAME_INTERVAL, workers=2, image_size=IMAGE_SIZE,
+         dedup_distance=DEDUP_DISTANCE, val_fraction=VAL_FRACTION, segment_s=SEGMENT_S, seed=SEED, force=False):
+    videos = find_videos(inputs)
+    if not videos:
+        raise FileNotFoundError(f"No videos found in {list(inputs)}")
+    names = [image_stem(v) for v in videos]
+    if len(set(names)) != len(names):
+        raise ValueError("Several input videos share a file name; their images would overwrite each other.")
+
+    # 1. Reset Folders (never silently: the default folder holds the committed, hand-labelled dataset)
+    labels = glob.glob(os.path.join(out_dir, "labels", "**", "*.txt"), recursive=True)
+    if labels and not force:
+        raise FileExistsError(f"'{out_dir}' contains {len(labels)} label file(s) that would be deleted; "
+                              f"choose another --out or pass --force to recreate it.")
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    for p in ("images/train", "images/val", "labels/train", "labels/val"):
+        os.makedirs(os.path.join(out_dir, p), exist_ok=True)
+
+    # 2. Extract Frames (one video per worker)
+    infos = {v: probe(v) for v in videos}
+    splits = split_groups(videos, infos, val_fraction, segment_s, seed)
+    print(f"Extracting images from {len(videos)} video(s) on {workers} worker(s)...")
+    t0 = time.perf_counter()
+    totals = {"train": 0, "val": 0, "duplicates": 0, "decoded": 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {v: pool.submit(extract_video, v, out_dir, {g: s for g, s in splits.items() if g[0] == v},
+                                  interval_s, image_size, dedup_distance, segment_s) for v in videos}
+        for video, future in futures.items():
+            counts = future.result()
+            print(f"  {os.path.basename(video)}: {counts['train']} train / {counts['val']} val, "
+                  f"{counts['duplicates']} near-duplicates dropped ({counts['seconds']:.1f}s)")
+            for k in totals:
+                totals[k] += counts[k]
+
+    # 3. Create YAML file for YOLO
+    write_data_yaml(out_dir)
+
+    saved = totals["train"] + totals["val"]
+    print(f"✅ Done! Created {saved} images ({totals['train']} train / {totals['val']} val, "
+          f"{totals['duplicates']} near-duplicates dropped) in '{out_dir}' folder in "
+          f"{time.perf_counter() - t0:.1f}s.")
+    if not totals["val"]:
+        print("⚠️ No validation images: use more videos, a shorter --segment or a larger --val-fraction.")
+    return totals
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract deduplicated training frames from turnaround videos.")
+    parser.add_argument("inputs", nargs="*", default=[VIDEO_PATH], help="video files, directories or glob patterns")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="dataset folder (recreated)")
+    parser.add_argument("--force", action="store_true", help="recreate --out even if it contains labels")
+    parser.add_argument("--interval", type=float, default=FRAME_INTERVAL, help="seconds between extracted frames")
+    parser.add_argument("--workers", type=int, default=2, help="videos processed in parallel")
+    parser.add_argument("--image-size", type=int, default=IMAGE_SIZE, help="longest side of the written images")
+    parser.add_argument("--dedup-distance", type=int, default=DEDUP_DISTANCE,
+                        help="perceptual-hash bits within which a frame counts as a duplicate (-1 keeps all)")
+    parser.add_argument("--val-fraction", type=float, default=VAL_FRACTION)
+    parser.add_argument("--segment", type=float, default=SEGMENT_S, help="split group length in seconds")
+    parser.add_argument("--seed", type=int, default=SEED)
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(args.inputs, args.out, args.interval, args.workers, args.image_size, args.dedup_distance,
+         args.val_fraction, args.segment, args.seed, args.force)
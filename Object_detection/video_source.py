@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+import importlib.util
+
+import cv2
+import numpy as np
+
+# --- CONFIG ---
+RING_SIZE = 16  # decoded frames that may be in flight at once (queues + batch + display)
+DECODE_THREADS = 0  # PyAV codec threads, 0 = FFmpeg picks
+
+
+class FrameRing:
+    """
+    Fixed set of reused frame buffers. A slot is overwritten RING_SIZE frames later, unless the optional
+    `in_use(slot_index)` callback reports it as still held downstream: then a fresh array is handed out
+    instead (counted in `spilled`) and the slot is retried for the next frame.
+    """
+
+    def __init__(self, size, shape):
+        self.buffers = np.empty((size, *shape), dtype=np.uint8)
+        self.next = 0
+        self.in_use = None
+        self.spilled = 0
+
+    def slot(self):
+        if self.in_use is not None and self.in_use(self.next):
+            self.spilled += 1
+            return np.empty(self.buffers.shape[1:], dtype=np.uint8)
+        buf = self.buffers[self.next]
+        self.next = (self.next + 1) % len(self.buffers)
+        return buf
+
+    def index_of(self, frame):
+        """Slot index of a frame returned by slot(), None for any other array."""
+        offset = frame.__array_interface__['data'][0] - self.buffers.__array_interface__['data'][0]
+        index, rest = divmod(offset, self.buffers[0].nbytes)
+        return index if not rest and 0 <= index < len(self.buffers) and frame.shape == self.buffers.shape[1:] \
+            else None
+
+
+def _scaled_size(width, height, size):
+    """size = output width (keeps the aspect ratio) or (width, height); None keeps the source size."""
+    if size is None:
+        return width, height
+    if isinstance(size, int):
+        return size, int(round(height * size / width))
+    return tuple(size)
+
+
+class OpenCVSource:
+    """cv2.VideoCapture decoding straight into ring buffers (cap.read(image=...) reuses the array)."""
+
+    backend = 'opencv'
+
+    def __init__(self, path, size=None, ring_size=RING_SIZE):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Could not open video source: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        src_w, src_h = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.width, self.height = _scaled_size(src_w, src_h, size)
+        self.scale = (self.width, self.height) != (src_w, src_h)
+        # Full-size decode target when scaling; the scaled frame is resized into the ring slot
+        self.decode_buffer = np.empty((src_h, src_w, 3), dtype=np.uint8) if self.scale else None
+        self.ring = FrameRing(ring_size, (self.height, self.width, 3))
+        self.index = 0
+
+    def seek(self, frame_index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        self.index = frame_index
+
+    def read(self, decode=True):
+        """(success, index, pts seconds, frame or None). decode=False skips the frame cheaply."""
+        if not decode:
+            success, frame = self.cap.grab(), None
+        elif self.scale:
+            success, full = self.cap.read(self.decode_buffer)
+            frame = cv2.resize(full, (self.width, self.height), dst=self.ring.slot(),
+                               interpolation=cv2.INTER_AREA) if success else None
+        else:
+            slot = self.ring.slot()
+            success, frame = self.cap.read(slot)
+            if success and frame is not slot:
+                # The capture changed frame size (e.g. a stream renegotiated); fall back to its array
+                self.width, self.height = frame.shape[1], frame.shape[0]
+        if not success:
+            return False, self.index, None, None
+        pts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        self.index += 1
+        return True, self.index - 1, pts, frame
+
+    def close(self):
+        self.cap.release()
+
+
+class PyAVSource:
+    """
+    FFmpeg decoding through PyAV with codec threads and decoder-side scaling (swscale) to the target size.
+    swscale writes every frame into a new FFmpeg frame (frame.reformat allocates it; PyAV cannot scale
+    into a caller's buffer). Its BGR plane is read through a NumPy view and copied once into a ring slot,
+    so no extra NumPy array (to_ndarray) is made per frame.
+    """
+
+    backend = 'pyav'
+
+    def __init__(self, path, size=None, ring_size=RING_SIZE, threads=DECODE_THREADS):
+        import av
+        self.path = path
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = 'AUTO'
+        if threads:
+            self.stream.codec_context.thread_count = threads
+        self.fps = float(self.stream.average_rate or self.stream.guessed_rate or 0)
+        self.frame_count = self.stream.frames
+        ctx = self.stream.codec_context
+        self.width, self.height = _scaled_size(ctx.width, ctx.height, size)
+        self.ring = FrameRing(ring_size, (self.height, self.width, 3))
+        self.frames = self.container.decode(self.stream)
+        self.skip_until = None
+        self.index = 0
+
+    def seek(self, frame_index):
+        # Seek to the keyframe before the target, then decode forward to it
+        offset = int(frame_index / self.fps / self.stream.time_base) if self.fps else 0
+        self.container.seek(offset + (self.stream.start_time or 0), stream=self.stream, backward=True)
+        self.frames = self.container.decode(self.stream)
+        self.skip_until = frame_index
+        self.index = frame_index
+
+    def _frame_time(self, frame):
+        """Seconds since the stream's first frame (the container's start_time subtracted, as OpenCV does)."""
+        if frame.pts is None:
+            return None
+        return float((frame.pts - (self.stream.start_time or 0)) * self.stream.time_base)
+
+    def _next_frame(self):
+        for frame in self.frames:
+            if self.skip_until is not None:
+                seconds = self._frame_time(frame)
+                index = int(round(seconds * self.fps)) if seconds is not None else self.skip_until
+                if index < self.skip_until:
+                    continue
+                self.skip_until = None
+            return frame
+        return None
+
+    def read(self, decode=True):
+        frame = self._next_frame()
+        if frame is None:
+            return False, self.index, None, None
+        pts = self._frame_time(frame)
+        pts = pts if pts is not None else self.index / (self.fps or 1)
+        self.index += 1
+        if not decode:
+            return True, self.index - 1, pts, None
+
+        plane = frame.reformat(width=self.width, height=self.height, format='bgr24').planes[0]
+        # The plane rows may be padded (line_size >= width * 3); view them without copying
+        rows = np.frombuffer(plane, dtype=np.uint8).reshape(self.height, plane.line_size)
+        slot = self.ring.slot()
+        np.copyto(slot, rows[:, :self.width * 3].reshape(self.height, self.width, 3))
+        return True, self.index - 1, pts, slot
+
+    def close(self):
+        self.container.close()
+
+
+def keyframe_indices(video_path):
+    """Frame numbers of the keyframes, read from the container without decoding (needs PyAV), else None."""
+    try:
+        import av
+    except ImportError:
+        return None
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        fps = float(stream.average_rate or stream.guessed_rate or 0)
+        if not fps or stream.time_base is None:
+            return None
+        start = stream.start_time or 0
+        keyframes = [round(float((packet.pts - start) * stream.time_base) * fps)
+                     for packet in container.demux(stream) if packet.is_keyframe and packet.pts is not None]
+    return sorted(set(keyframes))
+
+
+def resolve_backend(backend='auto'):
+    """The decoder open_source() uses for `backend`: 'pyav' when it is installed (backend='auto'), else 'opencv'."""
+    if backend == 'auto':
+        return 'pyav' if importlib.util.find_spec('av') is not None else 'opencv'
+    return 'pyav' if backend == 'pyav' else 'opencv'
+
+
+def open_source(path, size=None, ring_size=RING_SIZE, backend='auto'):
+    """PyAV when it is installed (backend='auto'), otherwise OpenCV."""
+    if resolve_backend(backend) == 'pyav':
+        return PyAVSource(path, size, ring_size)
+    return OpenCVSource(path, size, ring_size)
@@ -2,9 +2,8 @@ import streamlit as st
 import traceback
 import sys
 import io
-import matplotlib.pyplot as plt
 import importlib
-import gc  # Garbage collection for memory management
+import time
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -21,8 +20,8 @@ if "current_page" not in st.session_state:
 if "bpmn_image" not in st.session_state:
     st.session_state.bpmn_image = None
 
-if "delay_model_results" not in st.session_state:
-    st.session_state.delay_model_results = {"run": False, "logs": "", "figures": []}
+if "delay_job_id" not in st.session_state:
+    st.session_state.delay_job_id = None
 
 
 def navigate_to(page_name):
@@ -39,9 +38,24 @@ def get_chatbot_agent():
 
 
 @st.cache_resource
-def load_yolo_model():
-    from ultralytics import YOLO
-    return YOLO('./Object_detection/best.pt')
+def get_delay_job_manager():
+    # One process pool per server, shared by every session
+    import delay_jobs
+    return delay_jobs.JobManager()
+
+
+@st.cache_resource
+def load_delay_artifact(path):
+    # Keyed by artifact path, so a freshly trained model version is picked up automatically
+    import delay_model
+    return delay_model.load_model_artifact(path)
+
+
+@st.cache_resource
+def get_monitor_service():
+    # One monitoring service per server, shared by every session; it pauses when nobody is watching
+    from Object_detection import monitor
+    return monitor.MonitorService(monitor.load_streams(), idle_timeout_s=monitor.IDLE_TIMEOUT_S).start()
 
 
 # =========================================================
@@ -122,6 +136,41 @@ def show_chatbot():
 # =========================================================
 # 🛡️ APP 2: DELAY ML
 # =========================================================
+def show_delay_scoring():
+    import pandas as pd
+    import delay_ml
+    import delay_model
+
+    st.subheader("⚡ Score Flights")
+    artifact_path = delay_model.latest_artifact_path()
+    if artifact_path is None:
+        st.info("No trained model yet - run the training below once to enable instant scoring.")
+        return
+
+    artifact = load_delay_artifact(artifact_path)
+    backend_label = delay_ml.MODEL_BACKENDS[artifact.get('backend', delay_ml.DEFAULT_BACKEND)]['label']
+    st.caption(f"{backend_label} · version {artifact['version']} · "
+               f"F1 (delayed) {artifact['metrics']['f1_delayed']:.3f} · "
+               f"trained on {artifact['metrics']['train_rows']:,} flights")
+
+    uploaded = st.file_uploader("Flights CSV (arrivals file format, ';'-separated)", type="csv")
+    if uploaded is None:
+        return
+
+    try:
+        flights = pd.read_csv(uploaded, sep=";", na_values="NA", low_memory=False)
+        scored = delay_model.predict_delay_risk(flights, artifact)
+    except Exception as e:
+        st.error(f"Scoring Error: {e}")
+        return
+
+    result = flights.join(scored).sort_values("delay_risk", ascending=False)
+    st.metric("Flights at risk", f"{int(result['predicted_delayed'].sum()):,} / {len(result):,}")
+    st.dataframe(result, use_container_width=True)
+    st.download_button("⬇️ Download scores", result.to_csv(index=False, sep=";"),
+                       file_name="delay_risk_scores.csv", mime="text/csv")
+
+
 def show_delay_model():
     st.button("← Back to Dashboard", on_click=navigate_to, args=("Home",))
     st.title("🛡️ Delay Risk Analysis")
@@ -130,159 +179,175 @@ def show_delay_model():
         import delay_ml
     except ImportError as e:
         st.error(f"❌ Import Error: {e}")
-        st.info("Did you add 'seaborn' to requirements.txt?")
+        st.info("Check that pandas, scikit-learn and pyarrow are in requirements.txt.")
         return
     except Exception as e:
         st.error(f"❌ Error loading 'delay_ml.py': {e}")
         return
 
-    # Check Cache
-    if st.session_state.delay_model_results["run"]:
-        st.success("Loaded from Cache")
-        st.code(st.session_state.delay_model_results["logs"])
-        for fig in st.session_state.delay_model_results["figures"]:
-            st.pyplot(fig)
-        if st.button("🔄 Re-run"):
-            st.session_state.delay_model_results = {"run": False, "logs": "", "figures": []}
-            st.rerun()
+    show_delay_scoring()
+    st.divider()
+    st.subheader("🧠 Model Training")
+
+    manager = get_delay_job_manager()
+
+    c1, c2 = st.columns([0.7, 0.3])
+    backend = c1.selectbox("Model backend", list(delay_ml.MODEL_BACKENDS),
+                           format_func=lambda b: delay_ml.MODEL_BACKENDS[b]['label'])
+    if c2.button("🚀 Run Model Training", use_container_width=True):
+        # Training runs in a worker process; this session only polls the job's files
+        st.session_state.delay_job_id = manager.submit(backend=backend)
+
+    jobs = manager.list_jobs()
+    if not jobs:
+        st.info("No training jobs yet.")
         return
 
-    if st.button("🚀 Run Model Training"):
-        captured_output = io.StringIO()
-        figures_captured = []
+    default_job = st.session_state.delay_job_id if st.session_state.delay_job_id in jobs else jobs[0]
+    job_id = st.selectbox("Training job (all users)", jobs, index=jobs.index(default_job))
+    show_delay_job(manager, job_id)
 
-        class StreamlitLogger:
-            def write(self, msg): captured_output.write(msg)
 
-            def flush(self): pass
+DELAY_JOB_POLL_S = 2
 
-        old_stdout = sys.stdout
-        sys.stdout = StreamlitLogger()
 
-        old_show = plt.show
+@st.cache_data(max_entries=20)
+def render_delay_report_pngs(job_id):
+    import delay_jobs
+    import delay_report
+    return delay_report.render_all_png(delay_jobs.read_job_report(job_id))
 
-        def new_show():
-            fig = plt.gcf()
-            st.pyplot(fig)
-            figures_captured.append(fig)
-            plt.figure()
 
-        plt.show = new_show
+def show_delay_job(manager, job_id):
+    import delay_jobs
 
-        try:
-            with st.spinner("Training..."):
-                importlib.reload(delay_ml)
-                delay_ml.main()
-
-            st.session_state.delay_model_results = {
-                "run": True,
-                "logs": captured_output.getvalue(),
-                "figures": figures_captured
-            }
-            st.success("Done!")
-        except Exception as e:
-            st.error(f"Runtime Error: {e}")
-            st.code(traceback.format_exc())
-        finally:
-            sys.stdout = old_stdout
-            plt.show = old_show
+    # Poll the job's files only while it can still change; a finished job is drawn once
+    active = (manager.status(job_id) or {}).get("state") in delay_jobs.ACTIVE_STATES
+    st.fragment(run_every=DELAY_JOB_POLL_S if active else None)(show_delay_job_status)(manager, job_id, active)
+
+
+def show_delay_job_status(manager, job_id, polling):
+    import delay_jobs
+
+    status = manager.status(job_id) or {}
+    state = status.get("state", "unknown")
+    if polling and state not in delay_jobs.ACTIVE_STATES:
+        st.rerun()  # the job just finished: redraw the page once more, without the poll timer
+    params = status.get("params", {})
+    st.markdown(f"**Job `{job_id}`** · {params.get('backend', '')} · state: **{state}**")
+
+    if state in ("queued", "running"):
+        step = manager.progress(job_id)
+        st.info(f"⏳ {step or 'Waiting for a free worker...'}")
+    elif state == "done":
+        st.success("Done!")
+    elif state in ("failed", "lost"):
+        st.error(f"Runtime Error: {status.get('error', 'job did not finish')}")
+
+    report = delay_jobs.read_job_report(job_id)
+    if report is not None:
+        delayed = report["per_class"]["Delayed"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Accuracy", f"{report['accuracy']:.3f}")
+        m2.metric("Recall (delayed)", f"{delayed['recall']:.3f}")
+        m3.metric("F1 (delayed)", f"{delayed['f1']:.3f}")
+        m4.metric("Fit time", f"{report['timing_s'].get('fit', 0):.1f}s")
+
+        # Plots are rendered on request, once per job, and kept as PNG bytes
+        if st.toggle("Show plots", key=f"plots_{job_id}"):
+            for png in render_delay_report_pngs(job_id).values():
+                st.image(png)
+
+    with st.expander("Log", expanded=report is None):
+        st.code(delay_jobs.read_log(job_id) or "(no output yet)")
 
 
 # =========================================================
 # 👁️ APP 3: VISION (Optimized)
 # =========================================================
+STATUS_ICONS = {"pending": ("⬜", "grey"), "active": ("🟡", "orange"), "done": ("✅", "green")}
+VISION_STATS_INTERVAL_S = 5.0
+
+
+def vision_status_text(state):
+    from Object_detection.phases import format_seconds
+
+    status_text = ""
+    for p, info in state["timeline"].items():
+        icon, color = STATUS_ICONS[info["status"]]
+        times = f" {format_seconds(info['start'])}–{format_seconds(info['end'])}" if info["start"] is not None else ""
+        status_text += f":{color}[{icon} **{p}**{times}]\n\n"
+    vehicles = " · ".join(f"{n} × {label}" for label, n in state["vehicles"].items())
+    return status_text + f"🚚 {vehicles}"
+
+
 def show_vision_app():
     st.button("← Back to Dashboard", on_click=navigate_to, args=("Home",))
     st.title("GroundTruth Vision Analysis")
 
     try:
-        import cv2
+        import cv2  # noqa: F401  (checks that OpenCV and its system libraries load)
     except ImportError as e:
         st.error("❌ Library Import Error")
         st.code(f"Error details: {e}")
         st.info("Make sure 'packages.txt' exists with 'libgl1' inside.")
         return
 
-    col_vid, col_stat = st.columns([0.7, 0.3])
     if "vision_active" not in st.session_state: st.session_state.vision_active = False
+    c1, c2 = st.columns(2)
+    if c1.button("▶️ Start"): st.session_state.vision_active = True
+    if c2.button("⏹️ Stop"): st.session_state.vision_active = False
+    if not st.session_state.vision_active:
+        return
 
-    with col_vid:
-        c1, c2 = st.columns(2)
-        if c1.button("▶️ Start"): st.session_state.vision_active = True
-        if c2.button("⏹️ Stop"): st.session_state.vision_active = False
-        st_frame = st.empty()
-
-    # STATUS PLACEHOLDER (Outside loop to prevent spam)
-    with col_stat:
-        st.subheader("Live Phase Detection")
-        status_placeholder = st.empty()
+    from Object_detection import monitor
 
-    if st.session_state.vision_active:
-        try:
-            model = load_yolo_model()
-            video_path = './Object_detection/turnaround clip.mp4'
-            cap = cv2.VideoCapture(video_path)
-
-            if not cap.isOpened():
-                st.error(f"❌ Could not find video at: {video_path}")
-                st.session_state.vision_active = False
-                return
-
-            phases = {"DEBOARDING": False, "CLEANING": False, "BOARDING": False, "LUGGAGE": False}
-            count = 0
-            frame_counter = 0
-
-            while st.session_state.vision_active and cap.isOpened():
-                success, frame = cap.read()
-                if not success:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Loop video
-                    continue
-
-                # OPTIMIZATION: Skip frames for speed
-                frame_counter += 1
-                if frame_counter % 3 != 0:
-                    continue
-
-                # OPTIMIZATION: Resize frame to 640px width
-                h, w = frame.shape[:2]
-                new_w = 640
-                new_h = int(h * (new_w / w))
-                frame = cv2.resize(frame, (new_w, new_h))
-
-                results = model(frame, verbose=False)
-                detected = [model.names[int(b.cls[0])] for b in results[0].boxes]
-
-                if "cleaning_crew_vehicle" in detected:
-                    count += 1
-                    phases["CLEANING"] = True
-                if "luggage_vehicle" in detected: phases["LUGGAGE"] = True
-                if "bridge_connected" in detected:
-                    if count < 10:
-                        phases["DEBOARDING"] = True
-                    else:
-                        phases["BOARDING"] = True
-
-                frame_rgb = cv2.cvtColor(results[0].plot(), cv2.COLOR_BGR2RGB)
-                st_frame.image(frame_rgb, use_container_width=True)
-
-                # UPDATE STATUS (Replace text, don't append)
-                status_text = ""
-                for p, active in phases.items():
-                    icon = "✅" if active else "⬜"
-                    color = "green" if active else "grey"
-                    status_text += f":{color}[{icon} **{p}**]\n\n"
-
-                status_placeholder.markdown(status_text)
-
-                # Memory cleanup
-                if frame_counter % 50 == 0:
-                    gc.collect()
-
-            cap.release()
-        except Exception as e:
-            st.error(f"Runtime Error: {e}")
-            st.code(traceback.format_exc())
-            st.session_state.vision_active = False
+    # The page only reads the stand state; decoding and YOLO run in the monitor service. Frames are pushed
+    # at most DISPLAY_FPS times a second and only when new, the phase status only when it changed.
+    placeholders, pushed = {}, {}
+    try:
+        while st.session_state.vision_active:
+            # A running standalone monitor (python -m Object_detection.monitor) takes precedence
+            stands = monitor.read_published_state()
+            if stands is None:
+                service = get_monitor_service()
+                service.touch()
+                stands = service.snapshot()
+
+            now = time.monotonic()
+            for stand, state in stands.items():
+                if stand not in placeholders:
+                    st.subheader(stand)
+                    col_vid, col_stat = st.columns([0.7, 0.3])
+                    placeholders[stand] = (col_vid.empty(), col_stat.empty(), col_stat.empty())
+                    pushed[stand] = {"frame_seq": None, "status": None, "stats_at": 0.0}
+                frame_slot, status_slot, stats_slot = placeholders[stand]
+                sent = pushed[stand]
+
+                if state["frame_seq"] != sent["frame_seq"]:
+                    jpeg = monitor.frame_jpeg(state)
+                    if jpeg is not None:
+                        frame_slot.image(jpeg, use_container_width=True)
+                        sent["frame_seq"] = state["frame_seq"]
+                elif state["error"] and sent["frame_seq"] is None:
+                    frame_slot.error(f"Runtime Error: {state['error']}")
+
+                status_text = vision_status_text(state)
+                if status_text != sent["status"]:
+                    status_slot.markdown(status_text)
+                    sent["status"] = status_text
+
+                if now - sent["stats_at"] >= VISION_STATS_INTERVAL_S:
+                    floor = " ⚠️ below FPS floor" if state["below_fps_floor"] else ""
+                    stats_slot.caption(f"⏱️ {state['fps']:.1f} FPS | {state['inference_fps']:.1f} inferences/s | "
+                                       f"dropped {state['dropped']}{floor}")
+                    sent["stats_at"] = now
+
+            time.sleep(1 / monitor.DISPLAY_FPS)
+    except Exception as e:
+        st.error(f"Runtime Error: {e}")
+        st.code(traceback.format_exc())
+        st.session_state.vision_active = False
 
 
 # =========================================================
@@ -301,6 +366,8 @@ def show_bpmn_app():
         return
 
     if st.button("📐 Generate Diagram"):
+        # pyplot (and its backend) is only loaded when a diagram is drawn
+        import matplotlib.pyplot as plt
         original_show = plt.show
         try:
             def save_as_image():
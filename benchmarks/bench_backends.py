@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compare delay_ml model backends on the same stratified 80/20 split:
+training time, model size on disk, prediction throughput and delayed-class recall.
+
+Usage (from the folder containing merged_arrivals_cleand.csv):
+    python benchmarks/bench_backends.py
+"""
+import io
+import os
+import sys
+import time
+
+import joblib
+from sklearn.metrics import f1_score, recall_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import delay_ml  # noqa: E402
+import delay_store  # noqa: E402
+
+
+def model_size_mb(model):
+    buf = io.BytesIO()
+    joblib.dump(model, buf, compress=3)
+    return buf.tell() / 1e6
+
+
+def main():
+    df_model, _ = delay_ml.load_model_frame_full(delay_store.SOURCE_FILE)
+    df_train, df_test = train_test_split(df_model, test_size=0.2, random_state=42,
+                                         stratify=df_model[delay_ml.TARGET_VAR])
+    y_train = df_train[delay_ml.TARGET_VAR].to_numpy()
+    y_test = df_test[delay_ml.TARGET_VAR].to_numpy()
+
+    print(f"\n{'backend':<28} {'train [s]':>10} {'size [MB]':>10} {'predict rows/s':>15} "
+          f"{'recall delayed':>15} {'F1 delayed':>11}")
+    for backend, spec in delay_ml.MODEL_BACKENDS.items():
+        encoder = delay_ml.make_encoder(backend)
+        X_train = encoder.fit_transform(df_train)
+        X_test = encoder.transform(df_test)
+
+        model = delay_ml.make_model(backend, encoder)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        t_train = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        y_pred = model.predict(X_test)
+        throughput = len(y_test) / (time.perf_counter() - t0)
+
+        print(f"{spec['label']:<28} {t_train:>10.1f} {model_size_mb(model):>10.2f} {throughput:>15,.0f} "
+              f"{recall_score(y_test, y_pred, pos_label=1):>15.3f} {f1_score(y_test, y_pred, pos_label=1):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
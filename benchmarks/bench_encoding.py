@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare the dense pd.get_dummies path against DelayFeatureEncoder (sparse one-hot and ordinal):
+encoding time, feature matrix memory, Random Forest fit time and delayed-class F1.
+
+Usage (from the folder containing merged_arrivals_cleand.csv):
+    python benchmarks/bench_encoding.py [--n-estimators N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import delay_ml  # noqa: E402
+import delay_store  # noqa: E402
+
+
+def matrix_mb(X):
+    if hasattr(X, 'indptr'):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1e6
+    if isinstance(X, pd.DataFrame):
+        return X.memory_usage(deep=True).sum() / 1e6
+    return X.nbytes / 1e6
+
+
+def encode_dummies(df_train, df_test):
+    # The original delay_ml path: fill, then dense one-hot over the full frame
+    df = pd.concat([df_train, df_test])
+    for col in delay_ml.FEATURES_NUMERIC:
+        df[col] = df[col].fillna(df_train[col].median())
+    for col in delay_ml.FEATURES_CATEGORICAL:
+        df[col] = df[col].astype(object).fillna('Unbekannt')
+    X_cat = pd.get_dummies(df[delay_ml.FEATURES_CATEGORICAL], drop_first=True)
+    X = pd.concat([df[delay_ml.FEATURES_NUMERIC], X_cat], axis=1)
+    return X.iloc[:len(df_train)], X.iloc[len(df_train):]
+
+
+def encode_with(output):
+    def encode(df_train, df_test):
+        encoder = delay_ml.DelayFeatureEncoder(output=output)
+        return encoder.fit_transform(df_train), encoder.transform(df_test)
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-estimators", type=int, default=100)
+    args = parser.parse_args()
+
+    df_model, _ = delay_ml.load_model_frame_full(delay_store.SOURCE_FILE)
+    df_train, df_test = train_test_split(df_model, test_size=0.2, random_state=42,
+                                         stratify=df_model[delay_ml.TARGET_VAR])
+    y_train = df_train[delay_ml.TARGET_VAR].to_numpy()
+    y_test = df_test[delay_ml.TARGET_VAR].to_numpy()
+
+    paths = {
+        "get_dummies (dense)": encode_dummies,
+        "encoder sparse": encode_with('sparse'),
+        "encoder ordinal": encode_with('ordinal'),
+    }
+
+    print(f"\n{'path':<22} {'cols':>6} {'encode [s]':>11} {'enc peak [MB]':>14} "
+          f"{'X_train [MB]':>13} {'fit [s]':>9} {'F1 delayed':>11}")
+    for name, encode in paths.items():
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        X_train, X_test = encode(df_train, df_test)
+        t_encode = time.perf_counter() - t0
+        _, enc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        model = RandomForestClassifier(n_estimators=args.n_estimators, random_state=42,
+                                       class_weight='balanced', n_jobs=-1)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        t_fit = time.perf_counter() - t0
+        f1 = f1_score(y_test, model.predict(X_test), pos_label=1)
+
+        print(f"{name:<22} {X_train.shape[1]:>6} {t_encode:>11.2f} {enc_peak / 1e6:>14.1f} "
+              f"{matrix_mb(X_train):>13.1f} {t_fit:>9.1f} {f1:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
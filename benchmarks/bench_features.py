@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the delay_features pipeline on synthetic typed arrivals
+(pandas and Arrow input), reporting rows/s and features/s.
+
+Usage:
+    python benchmarks/bench_features.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import delay_features  # noqa: E402
+
+
+def synthetic_arrivals(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    sta = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365 * 24 * 60, n_rows), unit='min')
+    df = pd.DataFrame({
+        'STA_dt': sta,
+        'SDT_dt': sta - pd.to_timedelta(rng.integers(40, 600, n_rows), unit='min'),
+        'DLY_min': rng.normal(5, 25, n_rows).round(),
+        'PAX': rng.integers(20, 300, n_rows).astype(float),
+        'FLC': rng.choice([f'L{i}' for i in range(40)], n_rows),
+        'ORG': rng.choice([f'A{i}' for i in range(400)], n_rows),
+        'TYP': rng.choice([f'T{i}' for i in range(80)], n_rows),
+        'NAT': rng.choice(['J', 'C', 'P'], n_rows),
+        'TER': rng.choice(['1', '2'], n_rows),
+    })
+    for col in delay_features.FEATURES_CATEGORICAL:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def run(label, fn, n_rows, repeats=3):
+    best = min(_timed(fn) for _ in range(repeats))
+    n_features = len(delay_features.FEATURES_NUMERIC) + len(delay_features.FEATURES_CATEGORICAL)
+    print(f"{label:<34} {best:>8.2f}s {n_rows / best:>14,.0f} rows/s {n_rows * n_features / best:>16,.0f} features/s")
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_arrivals(args.rows)
+    print(f"{args.rows:,} synthetic rows\n")
+
+    run("build_model_frame (pandas)", lambda: delay_features.build_model_frame(df), args.rows)
+
+    history = delay_features.DelayHistory()
+    df_model = delay_features.build_model_frame(df, history)
+    run("build_features w/ history (scoring)", lambda: delay_features.build_features(df, history), args.rows)
+    run("build_features w/o history", lambda: delay_features.build_features(df), args.rows)
+
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        run("build_model_frame (Arrow table)", lambda: delay_features.build_model_frame(table), args.rows)
+    except ImportError:
+        print("pyarrow not installed - skipping Arrow input")
+
+    encoder = delay_features.DelayFeatureEncoder()
+    encoder.fit(df_model)
+    run("encoder.transform (ordinal)", lambda: encoder.transform(df_model), args.rows)
+
+
+if __name__ == "__main__":
+    main()
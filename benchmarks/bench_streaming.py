@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compare full vs. streaming training of delay_ml on the arrivals file.
+Each mode runs in its own process so peak RSS is measured independently.
+
+Usage (from the folder containing merged_arrivals_cleand.csv):
+    python benchmarks/bench_streaming.py [--chunksize N] [--sample-size N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DELAY_ML = os.path.join(REPO_ROOT, "delay_ml.py")
+
+
+def run_mode(extra_args):
+    env = dict(os.environ, MPLBACKEND="Agg")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, DELAY_ML] + extra_args,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+    output = proc.stdout.read()
+    # wait4 gives the rusage of this child only (RUSAGE_CHILDREN would be cumulative)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    rows = 0
+    for line in output.splitlines():
+        if line.startswith("⏱️ Mode:"):
+            rows = int(line.split("rows read:")[1].split("|")[0].strip().replace(",", ""))
+    return proc.returncode, elapsed, usage.ru_maxrss / 1024, rows, output
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--sample-size", type=int, default=500_000)
+    args = parser.parse_args()
+
+    modes = {
+        "full": [],
+        "stream": ["--stream", "--chunksize", str(args.chunksize), "--sample-size", str(args.sample_size)],
+    }
+
+    print(f"{'mode':<8} {'rows':>12} {'wall [s]':>10} {'rows/s':>12} {'peak RSS [MB]':>14}")
+    for name, extra in modes.items():
+        code, elapsed, rss_mb, rows, output = run_mode(extra)
+        if code != 0:
+            print(f"❌ {name} failed:\n{output}")
+            continue
+        print(f"{name:<8} {rows:>12,} {elapsed:>10.1f} {rows / elapsed:>12,.0f} {rss_mb:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
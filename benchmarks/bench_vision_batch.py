@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+YOLO inference throughput on CPU at different batch sizes, on the first frames of the turnaround clip.
+Decoding is done up front, so only inference is timed.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_batch.py [--frames 128] [--batch-sizes 1 4 8 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+
+
+def read_frames(video_path, n_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < n_frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise FileNotFoundError(f"No frames read from {video_path} (is the Git LFS file checked out?)")
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--weights", default=None, help="default: model of the selected runtime")
+    parser.add_argument("--runtime", choices=["auto", *detector.RUNTIMES], default=detector.RUNTIME)
+    parser.add_argument("--frames", type=int, default=128)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    model = detector.load_model(args.weights, args.runtime)
+    detector.predict(model, frames[:1])  # warm-up (lazy init, first-call allocations)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} on CPU, runtime {model.runtime}\n")
+
+    print(f"{'batch size':>10} {'frames/s':>10} {'ms/frame':>10} {'speed-up':>10}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        t0 = time.perf_counter()
+        n_results = 0
+        for start in range(0, len(frames), batch_size):
+            n_results += len(detector.predict(model, frames[start:start + batch_size]))
+        elapsed = time.perf_counter() - t0
+        assert n_results == len(frames)
+
+        fps = len(frames) / elapsed
+        baseline = baseline or fps
+        print(f"{batch_size:>10} {fps:>10.1f} {elapsed / len(frames) * 1000:>10.1f} {fps / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Decode-only throughput and per-frame allocations of the video sources, against the original
+read -> resize -> cvtColor loop, on the turnaround clip scaled to the 640 px display width.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_decode.py [--frames 500] [--width 640]
+
+Allocations are the peak of newly allocated (traced) memory while producing one frame.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+from Object_detection.video_source import OpenCVSource, PyAVSource  # noqa: E402
+
+
+def original_loop(video_path, width):
+    """The loop the vision page used to run: every step allocates a new array."""
+    cap = cv2.VideoCapture(video_path)
+
+    def read():
+        success, frame = cap.read()
+        if not success:
+            return None
+        h, w = frame.shape[:2]
+        frame = cv2.resize(frame, (width, int(h * (width / w))))
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return read, cap.release
+
+
+def source_loop(source_cls):
+    def make(video_path, width):
+        source = source_cls(video_path, size=width)
+        return (lambda: source.read()[3]), source.close
+    return make
+
+
+def measure(make, video_path, width, n_frames):
+    read, close = make(video_path, width)
+    read()  # open / first-frame costs are not what we compare
+    t0 = time.perf_counter()
+    frames = 0
+    while frames < n_frames and read() is not None:
+        frames += 1
+    fps = frames / (time.perf_counter() - t0)
+    close()
+
+    # Second pass under tracemalloc (slower, so it is not timed)
+    read, close = make(video_path, width)
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(n_frames, 100)):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame = read()
+        if frame is None:
+            break
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        del frame
+    tracemalloc.stop()
+    close()
+    return fps, float(np.mean(peaks)) / 1e6 if peaks else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--width", type=int, default=detector.DISPLAY_WIDTH)
+    args = parser.parse_args()
+
+    modes = {"original loop": original_loop, "OpenCV ring": source_loop(OpenCVSource)}
+    if importlib.util.find_spec('av') is not None:
+        modes["PyAV ring"] = source_loop(PyAVSource)
+    else:
+        print("PyAV not installed - skipping the PyAV source")
+
+    print(f"\n{'decoder':<15} {'frames/s':>10} {'alloc MB/frame':>15}")
+    for name, make in modes.items():
+        fps, mb = measure(make, args.video, args.width, args.frames)
+        print(f"{name:<15} {fps:>10.1f} {mb:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
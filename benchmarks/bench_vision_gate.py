@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Scene-change gating vs. running YOLO on every frame of the turnaround clip:
+inferences saved, wall time, and how far the phase start / end times move.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_gate.py [--threshold 3.0] [--max-interval 1.0]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+from Object_detection.frame_gate import SceneChangeGate  # noqa: E402
+from Object_detection.phases import TurnaroundPhases  # noqa: E402
+from Object_detection.pipeline import VisionPipeline, format_stats  # noqa: E402
+
+
+def run(video_path, model, gate):
+    """Phase timeline, wall time and pipeline stats for one pass."""
+    phases = TurnaroundPhases()
+    t0 = time.perf_counter()
+    with VisionPipeline(video_path, infer=lambda frames: detector.predict(model, frames), live=False,
+                        batch_size=detector.BATCH_SIZE, gate=gate) as pipeline:
+        for packet in pipeline:
+            phases.update(detector.detected_labels(packet["result"], model.names), packet["pts"])
+        stats = pipeline.stats()
+    return phases.timeline(), time.perf_counter() - t0, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--threshold", type=float, default=SceneChangeGate().threshold)
+    parser.add_argument("--max-interval", type=float, default=SceneChangeGate().max_interval_s)
+    args = parser.parse_args()
+
+    model = detector.load_model()
+    full, t_full, stats_full = run(args.video, model, gate=None)
+    print(f"Every frame: {t_full:.1f}s | {format_stats(stats_full)}")
+    gated, t_gated, stats_gated = run(args.video, model, SceneChangeGate(args.threshold, args.max_interval))
+    print(f"Gated:       {t_gated:.1f}s | {format_stats(stats_gated)}")
+
+    def fmt(seconds):
+        return f"{seconds:.1f}s" if seconds is not None else "-"
+
+    print(f"\n{'phase':<12} {'start (all)':>11} {'start (gate)':>12} {'end (all)':>10} {'end (gate)':>11}")
+    for phase in full:
+        a, g = full[phase], gated[phase]
+        print(f"{phase:<12} {fmt(a['start']):>11} {fmt(g['start']):>12} {fmt(a['end']):>10} {fmt(g['end']):>11}")
+
+
+if __name__ == "__main__":
+    main()
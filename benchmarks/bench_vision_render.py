@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Display cost per frame on the turnaround clip: Ultralytics' result.plot() (or a frame copy plus cv2 drawing
+when Ultralytics results are not at hand) against the in-place box renderer, each followed by the
+JPEG encode that goes to the page, and the bytes sent per second of video with and without the display cap.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_render.py [--frames 300]
+
+Boxes come from the detection cache when the clip was analysed before, else from one YOLO pass.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, monitor  # noqa: E402
+from Object_detection.detection_cache import DetectionCache  # noqa: E402
+from Object_detection.pipeline import VisionPipeline  # noqa: E402
+
+
+def copy_and_draw(frame, result, names):
+    """The previous renderer for ROI / cached detections: draw on a copy with cv2.rectangle."""
+    image = frame.copy()
+    for (x1, y1, x2, y2), c, conf in zip(*detector.boxes_of(result)):
+        cv2.rectangle(image, (int(x1), int(y1)), (int(x2), int(y2)), (0, 200, 255), 2)
+        cv2.putText(image, f"{names[int(c)]} {conf:.2f}", (int(x1), max(int(y1) - 5, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 255), 1, cv2.LINE_AA)
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    model = detector.load_model()
+    packets = []
+    with VisionPipeline(args.video, infer=lambda fs: detector.predict(model, fs), live=False,
+                        batch_size=detector.BATCH_SIZE, decode_size=detector.DISPLAY_WIDTH,
+                        cache=DetectionCache(args.video, model, decode_size=detector.DISPLAY_WIDTH)) as pipeline:
+        for packet in pipeline:
+            packets.append((packet["pts"], packet["frame"].copy(), packet["result"]))
+            if len(packets) >= args.frames:
+                break
+    fps = len(packets) / (packets[-1][0] - packets[0][0]) if len(packets) > 1 else 25.0
+
+    renderers = {"copy + cv2": lambda frame, result: copy_and_draw(frame, result, model.names),
+                 "in place": lambda frame, result: detector.annotate(result, frame, model.names)}
+    if not isinstance(packets[0][2], detector.Detections):
+        renderers = {"result.plot()": lambda frame, result: result.plot(), **renderers}
+
+    print(f"\n{'renderer':<14} {'draw ms':>8} {'encode ms':>10} {'KB/frame':>9}")
+    jpeg_kb = 0.0
+    for name, render in renderers.items():
+        draw_s, encode_s, size = 0.0, 0.0, 0
+        for _, frame, result in packets:
+            t0 = time.perf_counter()
+            image = render(frame, result)
+            t1 = time.perf_counter()
+            size += len(cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, monitor.JPEG_QUALITY])[1])
+            encode_s += time.perf_counter() - t1
+            draw_s += t1 - t0
+        jpeg_kb = size / len(packets) / 1024
+        print(f"{name:<14} {draw_s / len(packets) * 1000:>8.2f} {encode_s / len(packets) * 1000:>10.2f} "
+              f"{jpeg_kb:>9.1f}")
+
+    print(f"\nPage traffic: every frame ({fps:.0f} fps) {fps * jpeg_kb:,.0f} KB/s | "
+          f"capped at {monitor.DISPLAY_FPS:.0f} fps {monitor.DISPLAY_FPS * jpeg_kb:,.0f} KB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Full-frame vs. stand-ROI inference: ms/frame on the turnaround clip and mAP50 on the val split.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_roi.py [--roi 0.3 0.2 1.0 1.0] [--frames 200]
+
+Without --roi the clip camera's ROIs from Object_detection/stand_rois.json are used.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector, roi  # noqa: E402
+from Object_detection.tracker import iou_matrix  # noqa: E402
+
+VAL_IMAGES = os.path.join(detector.BASE_DIR, 'dataset', 'images', 'val')
+VAL_LABELS = os.path.join(detector.BASE_DIR, 'dataset', 'labels', 'val')
+
+
+def load_labels(image_path, shape):
+    """YOLO label file (class cx cy w h, normalised) -> (xyxy pixels, class ids)."""
+    name = os.path.splitext(os.path.basename(image_path))[0] + '.txt'
+    path = os.path.join(VAL_LABELS, name)
+    rows = np.loadtxt(path, ndmin=2) if os.path.exists(path) and os.path.getsize(path) else np.zeros((0, 5))
+    h, w = shape[:2]
+    cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+    return np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1), rows[:, 0].astype(int)
+
+
+def map50(predictions, ground_truth, n_classes):
+    """Mean over classes of the all-point interpolated AP at IoU 0.5."""
+    aps = []
+    for c in range(n_classes):
+        scored, n_gt = [], 0
+        for (p_xyxy, p_cls, p_conf), (g_xyxy, g_cls) in zip(predictions, ground_truth):
+            p_xyxy, p_conf, g_xyxy = p_xyxy[p_cls == c], p_conf[p_cls == c], g_xyxy[g_cls == c]
+            n_gt += len(g_xyxy)
+            iou = iou_matrix(p_xyxy, g_xyxy)
+            taken = np.zeros(len(g_xyxy), dtype=bool)
+            for i in np.argsort(-p_conf):
+                j = int(np.argmax(iou[i])) if len(g_xyxy) else -1
+                hit = j >= 0 and iou[i, j] >= 0.5 and not taken[j]
+                if hit:
+                    taken[j] = True
+                scored.append((p_conf[i], hit))
+        if n_gt == 0:
+            continue
+        scored.sort(key=lambda s: -s[0])
+        hits = np.array([h for _, h in scored], dtype=float)
+        recall = np.concatenate([[0], np.cumsum(hits) / n_gt, [1]])
+        precision = np.concatenate([[1], np.cumsum(hits) / np.maximum(np.arange(1, len(hits) + 1), 1), [0]])
+        precision = np.maximum.accumulate(precision[::-1])[::-1]
+        aps.append(float(np.sum(np.diff(recall) * precision[1:])))
+    return float(np.mean(aps)) if aps else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--roi", type=float, nargs=4, action="append", metavar=("X1", "Y1", "X2", "Y2"),
+                        help="ROI as fractions of the frame (repeat for several)")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    rois = args.roi or roi.load_rois(roi.camera_name(args.video))
+    if not rois:
+        sys.exit("No ROI given and none configured for this camera in stand_rois.json")
+
+    model = detector.load_model()
+    modes = {"full frame": lambda frames: detector.predict(model, frames),
+             "ROI": roi.roi_predictor(model, rois, max_batch=1)}
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while len(frames) < args.frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+
+    images = sorted(glob.glob(os.path.join(VAL_IMAGES, '*.jpg')))
+    ground_truth = [load_labels(p, cv2.imread(p).shape) for p in images]
+
+    print(f"ROIs {rois} | {len(frames)} clip frames | {len(images)} val images\n")
+    print(f"{'mode':<12} {'ms/frame':>9} {'mAP50 (val)':>12}")
+    for name, predict in modes.items():
+        predict(frames[:1])  # warm-up
+        t0 = time.perf_counter()
+        for frame in frames:
+            predict([frame])
+        ms = (time.perf_counter() - t0) / max(len(frames), 1) * 1000
+
+        predictions = [detector.boxes_of(predict([cv2.imread(p)])[0]) for p in images]
+        print(f"{name:<12} {ms:>9.1f} {map50(predictions, ground_truth, len(model.names)):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Cost and benefit of the vehicle tracker on the turnaround clip:
+tracker ms/frame, and how vehicle counts / dwell times hold up when YOLO only runs on every n-th frame
+(tracks are propagated in between) compared with detecting on every frame.
+
+Usage (from the repository root):
+    python benchmarks/bench_vision_tracking.py [--intervals 1 2 3 5 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Object_detection import detector  # noqa: E402
+from Object_detection.pipeline import VisionPipeline  # noqa: E402
+from Object_detection.tracker import tracker_for  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=detector.VIDEO_PATH)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 2, 3, 5, 10])
+    args = parser.parse_args()
+
+    # Detect once on every frame; keyframe-only runs replay a subset of these detections
+    model = detector.load_model()
+    frames = []
+    t0 = time.perf_counter()
+    with VisionPipeline(args.video, infer=lambda fs: detector.predict(model, fs), live=False,
+                        batch_size=detector.BATCH_SIZE) as pipeline:
+        for packet in pipeline:
+            frames.append((packet["pts"], *detector.boxes_of(packet["result"])[:2]))
+    infer_ms = (time.perf_counter() - t0) / len(frames) * 1000
+    print(f"{len(frames):,} frames, detection + decode {infer_ms:.1f} ms/frame\n")
+
+    print(f"{'keyframe every':>14} {'inferences saved':>17} {'tracker ms/frame':>17} {'vehicles':>9} "
+          f"{'mean dwell [s]':>15}")
+    for interval in args.intervals:
+        tracker = tracker_for(model.names)
+        times = []
+        for i, (pts, xyxy, cls) in enumerate(frames):
+            t0 = time.perf_counter()
+            if i % interval == 0:
+                tracker.update(xyxy, cls, pts)
+            else:
+                tracker.predict(pts)
+            times.append(time.perf_counter() - t0)
+        vehicles = tracker.vehicles()
+        dwell = np.mean([v["dwell_s"] for v in vehicles]) if vehicles else 0.0
+        print(f"{interval:>14} {1 - 1 / interval:>16.0%} {np.mean(times) * 1000:>17.3f} {len(vehicles):>9} "
+              f"{dwell:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
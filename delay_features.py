@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# --- CONFIG ---
+# Define Target: "Delayed" defined as > 15 minutes
+DELAY_THRESHOLD = 15
+TARGET_VAR = 'Ist_Verspaetet'
+
+# Rolling delay rates per airline / origin over the previous N days (the flight's own day excluded)
+ROLLING_GROUP_COLS = ['FLC', 'ORG']
+ROLLING_WINDOW_DAYS = 28
+ROLLING_PRIOR_FLIGHTS = 20  # shrink small groups towards the overall rate
+
+FEATURES_NUMERIC = [
+    'Geplant_Ankunft_Stunde',
+    'Geplant_Ankunft_TagDerWoche',
+    'Geplant_Ankunft_Monat',
+    'Geplante_Flugdauer_Min',
+    'PAX',
+] + [f'{col}_Verspaetungsrate_{ROLLING_WINDOW_DAYS}T' for col in ROLLING_GROUP_COLS]
+
+FEATURES_CATEGORICAL = [
+    'FLC',  # Airline
+    'ORG',  # Origin Airport
+    'TYP',  # Aircraft Type
+    'NAT',  # Flight Nature
+    'TER'  # Terminal
+]
+
+# Values of any categorical column (airline, airport, aircraft type, ...) seen fewer times than this
+# share one "other" column / code per feature
+MIN_CATEGORY_FREQUENCY = 20
+# 'ordinal' (one code column per category) or 'sparse' (CSR one-hot); see benchmarks/bench_encoding.py
+ENCODER_OUTPUT = 'ordinal'
+
+FILL_VALUE = 'Unbekannt'
+_DAY_SPAN = 1 << 24  # > any day number, used to build (group, day) sort keys
+
+
+def as_frame(batch):
+    """Accept a pandas DataFrame or an Arrow Table / RecordBatch."""
+    if pa is not None and isinstance(batch, (pa.Table, pa.RecordBatch)):
+        return batch.to_pandas()
+    return batch
+
+
+def _day_numbers(sta_dt):
+    return sta_dt.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def _group_keys(s):
+    return s.astype(object).where(s.notna(), FILL_VALUE).to_numpy()
+
+
+# =========================================================
+# Rolling delay history (time-windowed group aggregations)
+# =========================================================
+class DelayHistory:
+    """
+    Daily (flights, delayed) counts per airline / origin. Rates for a flight on day d only use
+    days d-window .. d-1, so a flight never sees its own outcome or anything later.
+    The same object serves training (built from the training rows) and scoring (stored in the artifact).
+    """
+
+    def __init__(self, group_cols=ROLLING_GROUP_COLS, window_days=ROLLING_WINDOW_DAYS,
+                 prior_flights=ROLLING_PRIOR_FLIGHTS):
+        self.group_cols = list(group_cols)
+        self.window_days = window_days
+        self.prior_flights = prior_flights
+        self.counts = {col: pd.DataFrame({'group': pd.Series(dtype=object),
+                                          'day': pd.Series(dtype=np.int64),
+                                          'n': pd.Series(dtype=np.int64),
+                                          'delayed': pd.Series(dtype=np.int64)})
+                       for col in self.group_cols + ['__all__']}
+
+    def update(self, df, target):
+        """Add the outcomes of a typed frame / chunk (STA_dt + group columns) to the history."""
+        days = _day_numbers(df['STA_dt'])
+        target = np.asarray(target, dtype=np.int64)
+        for col in self.counts:
+            groups = np.full(len(df), '__all__', dtype=object) if col == '__all__' else _group_keys(df[col])
+            new = (pd.DataFrame({'group': groups, 'day': days, 'n': 1, 'delayed': target})
+                   .groupby(['group', 'day'], sort=False, as_index=False).sum())
+            merged = pd.concat([self.counts[col], new], ignore_index=True)
+            self.counts[col] = merged.groupby(['group', 'day'], as_index=False).sum()
+        return self
+
+    def trimmed(self, last_days=None):
+        """Copy holding only the days needed to score flights after the last recorded day."""
+        last_days = last_days or self.window_days
+        out = DelayHistory(self.group_cols, self.window_days, self.prior_flights)
+        for col, counts in self.counts.items():
+            if len(counts):
+                out.counts[col] = counts[counts['day'] > counts['day'].max() - last_days].reset_index(drop=True)
+        return out
+
+    def _window_sums(self, col, groups, days):
+        counts = self.counts[col]
+        if counts.empty:
+            zeros = np.zeros(len(days), dtype=np.int64)
+            return zeros, zeros
+
+        # Shared integer codes for history groups and query groups, then one sorted composite key
+        codes, _ = pd.factorize(np.concatenate([counts['group'].to_numpy(), groups]))
+        hist_codes, query_codes = codes[:len(counts)].astype(np.int64), codes[len(counts):].astype(np.int64)
+        hist_keys = hist_codes * _DAY_SPAN + counts['day'].to_numpy()
+        order = np.argsort(hist_keys, kind='stable')
+        hist_keys, hist_codes = hist_keys[order], hist_codes[order]
+
+        # Cumulative sums within each group along the day axis
+        n = counts['n'].to_numpy()[order]
+        delayed = counts['delayed'].to_numpy()[order]
+        group_start = np.r_[True, hist_codes[1:] != hist_codes[:-1]]
+        cum_n, cum_delayed = np.cumsum(n), np.cumsum(delayed)
+        base = np.maximum.accumulate(np.where(group_start, np.arange(len(n)), 0))
+        cum_n = cum_n - (cum_n[base] - n[base])
+        cum_delayed = cum_delayed - (cum_delayed[base] - delayed[base])
+
+        # Many flights share a (group, day): look each pair up once, in sorted order
+        query_keys, inverse = np.unique(query_codes * _DAY_SPAN + days, return_inverse=True)
+        query_codes = query_keys // _DAY_SPAN
+
+        def upto(offset):
+            # Sum of the group's counts for all days <= day - offset
+            pos = np.searchsorted(hist_keys, query_keys - offset, side='right') - 1
+            valid = (pos >= 0) & (hist_codes[np.maximum(pos, 0)] == query_codes)
+            pos = np.maximum(pos, 0)
+            return np.where(valid, cum_n[pos], 0), np.where(valid, cum_delayed[pos], 0)
+
+        n_hi, d_hi = upto(1)
+        n_lo, d_lo = upto(1 + self.window_days)
+        return (n_hi - n_lo)[inverse], (d_hi - d_lo)[inverse]
+
+    def rates(self, df):
+        """Smoothed delay rate per group column for each row of a typed frame."""
+        days = _day_numbers(df['STA_dt'])
+        all_n, all_delayed = self._window_sums('__all__', np.full(len(df), '__all__', dtype=object), days)
+        totals = self.counts['__all__'][['n', 'delayed']].sum()
+        overall = totals['delayed'] / totals['n'] if totals['n'] else 0.0
+        prior = np.where(all_n > 0, all_delayed / np.maximum(all_n, 1), overall)
+
+        out = {}
+        for col in self.group_cols:
+            n, delayed = self._window_sums(col, _group_keys(df[col]), days)
+            out[f'{col}_Verspaetungsrate_{self.window_days}T'] = \
+                (delayed + self.prior_flights * prior) / (n + self.prior_flights)
+        return out
+
+
+# =========================================================
+# Feature pipeline
+# =========================================================
+def build_features(df, history=None):
+    """
+    Model feature columns (numeric + categorical) from a typed arrivals frame, chunk or flight batch.
+    Without a history the rolling delay rates are left empty (NaN -> imputed by the encoder).
+    """
+    df = as_frame(df)
+    out = pd.DataFrame(index=df.index)
+    sta = df['STA_dt']
+
+    # Time-based features from Scheduled Arrival (STA)
+    out['Geplant_Ankunft_Stunde'] = sta.dt.hour
+    out['Geplant_Ankunft_TagDerWoche'] = sta.dt.dayofweek  # 0=Monday, 6=Sunday
+    out['Geplant_Ankunft_Monat'] = sta.dt.month
+
+    # Flight duration (Scheduled Arrival - Scheduled Departure) in minutes
+    out['Geplante_Flugdauer_Min'] = (sta - df['SDT_dt']).dt.total_seconds() / 60
+
+    # Passenger count
+    out['PAX'] = df['PAX'] if 'PAX' in df.columns else np.nan
+
+    for col in FEATURES_CATEGORICAL:
+        out[col] = df[col] if col in df.columns else np.nan
+
+    # Rolling per-airline / per-origin delay rates from past days only
+    if history is not None:
+        for name, values in history.rates(out.assign(STA_dt=sta)).items():
+            out[name] = values
+    else:
+        for col in ROLLING_GROUP_COLS:
+            out[f'{col}_Verspaetungsrate_{ROLLING_WINDOW_DAYS}T'] = np.nan
+
+    return out
+
+
+def _with_outcomes(df):
+    # Remove rows where critical timestamps or delay info is missing
+    df_model = df.dropna(subset=['STA_dt', 'SDT_dt', 'DLY_min'])
+    return df_model, (df_model['DLY_min'] > DELAY_THRESHOLD).astype(int)
+
+
+def record_outcomes(df, history):
+    """Add the outcomes of a typed arrivals frame or chunk to `history` (same rows as build_model_frame)."""
+    df_model, target = _with_outcomes(as_frame(df))
+    return history.update(df_model, target)
+
+
+def build_model_frame(df, history=None, update_history=True):
+    """
+    Cleaning, target definition and feature engineering on one typed arrivals frame or chunk.
+    The chunk's outcomes are added to `history` (a fresh one if None) before its rolling rates
+    are computed; the rates only look at earlier days, so this does not leak the target.
+    With update_history=False the history is expected to hold these outcomes already
+    (e.g. from a record_outcomes() pass over the whole file).
+    """
+    df_model, target = _with_outcomes(as_frame(df))
+
+    history = history if history is not None else DelayHistory()
+    if update_history:
+        history.update(df_model, target)
+
+    out = build_features(df_model, history)
+    out[TARGET_VAR] = target
+
+    # Kept for time-aware splits; not a model feature
+    out['STA_dt'] = df_model['STA_dt']
+    return out
+
+
+# =========================================================
+# Encoding
+# =========================================================
+class DelayFeatureEncoder:
+    """
+    Fit/transform encoder for the model features: median imputation for numeric columns and
+    frequency-capped one-hot (sparse CSR) or ordinal codes for categorical columns.
+    Fit on the training rows only and persisted with the model so scoring uses the same columns.
+    """
+
+    OTHER = '__other__'
+
+    def __init__(self, numeric_cols=FEATURES_NUMERIC, categorical_cols=FEATURES_CATEGORICAL,
+                 min_frequency=MIN_CATEGORY_FREQUENCY, output=ENCODER_OUTPUT, fill_value=FILL_VALUE,
+                 max_categories=None):
+        if output not in ('sparse', 'ordinal'):
+            raise ValueError(f"output must be 'sparse' or 'ordinal', got {output!r}")
+        self.numeric_cols = list(numeric_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.min_frequency = min_frequency
+        self.output = output
+        self.fill_value = fill_value
+        self.max_categories = max_categories
+
+    def _filled(self, s):
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            if self.fill_value not in s.cat.categories:
+                s = s.cat.add_categories(self.fill_value)
+            return s.fillna(self.fill_value)
+        return s.astype(object).fillna(self.fill_value)
+
+    def fit(self, df):
+        self.medians_ = {col: float(df[col].median()) for col in self.numeric_cols}
+
+        # Category vocabularies: frequent values keep their own code, the rest map to OTHER
+        self.vocab_ = {}
+        for col in self.categorical_cols:
+            counts = self._filled(df[col]).value_counts()
+            counts = counts[counts >= self.min_frequency]
+            if self.max_categories is not None:
+                counts = counts.iloc[:self.max_categories]  # value_counts() is sorted by frequency
+            keep = counts.index
+            self.vocab_[col] = sorted(keep, key=str)
+
+        self.feature_names_ = list(self.numeric_cols)
+        if self.output == 'sparse':
+            self.offsets_ = {}
+            offset = len(self.numeric_cols)
+            for col in self.categorical_cols:
+                self.offsets_[col] = offset
+                self.feature_names_ += [f"{col}_{v}" for v in self.vocab_[col]] + [f"{col}_{self.OTHER}"]
+                offset += len(self.vocab_[col]) + 1
+        else:
+            self.feature_names_ += list(self.categorical_cols)
+        return self
+
+    def categorical_mask(self):
+        """Boolean mask of the categorical code columns in the ordinal output."""
+        if self.output != 'ordinal':
+            raise ValueError("categorical_mask() is only defined for ordinal output")
+        return np.array([False] * len(self.numeric_cols) + [True] * len(self.categorical_cols))
+
+    def category_codes(self, df, col):
+        # Unknown / rare values get code len(vocab), i.e. the OTHER slot
+        codes = pd.Index(self.vocab_[col]).get_indexer(self._filled(df[col])).astype(np.int32)
+        codes[codes < 0] = len(self.vocab_[col])
+        return codes
+
+    def transform(self, df):
+        n_rows = len(df)
+        numeric = np.empty((n_rows, len(self.numeric_cols)), dtype=np.float32)
+        for j, col in enumerate(self.numeric_cols):
+            numeric[:, j] = pd.to_numeric(df[col], errors='coerce').fillna(self.medians_[col]).to_numpy()
+
+        if self.output == 'ordinal':
+            codes = np.column_stack([self.category_codes(df, col) for col in self.categorical_cols])
+            return np.hstack([numeric, codes.astype(np.float32)])
+
+        # Every row has the same layout: all numeric columns + exactly one hot column per category,
+        # so the CSR arrays can be built directly without going through a dense frame
+        n_num, n_cat = len(self.numeric_cols), len(self.categorical_cols)
+        indices = np.empty((n_rows, n_num + n_cat), dtype=np.int32)
+        indices[:, :n_num] = np.arange(n_num, dtype=np.int32)
+        for j, col in enumerate(self.categorical_cols):
+            indices[:, n_num + j] = self.offsets_[col] + self.category_codes(df, col)
+
+        data = np.ones((n_rows, n_num + n_cat), dtype=np.float32)
+        data[:, :n_num] = numeric
+        indptr = np.arange(n_rows + 1, dtype=np.int64) * (n_num + n_cat)
+        return sparse.csr_matrix((data.ravel(), indices.ravel(), indptr),
+                                 shape=(n_rows, len(self.feature_names_)))
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
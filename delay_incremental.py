@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_sample_weight
+
+import delay_ml
+import delay_model
+import delay_report
+import delay_store
+
+# --- CONFIG ---
+FEATURE_STORE_DIR = os.path.join(delay_store.CACHE_DIR, "feature_store")
+FEATURE_STORE_META = os.path.join(FEATURE_STORE_DIR, "meta.json")
+TREES_PER_UPDATE = 20  # Random Forest: trees added per daily update
+
+
+# =========================================================
+# Ingested STA date ranges
+# =========================================================
+def dates_to_ranges(dates):
+    """Compress a collection of days into sorted [start, end] ranges of consecutive days."""
+    days = np.unique(pd.DatetimeIndex(dates).normalize().to_numpy())
+    if len(days) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(days) != np.timedelta64(1, 'D')) + 1
+    return [[str(pd.Timestamp(block[0]).date()), str(pd.Timestamp(block[-1]).date())]
+            for block in np.split(days, breaks)]
+
+
+def ranges_to_dates(ranges):
+    if not ranges:
+        return pd.DatetimeIndex([])
+    return pd.DatetimeIndex(np.concatenate([pd.date_range(start, end, freq='D') for start, end in ranges]))
+
+
+def _read_store_meta():
+    if not os.path.exists(FEATURE_STORE_META):
+        return {"ranges": [], "parts": 0}
+    with open(FEATURE_STORE_META, 'r') as f:
+        return json.load(f)
+
+
+def _write_store_meta(meta):
+    tmp_path = FEATURE_STORE_META + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, FEATURE_STORE_META)
+
+
+# =========================================================
+# Feature store (one Parquet part per ingestion)
+# =========================================================
+def ingest_new_rows(source_path=delay_store.SOURCE_FILE):
+    """
+    Append model rows for STA days not ingested yet to the feature store.
+    A day is ingested as a whole, so the feed is expected to deliver complete days.
+    Only the new rows are feature-engineered; the rolling history is rebuilt from all outcomes,
+    which is cheap next to the features.
+    """
+    os.makedirs(FEATURE_STORE_DIR, exist_ok=True)
+    meta = _read_store_meta()
+
+    df = delay_store.load_arrivals(source_path)
+    is_new = ~df['STA_dt'].dt.normalize().isin(ranges_to_dates(meta["ranges"]))
+    history = delay_ml.record_outcomes(df, delay_ml.DelayHistory())
+    df_new = delay_ml.build_model_frame(df[is_new], history, update_history=False)
+
+    if len(df_new):
+        part_path = os.path.join(FEATURE_STORE_DIR, f"part-{meta['parts']:05d}.parquet")
+        df_new.reset_index(drop=True).to_parquet(part_path, index=False)
+        covered = ranges_to_dates(meta["ranges"]).append(pd.DatetimeIndex(df_new['STA_dt'].dt.normalize().unique()))
+        meta["ranges"] = dates_to_ranges(covered)
+        meta["parts"] += 1
+        _write_store_meta(meta)
+
+    return df_new, meta["ranges"], history
+
+
+def load_feature_store(window_days=None):
+    parts = sorted(glob.glob(os.path.join(FEATURE_STORE_DIR, "part-*.parquet")))
+    if not parts:
+        return None
+    df = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    if window_days is not None:
+        df = df[df['STA_dt'] >= df['STA_dt'].max().normalize() - pd.Timedelta(days=window_days)]
+    return df
+
+
+# =========================================================
+# Model updates
+# =========================================================
+def _fit_full(df, backend, n_estimators=None):
+    encoder = delay_ml.make_encoder(backend)
+    X = encoder.fit_transform(df)
+    params = {'n_estimators': n_estimators} if backend == 'random_forest' and n_estimators else {}
+    model = delay_ml.make_model(backend, encoder, params)
+    model.fit(X, df[delay_ml.TARGET_VAR].to_numpy())
+    return model, encoder
+
+
+def _warm_start_forest(model, encoder, df_new, tree_batches, trees_per_update, window_start):
+    """Add trees fitted on the new days; with a window, drop trees whose data ended before it."""
+    y_new = df_new[delay_ml.TARGET_VAR].to_numpy()
+    if len(np.unique(y_new)) < 2:
+        # Trees fitted on a single class would not line up with the existing class columns
+        print("New rows contain only one class - no trees added.")
+        return model, tree_batches
+
+    # Balanced weights for the new batch go in as sample weights; warm_start with
+    # class_weight='balanced' would re-estimate them from the batch with a warning
+    class_weight = model.class_weight
+    model.set_params(warm_start=True, class_weight=None,
+                     n_estimators=len(model.estimators_) + trees_per_update)
+    sample_weight = compute_sample_weight('balanced', y_new) if class_weight == 'balanced' else None
+    model.fit(encoder.transform(df_new), y_new, sample_weight=sample_weight)
+    model.set_params(warm_start=False, class_weight=class_weight)
+    tree_batches = tree_batches + [{"until": str(df_new['STA_dt'].max().date()), "n_trees": trees_per_update}]
+
+    if window_start is not None:
+        drop = 0
+        while len(tree_batches) > 1 and pd.Timestamp(tree_batches[0]["until"]) < window_start:
+            drop += tree_batches.pop(0)["n_trees"]
+        if drop:
+            model.estimators_ = model.estimators_[drop:]
+            model.n_estimators = len(model.estimators_)
+            print(f"Sliding window: dropped {drop} trees trained before {window_start.date()}")
+
+    return model, tree_batches
+
+
+def _evaluate(model, encoder, df):
+    """Evaluation report on held-out rows, thresholded as in delay_ml.main."""
+    proba = model.predict_proba(encoder.transform(df))[:, list(model.classes_).index(1)]
+    return delay_report.evaluate(df[delay_ml.TARGET_VAR].to_numpy(), (proba > 0.5).astype(int))
+
+
+def update(window_days=None, trees_per_update=TREES_PER_UPDATE, backend=None, compare_full=False):
+    print("--- 1. Ingesting New Days ---")
+    t_start = time.perf_counter()
+    df_new, ranges, history = ingest_new_rows()
+    t_ingest = time.perf_counter() - t_start
+    print(f"New rows: {len(df_new):,} | ingested STA ranges: {ranges} | {t_ingest:.2f}s")
+
+    artifact_path = delay_model.latest_artifact_path()
+    artifact = delay_model.load_model_artifact(artifact_path) if artifact_path else None
+    backend = backend or (artifact or {}).get("backend", delay_ml.DEFAULT_BACKEND)
+    can_warm_start = (artifact is not None and artifact.get("backend") == backend == 'random_forest'
+                      and "tree_batches" in artifact)
+
+    if len(df_new) == 0 and artifact is not None:
+        print("Nothing new to learn from - model unchanged.")
+        return artifact_path
+    if not ranges:
+        print("❌ The feature store is empty (no flights with STA, SDT and delay) - nothing to train on.")
+        return None
+
+    print("\n--- 2. Updating Model ---")
+    window_start = pd.Timestamp(ranges[-1][1]) - pd.Timedelta(days=window_days) if window_days else None
+    # The full store is only read when a (re)fit or the comparison needs it
+    df_store = load_feature_store(window_days) if not can_warm_start or compare_full else None
+    if df_store is None and (not can_warm_start or compare_full):
+        print(f"❌ No feature store parts in {FEATURE_STORE_DIR} - nothing to train on.")
+        return None
+
+    t0 = time.perf_counter()
+    if can_warm_start:
+        model, encoder = artifact["model"], artifact["encoder"]
+
+        # Test-then-train: the new days are scored by the current model before it learns from them,
+        # so they are the holdout of this update
+        report = _evaluate(model, encoder, df_new)
+        train_rows = artifact["metrics"].get("train_rows", 0) + len(df_new)
+
+        model, tree_batches = _warm_start_forest(model, encoder, df_new, artifact["tree_batches"],
+                                                 trees_per_update, window_start)
+        mode = f"warm start ({len(model.estimators_)} trees in total)"
+    else:
+        # First run, or a backend without warm-start support: refit on the (windowed) store,
+        # holding out 20% for the metrics as delay_ml.main does
+        df_train, df_test = train_test_split(df_store, test_size=0.2, random_state=42,
+                                             stratify=df_store[delay_ml.TARGET_VAR])
+        model, encoder = _fit_full(df_train, backend)
+        report = _evaluate(model, encoder, df_test)
+        train_rows = len(df_train)
+        tree_batches = ([{"until": str(df_store['STA_dt'].max().date()), "n_trees": len(model.estimators_)}]
+                        if backend == 'random_forest' else None)
+        mode = f"full fit on {len(df_train):,} rows"
+    t_update = time.perf_counter() - t0
+    print(f"Update ({mode}) took {t_update:.2f}s (+ {t_ingest:.2f}s ingest)")
+    print(delay_report.format_report(report))
+
+    metrics = delay_ml.artifact_metrics(report, train_rows)
+    if compare_full:
+        n_trees = len(model.estimators_) if backend == 'random_forest' else None
+        t0 = time.perf_counter()
+        _fit_full(df_store, backend, n_estimators=n_trees)
+        t_full = time.perf_counter() - t0
+        # The incremental side pays for the ingest too; the full retrain gets the stored features for free
+        print(f"Full retrain on {len(df_store):,} rows took {t_full:.2f}s "
+              f"({t_full / max(t_ingest + t_update, 1e-9):.1f}x the incremental ingest + update)")
+        metrics["full_retrain_s"] = t_full
+
+    metrics.update({"holdout_rows": report["n_samples"], "new_rows": int(len(df_new)),
+                    "ingest_s": t_ingest, "update_s": t_update})
+    extra = {"ingested_ranges": ranges, "window_days": window_days}
+    if tree_batches is not None:
+        extra["tree_batches"] = tree_batches
+    path = delay_ml.save_model_artifact(model, encoder, metrics, backend, history, extra=extra)
+    delay_report.save_report(report, os.path.splitext(path)[0] + ".report.json")
+    print(f"\n💾 Model saved to {path} | total {time.perf_counter() - t_start:.1f}s")
+    return path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incrementally update the delay model with new STA days.")
+    parser.add_argument("--window-days", type=int, default=None,
+                        help="only learn from the last N days (older trees / rows are dropped)")
+    parser.add_argument("--trees-per-update", type=int, default=TREES_PER_UPDATE)
+    parser.add_argument("--backend", choices=list(delay_ml.MODEL_BACKENDS), default=None,
+                        help="default: backend of the latest model")
+    parser.add_argument("--compare-full", action="store_true", help="also time a full retrain for comparison")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    update(window_days=args.window_days, trees_per_update=args.trees_per_update, backend=args.backend,
+           compare_full=args.compare_full)
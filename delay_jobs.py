@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import delay_report
+import delay_store
+
+# --- CONFIG ---
+JOBS_DIR = os.path.join(delay_store.CACHE_DIR, "jobs")
+MAX_PARALLEL_JOBS = 2
+ACTIVE_STATES = ("queued", "running")  # states a job can still leave; the others are final
+
+
+# =========================================================
+# Job files (one folder per job: status.json, log.txt, report.json)
+# =========================================================
+def _job_dir(job_id):
+    return os.path.join(JOBS_DIR, job_id)
+
+
+def _write_status(job_id, **fields):
+    path = os.path.join(_job_dir(job_id), "status.json")
+    status = read_status(job_id) or {}
+    status.update(fields)
+    tmp_path = path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_status(job_id):
+    try:
+        with open(os.path.join(_job_dir(job_id), "status.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_log(job_id):
+    try:
+        with open(os.path.join(_job_dir(job_id), "log.txt"), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def read_job_report(job_id):
+    path = os.path.join(_job_dir(job_id), "report.json")
+    return delay_report.load_report(path) if os.path.exists(path) else None
+
+
+# =========================================================
+# Worker process
+# =========================================================
+def _run_training_job(job_id, params):
+    job_dir = _job_dir(job_id)
+    _write_status(job_id, state="running", started=time.time(), pid=os.getpid())
+
+    # The worker owns its stdout, so nothing leaks into the Streamlit process
+    log_file = open(os.path.join(job_dir, "log.txt"), "w", buffering=1, encoding="utf-8")
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = log_file
+
+    try:
+        # Pool workers are reused, so pick up code changes like the old in-page reload did
+        import delay_ml
+        importlib.reload(delay_ml)
+        report = delay_ml.main(**params)
+        if report is None:
+            # main() prints why it stopped (e.g. the arrivals CSV is missing) and returns without a report
+            lines = read_log(job_id).strip().splitlines()
+            _write_status(job_id, state="failed", finished=time.time(),
+                          error=lines[-1].strip("❌ ") if lines else "training finished without a report")
+        else:
+            delay_report.save_report(report, os.path.join(job_dir, "report.json"))
+            _write_status(job_id, state="done", finished=time.time())
+    except Exception as e:
+        traceback.print_exc()
+        _write_status(job_id, state="failed", finished=time.time(), error=str(e))
+    finally:
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        log_file.close()
+
+
+# =========================================================
+# Job manager (one per server process, shared by all sessions)
+# =========================================================
+class JobManager:
+
+    def __init__(self, max_workers=MAX_PARALLEL_JOBS):
+        # spawn: don't fork the (multi-threaded) Streamlit server
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {}
+
+    def submit(self, **params):
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(_job_dir(job_id), exist_ok=True)
+        _write_status(job_id, state="queued", submitted=time.time(), params=params)
+        self.futures[job_id] = self.pool.submit(_run_training_job, job_id, params)
+        return job_id
+
+    def status(self, job_id):
+        status = read_status(job_id)
+        if status is None or status.get("state") not in ACTIVE_STATES:
+            return status
+
+        future = self.futures.get(job_id)
+        if future is None:
+            # Submitted by an earlier server process that is gone now
+            status["state"] = "lost"
+        elif future.done():
+            status = read_status(job_id)  # the worker may have finished since the first read
+            if status.get("state") in ACTIVE_STATES:
+                error = future.exception()
+                status.update(state="failed", error=str(error) if error else "worker exited without a result")
+        return status
+
+    def list_jobs(self):
+        job_ids = [os.path.basename(p) for p in glob.glob(os.path.join(JOBS_DIR, "*")) if os.path.isdir(p)]
+        return sorted(job_ids, reverse=True)
+
+    @staticmethod
+    def progress(job_id):
+        """Last '--- N. Step ---' header printed by delay_ml.main, for a coarse progress indicator."""
+        steps = [line.strip("- ").strip() for line in read_log(job_id).splitlines() if line.startswith("--- ")]
+        return steps[-1] if steps else None
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,170 +1,336 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from datetime import datetime
+import argparse
+import joblib
+import json
 import os
+import resource
+import time
+
+import delay_report
+import delay_store
+from delay_features import (  # noqa: F401  (re-exported: older artifacts pickle delay_ml.DelayFeatureEncoder)
+    DELAY_THRESHOLD, TARGET_VAR, FEATURES_NUMERIC, FEATURES_CATEGORICAL,
+    DelayFeatureEncoder, DelayHistory, ROLLING_GROUP_COLS, build_features, build_model_frame, record_outcomes,
+)
+
+# --- CONFIG ---
+# Random Forest defaults
+# class_weight='balanced' handles the imbalance between on-time/delayed
+# n_jobs=-1 uses all CPU cores
+RF_PARAMS = {
+    'n_estimators': 100,
+    'random_state': 42,
+    'class_weight': 'balanced',
+    'n_jobs': -1,
+}
+
+# Histogram gradient boosting defaults (native categorical splits, see MODEL_BACKENDS)
+HGB_PARAMS = {
+    'max_iter': 300,
+    'learning_rate': 0.1,
+    'class_weight': 'balanced',
+    'early_stopping': True,
+    'random_state': 42,
+}
+DEFAULT_BACKEND = 'random_forest'
+
+# Persisted model (fitted model + encoder), see delay_model.py for scoring
+MODEL_DIR = "models"
+ARTIFACT_FORMAT = 1
+
+# Streaming mode defaults
+STREAM_CHUNKSIZE = 200_000
+STREAM_SAMPLE_SIZE = 500_000  # rows kept for the Random Forest (class shares as in the file)
+HISTORY_SOURCE_COLS = ['STA', 'SDT', 'DLY_min'] + ROLLING_GROUP_COLS  # raw columns of the history pass
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# =========================================================
+# Model backends
+# =========================================================
+def _build_random_forest(encoder, params):
+    return RandomForestClassifier(**{**RF_PARAMS, **params})
+
+
+def _build_hist_gradient_boosting(encoder, params):
+    # Splits directly on the ordinal category codes instead of one column per value
+    return HistGradientBoostingClassifier(categorical_features=encoder.categorical_mask(),
+                                          **{**HGB_PARAMS, **params})
+
+
+MODEL_BACKENDS = {
+    'random_forest': {
+        'label': 'Random Forest',
+        'encoder': {},
+        'build': _build_random_forest,
+    },
+    'hist_gradient_boosting': {
+        'label': 'Histogram Gradient Boosting',
+        # Native categorical support needs ordinal codes below max_bins (255), incl. the "other" code
+        'encoder': {'output': 'ordinal', 'max_categories': 254},
+        'build': _build_hist_gradient_boosting,
+    },
+}
+
+
+def _backend_spec(backend):
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, choose from {list(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[backend]
+
+
+def make_encoder(backend=DEFAULT_BACKEND):
+    return DelayFeatureEncoder(**_backend_spec(backend)['encoder'])
+
+
+def make_model(backend, encoder, params=None):
+    return _backend_spec(backend)['build'](encoder, params or {})
+
+
+class ProportionalReservoir:
+    """
+    Bounded uniform sample of all streamed rows: every row gets a random key and the `capacity` rows with the
+    smallest keys are kept (vectorised per chunk). Each class therefore holds a share of the sample in
+    proportion to its share of the rows seen so far, so splits and metrics on the sample keep the file's
+    class prior and stay comparable with full mode. Memory stays at `capacity` rows plus one chunk.
+    """
+
+    def __init__(self, capacity, target_col=TARGET_VAR, seed=42):
+        self.capacity = capacity
+        self.target_col = target_col
+        self.rng = np.random.default_rng(seed)
+        self.buffer = None
+        self.keys = np.empty(0)
+        self.seen = {}
+
+    def add(self, df):
+        for cls, n in df[self.target_col].value_counts(sort=False).items():
+            self.seen[cls] = self.seen.get(cls, 0) + int(n)
+
+        keys = self.rng.random(len(df))
+        if len(self.keys) >= self.capacity:
+            # Rows keyed above the current cut-off can never enter the sample
+            entering = keys < self.keys.max()
+            df, keys = df[entering], keys[entering]
+        buf = df if self.buffer is None else pd.concat([self.buffer, df], ignore_index=True)
+        keys = np.concatenate([self.keys, keys])
+
+        if len(keys) > self.capacity:
+            keep = np.sort(np.argpartition(keys, self.capacity - 1)[:self.capacity])
+            buf, keys = buf.iloc[keep], keys[keep]
+        self.buffer, self.keys = buf.reset_index(drop=True), keys
+
+    def to_frame(self):
+        return self.buffer
+
+
+def artifact_metrics(report, train_rows):
+    """Headline metrics stored with the model (shown on the scoring page) from an evaluation report."""
+    return {
+        "accuracy": report["accuracy"],
+        "f1_delayed": report["per_class"]["Delayed"]["f1"],
+        "recall_delayed": report["per_class"]["Delayed"]["recall"],
+        "train_rows": int(train_rows),
+    }
+
+
+def save_model_artifact(model, encoder, metrics, backend=DEFAULT_BACKEND, history=None, model_dir=MODEL_DIR,
+                        extra=None):
+    """
+    Write model + preprocessing as a new versioned joblib file and point LATEST at it.
+    `history` (DelayHistory) is trimmed to the rolling window needed to score future flights.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if os.path.exists(os.path.join(model_dir, f"delay_risk_{version}.joblib")):
+        version += datetime.now().strftime("-%f")
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "delay_threshold": DELAY_THRESHOLD,
+        "feature_names": list(encoder.feature_names_),
+        "encoder": encoder,
+        "history": history.trimmed() if history is not None else None,
+        "model": model,
+        "metrics": metrics,
+        **(extra or {}),
+    }
+
+    file_name = f"delay_risk_{version}.joblib"
+    tmp_path = os.path.join(model_dir, file_name + ".tmp")
+    joblib.dump(artifact, tmp_path, compress=3)
+    os.replace(tmp_path, os.path.join(model_dir, file_name))
+
+    latest_tmp = os.path.join(model_dir, "LATEST.tmp")
+    with open(latest_tmp, "w") as f:
+        f.write(file_name)
+    os.replace(latest_tmp, os.path.join(model_dir, "LATEST"))
+    return os.path.join(model_dir, file_name)
+
+
+# =========================================================
+# Loading modes
+# =========================================================
+def load_model_frame_full(file_path, history=None):
+    # Load the typed arrivals frame from the columnar cache (built from the CSV on first use).
+    # Timestamps arrive pre-parsed as STA_dt / ATA_dt / SDT_dt, DLY_min and PAX as numbers.
+    df2 = delay_store.load_arrivals(file_path)
 
+    print("Data Info after conversion:")
+    print(df2.info())
 
-def main():
-    # --- 1. Data Loading & Type Conversion ---
-    print("--- 1. Loading Data ---")
+    rows_read = len(df2)
+    df_model = build_model_frame(df2, history)
+    del df2
+    return df_model, rows_read
 
-    # Define file path
-    file_path = "merged_arrivals_cleand.csv"
 
-    if not os.path.exists(file_path):
-        print(f"❌ Error: File not found at {file_path}")
-        return
+def load_model_frame_stream(file_path, chunksize=STREAM_CHUNKSIZE, sample_size=STREAM_SAMPLE_SIZE, history=None):
+    # The delay history is tiny (daily counts per airline / origin). It is built in a first pass over the
+    # few columns it needs, so every chunk's rolling rates see all earlier days, as in full mode,
+    # whatever order the file's rows are in
+    history = history if history is not None else DelayHistory()
+    for chunk in delay_store.iter_arrivals_chunks(file_path, chunksize=chunksize, columns=HISTORY_SOURCE_COLS):
+        record_outcomes(chunk, history)
+    reservoir = ProportionalReservoir(capacity=sample_size)
+    rows_read = 0
 
-    # Load the arrivals CSV, recognizing "NA" as missing values
-    # low_memory=False helps with mixed type warnings
-    df2 = pd.read_csv(file_path, sep=";", na_values="NA", low_memory=False)
+    for i, chunk in enumerate(delay_store.iter_arrivals_chunks(file_path, chunksize=chunksize)):
+        rows_read += len(chunk)
+        reservoir.add(build_model_frame(chunk, history, update_history=False))
+        print(f"Chunk {i + 1}: {rows_read:,} rows read | peak RSS {peak_rss_mb():.0f} MB")
 
-    # Date format used in the file (DD.MM.YYYY HH:MM)
-    date_format = '%d.%m.%Y %H:%M'
+    seen = {int(k): v for k, v in reservoir.seen.items()}
+    print(f"Rows per class seen: {seen}")
+    df_model = reservoir.to_frame()
+    sampled = {int(k): v for k, v in df_model[TARGET_VAR].value_counts().sort_index().items()}
+    print(f"Reservoir sample: {len(df_model):,} rows, per class {sampled}")
+    return df_model, rows_read
 
-    # Convert time columns to datetime objects
-    print("Converting timestamps...")
-    time_cols = ['STA', 'ATA', 'SDT']
-    for col in time_cols:
-        df2[f'{col}_dt'] = pd.to_datetime(df2[col], format=date_format, errors='coerce')
 
-    # Convert delay column to numeric
-    df2['DLY_min'] = pd.to_numeric(df2['DLY_min'], errors='coerce')
+def main(stream=False, chunksize=STREAM_CHUNKSIZE, sample_size=STREAM_SAMPLE_SIZE, model_params=None,
+         backend=DEFAULT_BACKEND, plots=False):
+    t_start = time.perf_counter()
+    timing = {}
 
-    print("Data Info after conversion:")
-    print(df2.info())
+    # --- 1. Data Loading & Type Conversion ---
+    print("--- 1. Loading Data ---")
 
-    # --- 2. Data Cleaning & Target Variable ---
-    print("\n--- 2. Data Cleaning & Target Definition ---")
+    # Define file path
+    file_path = delay_store.SOURCE_FILE
 
-    # Remove rows where critical timestamps or delay info is missing
-    df_model = df2.dropna(subset=['STA_dt', 'SDT_dt', 'DLY_min']).copy()
+    if not os.path.exists(file_path):
+        print(f"❌ Error: File not found at {file_path}")
+        return
 
-    # Define Target: "Delayed" defined as > 15 minutes
-    DELAY_THRESHOLD = 15
-    df_model['Ist_Verspaetet'] = (df_model['DLY_min'] > DELAY_THRESHOLD).astype(int)
+    # --- 2./3. Data Cleaning, Target Definition & Feature Engineering ---
+    print("\n--- 2. Data Cleaning & Target Definition ---")
+    print("\n--- 3. Feature Engineering ---")
+    history = DelayHistory()
+    if stream:
+        print(f"Streaming mode: chunks of {chunksize:,} rows, sample of up to {sample_size:,} rows")
+        df_model, rows_read = load_model_frame_stream(file_path, chunksize, sample_size, history)
+    else:
+        df_model, rows_read = load_model_frame_full(file_path, history)
 
     # Check distribution
     print("\nTarget Variable Distribution (0=On Time, 1=Delayed):")
-    print(df_model['Ist_Verspaetet'].value_counts(normalize=True))
-
-    # --- 3. Feature Engineering ---
-    print("\n--- 3. Feature Engineering ---")
-
-    # Time-based features from Scheduled Arrival (STA)
-    df_model['Geplant_Ankunft_Stunde'] = df_model['STA_dt'].dt.hour
-    df_model['Geplant_Ankunft_TagDerWoche'] = df_model['STA_dt'].dt.dayofweek  # 0=Monday, 6=Sunday
-    df_model['Geplant_Ankunft_Monat'] = df_model['STA_dt'].dt.month
-
-    # Flight duration (Scheduled Arrival - Scheduled Departure) in minutes
-    df_model['Geplante_Flugdauer_Min'] = (df_model['STA_dt'] - df_model['SDT_dt']).dt.total_seconds() / 60
-
-    # Passenger count
-    df_model['PAX'] = pd.to_numeric(df_model['PAX'], errors='coerce')
+    print(df_model[TARGET_VAR].value_counts(normalize=True))
 
     # --- 4. Preprocessing for Model ---
     print("\n--- 4. Preprocessing for Model ---")
 
-    # Select Features
-    features_numeric = [
-        'Geplant_Ankunft_Stunde',
-        'Geplant_Ankunft_TagDerWoche',
-        'Geplant_Ankunft_Monat',
-        'Geplante_Flugdauer_Min',
-        'PAX'
-    ]
-
-    features_categorical = [
-        'FLC',  # Airline
-        'ORG',  # Origin Airport
-        'TYP',  # Aircraft Type
-        'NAT',  # Flight Nature
-        'TER'  # Terminal
-    ]
-
-    TARGET_VAR = 'Ist_Verspaetet'
-
-    # Filter dataframe
-    df_final = df_model[features_numeric + features_categorical + [TARGET_VAR]].copy()
-
-    # Imputation (Filling missing values)
-    # Numeric: Median
-    for col in features_numeric:
-        median_val = df_final[col].median()
-        df_final[col] = df_final[col].fillna(median_val)
-
-    # Categorical: 'Unbekannt' (Unknown)
-    for col in features_categorical:
-        df_final[col] = df_final[col].fillna('Unbekannt')
-
-    # One-Hot Encoding for categorical variables
-    print("Encoding categorical features...")
-    X_categorical = pd.get_dummies(df_final[features_categorical], drop_first=True)
-
-    # Combine features
-    X = pd.concat([df_final[features_numeric], X_categorical], axis=1)
-    y = df_final[TARGET_VAR]
-
-    # Split Data (80% Train, 20% Test)
+    # Split Data (80% Train, 20% Test) before fitting any preprocessing on it
     print("Splitting data...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    df_train, df_test = train_test_split(df_model, test_size=0.2, random_state=42, stratify=df_model[TARGET_VAR])
+    del df_model
+
+    # Imputation (numeric: median, categorical: 'Unbekannt') and compact category encoding,
+    # with rare values of every categorical column pooled into one "other" code per feature
+    print("Encoding categorical features...")
+    encoder = make_encoder(backend)
+    X_train = encoder.fit_transform(df_train)
+    X_test = encoder.transform(df_test)
+    y_train = df_train[TARGET_VAR].to_numpy()
+    y_test = df_test[TARGET_VAR].to_numpy()
 
     print(f"Training Data Shape: {X_train.shape}")
     print(f"Test Data Shape: {X_test.shape}")
 
     # --- 5. Model Training ---
-    print("\n--- 5. Training Random Forest ---")
-
-    # Initialize Model
-    # class_weight='balanced' handles the imbalance between on-time/delayed
-    # n_jobs=-1 uses all CPU cores
-    model = RandomForestClassifier(
-        n_estimators=100,
-        random_state=42,
-        class_weight='balanced',
-        n_jobs=-1
-    )
+    print(f"\n--- 5. Training {MODEL_BACKENDS[backend]['label']} ---")
+
+    # Initialize Model (backend defaults, overridable e.g. with a tuned config)
+    model = make_model(backend, encoder, model_params)
+    print(f"Parameters: {model.get_params()}")
 
+    timing["prepare"] = time.perf_counter() - t_start
+    t0 = time.perf_counter()
     model.fit(X_train, y_train)
+    timing["fit"] = time.perf_counter() - t0
     print("Training finished!")
 
     # --- 6. Evaluation ---
     print("\n--- 6. Evaluation ---")
 
-    y_pred = model.predict(X_test)
-
-    # Metrics
-    acc = accuracy_score(y_test, y_pred)
-    print(f"Accuracy: {acc:.4f}")
+    t0 = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, list(model.classes_).index(1)]
+    timing["predict"] = time.perf_counter() - t0
+    y_pred = (proba > 0.5).astype(int)  # same as model.predict() for two classes, without a second pass
 
-    print("\n--- Classification Report ---")
     # Note: 0 = Pünktlich (On Time), 1 = Verspätet (Delayed)
-    print(classification_report(y_test, y_pred, target_names=['On Time (0)', 'Delayed (1)']))
-
-    # Confusion Matrix Plot
-    print("\nGenerating Confusion Matrix Plot...")
-    cm = confusion_matrix(y_test, y_pred)
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                xticklabels=['Pred: On Time', 'Pred: Delayed'],
-                yticklabels=['True: On Time', 'True: Delayed'])
-    plt.title("Confusion Matrix")
-    plt.ylabel('Actual')
-    plt.xlabel('Predicted')
-
-    # Check if we are in a non-interactive environment (optional safety)
-    try:
-        plt.show()
-    except Exception as e:
-        print("Could not display plot directly (headless environment?).")
-        print("Saving plot to 'confusion_matrix.png' instead.")
-        plt.savefig('confusion_matrix.png')
+    report = delay_report.evaluate(y_test, y_pred, proba, timing)
+    print(delay_report.format_report(report))
+
+    # --- 7. Persist Model ---
+    metrics = artifact_metrics(report, X_train.shape[0])
+    artifact_path = save_model_artifact(model, encoder, metrics, backend, history)
+    report_path = os.path.splitext(artifact_path)[0] + ".report.json"
+    delay_report.save_report(report, report_path)
+    print(f"\n💾 Model saved to {artifact_path}, report to {report_path}")
+
+    elapsed = time.perf_counter() - t_start
+    print(f"\n⏱️ Mode: {'stream' if stream else 'full'} | backend: {backend} | rows read: {rows_read:,} | "
+          f"{elapsed:.1f}s | {rows_read / elapsed:,.0f} rows/s | peak RSS {peak_rss_mb():.0f} MB")
+
+    # Plots are optional and rendered straight to PNG (matplotlib is only imported here)
+    if plots:
+        for name, png in delay_report.render_all_png(report).items():
+            with open(f"{name}.png", "wb") as f:
+                f.write(png)
+            print(f"Saved plot to '{name}.png'")
+
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the arrival delay risk model.")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the CSV in chunks and train on a bounded uniform sample")
+    parser.add_argument("--chunksize", type=int, default=STREAM_CHUNKSIZE)
+    parser.add_argument("--sample-size", type=int, default=STREAM_SAMPLE_SIZE)
+    parser.add_argument("--backend", choices=list(MODEL_BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--plots", action="store_true",
+                        help="also write confusion_matrix.png / curves.png to the working directory")
+    parser.add_argument("--params", type=json.loads, default=None,
+                        help='JSON overrides for the model backend, e.g. \'{"max_depth": 20}\'')
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    # Run through the importable module so the pickled encoder refers to delay_ml, not __main__
+    import delay_ml
+    delay_ml.main(stream=args.stream, chunksize=args.chunksize, sample_size=args.sample_size,
+                  model_params=args.params, backend=args.backend, plots=args.plots)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+import delay_features
+import delay_ml
+import delay_store
+
+_ARTIFACT_CACHE = {}
+
+
+# =========================================================
+# Artifact loading
+# =========================================================
+def latest_artifact_path(model_dir=delay_ml.MODEL_DIR):
+    pointer = os.path.join(model_dir, "LATEST")
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, "r") as f:
+        path = os.path.join(model_dir, f.read().strip())
+    return path if os.path.exists(path) else None
+
+
+def load_model_artifact(path=None):
+    """
+    Load a saved delay model artifact (latest by default). Loaded artifacts are kept in memory,
+    keyed by path and mtime, so repeated scoring calls don't touch the disk.
+    """
+    path = path or latest_artifact_path()
+    if path is None:
+        raise FileNotFoundError(f"No trained delay model found in '{delay_ml.MODEL_DIR}'. Run delay_ml.py first.")
+
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _ARTIFACT_CACHE:
+        artifact = joblib.load(path)
+        if artifact.get("format") != delay_ml.ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported artifact format {artifact.get('format')} in {path} "
+                             f"(expected {delay_ml.ARTIFACT_FORMAT}); retrain the model.")
+        _ARTIFACT_CACHE.clear()
+        _ARTIFACT_CACHE[key] = artifact
+    return _ARTIFACT_CACHE[key]
+
+
+# =========================================================
+# Scoring
+# =========================================================
+def _scheduled_times(df, col):
+    if f'{col}_dt' in df.columns:
+        return df[f'{col}_dt']
+    if col not in df.columns:
+        raise KeyError(f"flights need a '{col}' or '{col}_dt' column")
+    if pd.api.types.is_datetime64_any_dtype(df[col]):
+        return df[col]
+    return pd.to_datetime(df[col], format=delay_store.DATE_FORMAT, errors='coerce')
+
+
+def prepare_flights(flights):
+    """
+    Typed flight batch from a DataFrame, Arrow table or list of dicts with STA, SDT, PAX, FLC, ORG, TYP,
+    NAT, TER. Rows that are already typed (STA_dt / SDT_dt) are passed through.
+    """
+    df = delay_features.as_frame(flights)
+    df = df if isinstance(df, pd.DataFrame) else pd.DataFrame(df)
+    typed = pd.DataFrame(index=df.index)
+    typed['STA_dt'] = _scheduled_times(df, 'STA')
+    typed['SDT_dt'] = _scheduled_times(df, 'SDT')
+    if 'PAX' in df.columns:
+        typed['PAX'] = pd.to_numeric(df['PAX'], errors='coerce')
+    for col in delay_features.FEATURES_CATEGORICAL:
+        if col in df.columns:
+            typed[col] = df[col]
+    return typed
+
+
+def predict_delay_risk(flights, artifact=None, threshold=0.5, history=None):
+    """
+    Score a batch of flights in one vectorised pass.
+    Returns a DataFrame (same index as `flights`) with the delay probability and the predicted class.
+    """
+    artifact = artifact or load_model_artifact()
+    encoder, model = artifact["encoder"], artifact["model"]
+
+    # Rolling delay rates come from the history stored with the model unless a fresher one is passed
+    history = history if history is not None else artifact.get("history")
+    features = delay_features.build_features(prepare_flights(flights), history)
+    X = encoder.transform(features)
+    proba = model.predict_proba(X)[:, list(model.classes_).index(1)]
+
+    return pd.DataFrame({
+        "delay_risk": proba,
+        "predicted_delayed": proba >= threshold,
+    }, index=features.index)
+
+
+def main():
+    artifact = load_model_artifact()
+    print(f"Model version {artifact['version']} ({artifact['created']}), metrics: {artifact['metrics']}")
+
+    # Quick latency check on a sample of the arrivals file. The artifact only keeps the trailing
+    # history window, so the sample comes from inside it: older flights would get prior-only rolling rates
+    df = delay_store.load_arrivals(delay_store.SOURCE_FILE)
+    history = artifact.get("history")
+    days = history.counts['__all__']['day'] if history is not None else None
+    if days is not None and len(days):
+        first = pd.Timestamp(int(days.min()), unit='D')
+        in_window = df[df['STA_dt'] >= first]
+        if len(in_window):
+            df = in_window
+            print(f"Sampling flights from {first.date()} on, inside the stored {history.window_days}-day "
+                  f"history (rates of the window's first days still lean on the priors)")
+        else:
+            print(f"⚠️ No flights on or after {first.date()} in the file: "
+                  f"older flights only get the prior rolling rates")
+    else:
+        print("⚠️ The artifact has no delay history: rolling rates are the priors only")
+    sample = df.sample(n=min(len(df), 10_000), random_state=42)
+
+    t0 = time.perf_counter()
+    scored = predict_delay_risk(sample, artifact)
+    elapsed = time.perf_counter() - t0
+    print(f"Scored {len(scored):,} flights in {elapsed * 1000:.0f} ms "
+          f"({len(scored) / elapsed:,.0f} flights/s), mean risk {np.mean(scored['delay_risk']):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import io
+import json
+
+import numpy as np
+from sklearn.calibration import calibration_curve
+from sklearn.metrics import confusion_matrix, precision_recall_curve, precision_recall_fscore_support, average_precision_score
+
+# --- CONFIG ---
+CLASS_NAMES = ['On Time', 'Delayed']
+MAX_CURVE_POINTS = 200
+CALIBRATION_BINS = 10
+
+
+# =========================================================
+# Metrics (plain JSON, no plotting libraries involved)
+# =========================================================
+def _downsample(*arrays, max_points=MAX_CURVE_POINTS):
+    n = len(arrays[0])
+    if n <= max_points:
+        return [np.asarray(a).tolist() for a in arrays]
+    idx = np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+    return [np.asarray(a)[idx].tolist() for a in arrays]
+
+
+def evaluate(y_true, y_pred, proba=None, timing=None):
+    """Structured evaluation report: confusion matrix, per-class metrics, PR / calibration points, timing."""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    precision, recall, f1, support = precision_recall_fscore_support(y_true, y_pred, labels=[0, 1], zero_division=0)
+
+    report = {
+        "n_samples": int(len(y_true)),
+        "accuracy": float(np.mean(y_true == y_pred)),
+        "confusion_matrix": {
+            "labels": CLASS_NAMES,
+            "matrix": confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),  # rows: actual, cols: predicted
+        },
+        "per_class": {
+            name: {"precision": float(precision[i]), "recall": float(recall[i]),
+                   "f1": float(f1[i]), "support": int(support[i])}
+            for i, name in enumerate(CLASS_NAMES)
+        },
+        "timing_s": {k: round(float(v), 4) for k, v in (timing or {}).items()},
+    }
+
+    if proba is not None:
+        proba = np.asarray(proba)
+        pr_precision, pr_recall, pr_thresholds = precision_recall_curve(y_true, proba)
+        # precision/recall have one more point than thresholds (the final recall=0 point)
+        p, r, t = _downsample(pr_precision[:-1], pr_recall[:-1], pr_thresholds)
+        report["pr_curve"] = {"precision": p, "recall": r, "threshold": t,
+                              "average_precision": float(average_precision_score(y_true, proba))}
+
+        frac_pos, mean_pred = calibration_curve(y_true, proba, n_bins=CALIBRATION_BINS, strategy='quantile')
+        report["calibration"] = {"mean_predicted": mean_pred.tolist(), "fraction_positive": frac_pos.tolist()}
+
+    return report
+
+
+def format_report(report):
+    """Text summary in the style of sklearn's classification_report."""
+    lines = [f"{'':>12} {'precision':>10} {'recall':>10} {'f1-score':>10} {'support':>10}"]
+    for name, m in report["per_class"].items():
+        lines.append(f"{name:>12} {m['precision']:>10.2f} {m['recall']:>10.2f} {m['f1']:>10.2f} {m['support']:>10}")
+    lines.append(f"\n{'accuracy':>12} {report['accuracy']:>32.4f} {report['n_samples']:>10}")
+    if "pr_curve" in report:
+        lines.append(f"{'avg. prec.':>12} {report['pr_curve']['average_precision']:>32.4f}")
+    if report["timing_s"]:
+        lines.append("\nTiming: " + " | ".join(f"{k} {v:.2f}s" for k, v in report["timing_s"].items()))
+    return "\n".join(lines)
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# =========================================================
+# Lazy rendering (matplotlib is only imported when a view asks for a plot)
+# =========================================================
+def _new_figure(**kwargs):
+    # A bare Figure rendered by Agg on savefig: no pyplot import, no global backend / current-figure state
+    from matplotlib.figure import Figure
+    return Figure(**kwargs)
+
+
+def _figure_to_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches="tight", pil_kwargs={"optimize": True})
+    return buf.getvalue()
+
+
+def render_confusion_matrix_png(report):
+    cm = np.asarray(report["confusion_matrix"]["matrix"])
+    fig = _new_figure(figsize=(6, 4.5))
+    ax = fig.subplots()
+    ax.imshow(cm, cmap='Blues')
+    for (i, j), value in np.ndenumerate(cm):
+        ax.text(j, i, f"{value:d}", ha='center', va='center',
+                color='white' if value > cm.max() / 2 else 'black')
+    ax.set_xticks([0, 1], ['Pred: On Time', 'Pred: Delayed'])
+    ax.set_yticks([0, 1], ['True: On Time', 'True: Delayed'])
+    ax.set_title("Confusion Matrix")
+    ax.set_ylabel('Actual')
+    ax.set_xlabel('Predicted')
+    return _figure_to_png(fig)
+
+
+def render_curves_png(report):
+    fig = _new_figure(figsize=(10, 4))
+    ax_pr, ax_cal = fig.subplots(1, 2)
+    pr = report["pr_curve"]
+    ax_pr.plot(pr["recall"], pr["precision"])
+    ax_pr.set_title(f"Precision-Recall (AP {pr['average_precision']:.3f})")
+    ax_pr.set_xlabel("Recall")
+    ax_pr.set_ylabel("Precision")
+
+    cal = report["calibration"]
+    ax_cal.plot([0, 1], [0, 1], linestyle='--', color='grey')
+    ax_cal.plot(cal["mean_predicted"], cal["fraction_positive"], marker='o')
+    ax_cal.set_title("Calibration")
+    ax_cal.set_xlabel("Mean predicted risk")
+    ax_cal.set_ylabel("Fraction delayed")
+    return _figure_to_png(fig)
+
+
+def render_all_png(report):
+    """All available plots for a report, as {name: PNG bytes}."""
+    images = {"confusion_matrix": render_confusion_matrix_png(report)}
+    if "pr_curve" in report:
+        images["curves"] = render_curves_png(report)
+    return images
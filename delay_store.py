@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import os
+import json
+import hashlib
+import time
+import pandas as pd
+
+# --- CONFIG ---
+SOURCE_FILE = "merged_arrivals_cleand.csv"
+CACHE_DIR = ".delay_cache"
+STORE_VERSION = 1
+
+# Date format used in the file (DD.MM.YYYY HH:MM)
+DATE_FORMAT = '%d.%m.%Y %H:%M'
+TIME_COLS = ['STA', 'ATA', 'SDT']
+NUMERIC_COLS = ['DLY_min', 'PAX']
+CATEGORY_COLS = ['FLC', 'ORG', 'TYP', 'NAT', 'TER']
+
+try:
+    import pyarrow  # noqa: F401  (pandas uses it as the Parquet engine)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+
+# =========================================================
+# Source fingerprint (cache invalidation)
+# =========================================================
+def file_sha1(path, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _store_paths(source_path, cache_dir):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    data_path = os.path.join(cache_dir, f"{name}.parquet")
+    meta_path = os.path.join(cache_dir, f"{name}.meta.json")
+    return data_path, meta_path
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def _cache_is_valid(source_path, data_path, meta_path):
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get("version") != STORE_VERSION or not os.path.exists(data_path):
+        return False
+
+    st = os.stat(source_path)
+    if meta.get("size") == st.st_size and meta.get("mtime_ns") == st.st_mtime_ns:
+        return True
+
+    # mtime changed (copied / touched) -> only rebuild if the content changed too
+    if meta.get("size") == st.st_size and meta.get("sha1") == file_sha1(source_path):
+        meta["mtime_ns"] = st.st_mtime_ns
+        _write_meta(meta_path, meta)
+        return True
+    return False
+
+
+# =========================================================
+# Parsing
+# =========================================================
+def convert_arrivals(df):
+    """Typed view of the raw arrivals frame (parsed timestamps, numeric and category columns)."""
+    # Convert time columns to datetime objects; the raw strings are not kept
+    for col in TIME_COLS:
+        if col in df.columns:
+            df[f'{col}_dt'] = pd.to_datetime(df[col], format=DATE_FORMAT, errors='coerce')
+            df = df.drop(columns=col)
+
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Dictionary-encode the low-cardinality string columns
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def read_arrivals_csv(source_path, **read_kwargs):
+    # Load the arrivals CSV, recognizing "NA" as missing values
+    # low_memory=False helps with mixed type warnings
+    df = pd.read_csv(source_path, sep=";", na_values="NA", low_memory=False, **read_kwargs)
+    return convert_arrivals(df)
+
+
+# =========================================================
+# Public entry point
+# =========================================================
+def load_arrivals(source_path=SOURCE_FILE, cache_dir=CACHE_DIR, columns=None, use_cache=True):
+    """
+    Return the typed arrivals frame, converting the CSV into a Parquet store on first use.
+    The store is rebuilt whenever the source file's size/mtime (and then SHA-1) changes.
+    """
+    if not use_cache or not HAS_PARQUET:
+        if use_cache:
+            print("⚠️ pyarrow not installed - reading CSV without columnar cache.")
+        df = read_arrivals_csv(source_path)
+        return df[columns] if columns is not None else df
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _store_paths(source_path, cache_dir)
+
+    if _cache_is_valid(source_path, data_path, meta_path):
+        t0 = time.perf_counter()
+        df = pd.read_parquet(data_path, columns=columns)
+        print(f"Loaded {len(df):,} rows from columnar cache in {time.perf_counter() - t0:.2f}s")
+        return df
+
+    print("Building columnar cache (first run or source changed)...")
+    t0 = time.perf_counter()
+    df = read_arrivals_csv(source_path)
+
+    tmp_path = data_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, data_path)
+
+    st = os.stat(source_path)
+    _write_meta(meta_path, {
+        "version": STORE_VERSION,
+        "source": os.path.abspath(source_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": file_sha1(source_path),
+        "rows": len(df),
+    })
+    print(f"Cached {len(df):,} rows in {time.perf_counter() - t0:.2f}s -> {data_path}")
+
+    return df[columns] if columns is not None else df
+
+
+def iter_arrivals_chunks(source_path=SOURCE_FILE, chunksize=200_000, columns=None):
+    """Stream the arrivals CSV (or only the given raw columns) in typed chunks, never holding the whole file."""
+    reader = pd.read_csv(source_path, sep=";", na_values="NA", chunksize=chunksize, usecols=columns)
+    for chunk in reader:
+        yield convert_arrivals(chunk)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+
+import delay_ml
+import delay_store
+
+# --- CONFIG ---
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 12, 20],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.5],
+    },
+    'hist_gradient_boosting': {
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [20, 100],
+        'l2_regularization': [0.0, 1.0],
+    },
+}
+N_FOLDS = 4
+ETA = 2  # keep the best 1/ETA configurations per rung
+LEADERBOARD_PATH = os.path.join(delay_ml.MODEL_DIR, "tuning_leaderboard_{backend}.csv")
+
+
+# =========================================================
+# Time-aware folds
+# =========================================================
+def month_folds(sta_dt, n_folds=N_FOLDS):
+    """
+    Expanding-window folds over STA months: fold k tests on one block of consecutive months
+    and trains on every month before it, so no fold ever trains on the future.
+    """
+    months = sta_dt.dt.to_period('M')
+    unique_months = np.sort(months.dropna().unique())
+    if len(unique_months) < n_folds + 1:
+        raise ValueError(f"Need at least {n_folds + 1} months of data for {n_folds} folds, "
+                         f"got {len(unique_months)}.")
+
+    # Split the months after the first block into n_folds contiguous test blocks
+    test_blocks = np.array_split(unique_months[len(unique_months) // (n_folds + 1):], n_folds)
+    month_values = months.to_numpy()
+    folds = []
+    for block in test_blocks:
+        train_idx = np.flatnonzero(month_values < block[0])
+        test_idx = np.flatnonzero((month_values >= block[0]) & (month_values <= block[-1]))
+        folds.append((train_idx, test_idx, f"{block[0]}..{block[-1]}"))
+    return folds
+
+
+# =========================================================
+# Worker side (data is handed over once per process)
+# =========================================================
+_WORKER_DATA = {}
+
+
+def _init_worker(df_model, folds, backend):
+    _WORKER_DATA['df'] = df_model
+    _WORKER_DATA['folds'] = folds
+    _WORKER_DATA['backend'] = backend
+    # One core per model: the process pool already parallelises across configurations
+    threadpool_limits(1)
+
+
+def _evaluate(config_id, params, fold_id):
+    backend = _WORKER_DATA['backend']
+    df = _WORKER_DATA['df']
+    train_idx, test_idx, _ = _WORKER_DATA['folds'][fold_id]
+    df_train, df_test = df.iloc[train_idx], df.iloc[test_idx]
+
+    encoder = delay_ml.make_encoder(backend)
+    X_train = encoder.fit_transform(df_train)
+    X_test = encoder.transform(df_test)
+    y_train = df_train[delay_ml.TARGET_VAR].to_numpy()
+    y_test = df_test[delay_ml.TARGET_VAR].to_numpy()
+
+    if backend == 'random_forest':
+        params = {**params, 'n_jobs': 1}
+    model = delay_ml.make_model(backend, encoder, params)
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_s = time.perf_counter() - t0
+
+    return {
+        "config_id": config_id,
+        "fold": fold_id,
+        "f1_delayed": f1_score(y_test, y_pred, pos_label=1, zero_division=0),
+        "fit_s": fit_s,
+        "predict_ms_per_1k": predict_s * 1000 / max(len(test_idx), 1) * 1000,
+    }
+
+
+# =========================================================
+# Successive halving
+# =========================================================
+def expand_space(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def successive_halving(df_model, configs, folds, backend=delay_ml.DEFAULT_BACKEND, eta=ETA, workers=None):
+    """
+    Rung r evaluates every surviving configuration on the first eta**r folds (oldest first).
+    Only the best 1/eta by mean delayed-class F1 are promoted, so weak configurations stop early.
+    """
+    results = {i: [] for i in range(len(configs))}
+    survivors = list(range(len(configs)))
+    rung, n_folds = 0, 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(df_model, folds, backend)) as pool:
+        while True:
+            jobs = [(cid, fold) for cid in survivors for fold in range(n_folds)
+                    if fold not in {r["fold"] for r in results[cid]}]
+            print(f"Rung {rung}: {len(survivors)} configs x {n_folds} fold(s) -> {len(jobs)} fits")
+
+            futures = [pool.submit(_evaluate, cid, configs[cid], fold) for cid, fold in jobs]
+            for future in futures:
+                res = future.result()
+                results[res["config_id"]].append(res)
+
+            if n_folds >= len(folds) or len(survivors) == 1:
+                break
+
+            scores = {cid: np.mean([r["f1_delayed"] for r in results[cid]]) for cid in survivors}
+            keep = max(1, len(survivors) // eta)
+            survivors = sorted(survivors, key=lambda cid: scores[cid], reverse=True)[:keep]
+            rung += 1
+            n_folds = min(len(folds), n_folds * eta)
+
+    return results
+
+
+def build_leaderboard(configs, results, latency_budget_ms=None):
+    rows = []
+    for cid, fold_results in results.items():
+        if not fold_results:
+            continue
+        f1 = [r["f1_delayed"] for r in fold_results]
+        rows.append({
+            **{f"param_{k}": v for k, v in configs[cid].items()},
+            "folds_evaluated": len(fold_results),
+            "f1_delayed_mean": np.mean(f1),
+            "f1_delayed_std": np.std(f1),
+            "fit_s_mean": np.mean([r["fit_s"] for r in fold_results]),
+            "predict_ms_per_1k": np.mean([r["predict_ms_per_1k"] for r in fold_results]),
+        })
+
+    board = pd.DataFrame(rows)
+    if latency_budget_ms is not None:
+        board["within_latency_budget"] = board["predict_ms_per_1k"] <= latency_budget_ms
+    # Configurations that survived more rungs rank first, then by F1
+    return board.sort_values(["folds_evaluated", "f1_delayed_mean"], ascending=False).reset_index(drop=True)
+
+
+def main(backend=delay_ml.DEFAULT_BACKEND, n_folds=N_FOLDS, eta=ETA, workers=None, latency_budget_ms=None):
+    print("--- Loading Data ---")
+    df_model, _ = delay_ml.load_model_frame_full(delay_store.SOURCE_FILE)
+    df_model = df_model.sort_values('STA_dt').reset_index(drop=True)
+    folds = month_folds(df_model['STA_dt'], n_folds)
+    for i, (train_idx, test_idx, label) in enumerate(folds):
+        print(f"Fold {i}: test months {label} | train {len(train_idx):,} rows | test {len(test_idx):,} rows")
+
+    configs = expand_space(SEARCH_SPACES[backend])
+    print(f"\n--- Successive Halving over {len(configs)} {backend} configurations ---")
+    t0 = time.perf_counter()
+    results = successive_halving(df_model, configs, folds, backend=backend, eta=eta, workers=workers)
+    print(f"Search finished in {time.perf_counter() - t0:.1f}s")
+
+    board = build_leaderboard(configs, results, latency_budget_ms)
+    leaderboard_path = LEADERBOARD_PATH.format(backend=backend)
+    os.makedirs(os.path.dirname(leaderboard_path), exist_ok=True)
+    board.to_csv(leaderboard_path, index=False)
+
+    print("\n--- Leaderboard (top 10) ---")
+    print(board.head(10).to_string())
+    print(f"\n💾 Leaderboard saved to {leaderboard_path}")
+    return board
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time-aware hyperparameter search for the delay model.")
+    parser.add_argument("--backend", choices=list(SEARCH_SPACES), default=delay_ml.DEFAULT_BACKEND)
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="flag configs whose prediction time per 1000 flights exceeds this")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(backend=args.backend, n_folds=args.folds, eta=args.eta, workers=args.workers,
+         latency_budget_ms=args.latency_budget_ms)
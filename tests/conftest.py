@@ -0,0 +1,46 @@
+import os
+import sys
+
+# The modules are run as scripts from the repository root; make them importable the same way
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+
+def write_video(path, n_frames=30, fps=10.0, size=(64, 48)):
+    """Synthetic clip whose frame i is filled with the gray value i (so frames can be told apart)."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for i in range(n_frames):
+        writer.write(np.full((size[1], size[0], 3), i * 8 % 256, np.uint8))
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture
+def synthetic_video(tmp_path):
+    return write_video(tmp_path / "clip.mp4")
+
+
+def write_arrivals(path, start="2024-03-01", days=30, flights_per_day=40, seed=0, shuffle=False):
+    """Synthetic arrivals CSV in the source format; EW flights from PMI are delayed more often."""
+    rng = np.random.default_rng(seed)
+    n = days * flights_per_day
+    sta = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 24 * 60, n), unit='min')
+    flc = rng.choice(['LH', 'EW', 'XQ'], n)
+    org = rng.choice(['FRA', 'PMI', 'AYT', 'IST'], n)
+    late = rng.random(n) < np.where((flc == 'EW') | (org == 'PMI'), 0.6, 0.2)
+    delay = np.where(late, rng.integers(16, 120, n), rng.integers(-10, 15, n))
+    df = pd.DataFrame({
+        'STA': sta.strftime('%d.%m.%Y %H:%M'),
+        'ATA': (sta + pd.to_timedelta(delay, unit='min')).strftime('%d.%m.%Y %H:%M'),
+        'SDT': (sta - pd.to_timedelta(rng.integers(60, 300, n), unit='min')).strftime('%d.%m.%Y %H:%M'),
+        'DLY_min': delay, 'PAX': rng.integers(50, 200, n), 'FLC': flc, 'ORG': org,
+        'TYP': rng.choice(['A320', 'B738'], n), 'NAT': 'P', 'TER': rng.choice(['1', '2'], n),
+    })
+    if not shuffle:
+        df = df.iloc[np.argsort(sta.to_numpy(), kind='stable')]
+    df.to_csv(path, sep=';', index=False)
+    return str(path)
@@ -0,0 +1,57 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from Object_detection import dataset_index
+
+
+def make_dataset(root, images, labels):
+    """images: {split/name: gray value}, labels: {split/name: text}."""
+    for sub in ("images/train", "images/val", "labels/train", "labels/val"):
+        os.makedirs(root / sub, exist_ok=True)
+    for name, gray in images.items():
+        cv2.imwrite(str(root / "images" / f"{name}.jpg"), np.full((24, 32, 3), gray, np.uint8))
+    for name, text in labels.items():
+        (root / "labels" / f"{name}.txt").write_text(text)
+    return str(root)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return make_dataset(tmp_path, images={"train/a": 10, "train/b": 60, "train/c": 110, "val/d": 160, "val/e": 10},
+                        labels={"train/a": "0 0.5 0.5 0.2 0.2\n2 0.1 0.1 0.1 0.1\n",
+                                "train/b": "7 0.5 0.5 0.2 0.2\n",
+                                "val/d": "1 0.5 0.5 1.3 0.2\n", "val/e": "", "val/f": "0 0.5 0.5 0.1 0.1\n"})
+
+
+def test_index_sizes_counts_and_issues(dataset):
+    index = dataset_index.build_index(dataset, workers=1, full=True)
+    row = index.set_index(["split", "stem"]).loc[("train", "a")]
+    assert (row["width"], row["height"], row["n_boxes"]) == (32, 24, 2)
+    assert list(row["class_counts"]) == [1, 0, 1]
+
+    issues = {issue: sorted(rows["stem"]) for issue, rows in dataset_index.validate(index).items()}
+    assert issues == {"missing_label": ["c"], "orphan_label": ["f"], "unknown_class": ["b"],
+                      "out_of_range": ["d"], "empty_label": ["e"], "train_val_overlap": ["e"]}
+
+
+def test_unchanged_files_are_not_read_again(dataset):
+    dataset_index.save_manifest(dataset_index.build_index(dataset, workers=1), dataset)
+    assert dataset_index.build_index(dataset, workers=1).attrs["rescanned"] == 0
+
+    with open(os.path.join(dataset, "labels", "train", "b.txt"), "w") as f:
+        f.write("1 0.5 0.5 0.2 0.2\n")
+    index = dataset_index.build_index(dataset, workers=1)
+    assert index.attrs["rescanned"] == 1
+    assert "unknown_class" not in dataset_index.validate(index)
+
+
+def test_images_without_labels_only_block_training_on_request(tmp_path):
+    dataset = make_dataset(tmp_path, images={"train/a": 10, "train/b": 60, "val/c": 110},
+                           labels={"train/a": "0 0.5 0.5 0.2 0.2\n", "val/c": "1 0.5 0.5 0.2 0.2\n"})
+    _, issues = dataset_index.main(dataset, workers=1, strict=True)
+    assert list(issues) == ["missing_label"]
+    with pytest.raises(SystemExit):
+        dataset_index.main(dataset, workers=1, strict=True, require_labels=True)
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+
+import delay_incremental
+import delay_model
+import delay_store
+from conftest import write_arrivals
+
+
+def scoring_page_fields(path):
+    # What app.show_delay_scoring reads from the latest artifact
+    metrics = delay_model.load_model_artifact(path)['metrics']
+    return metrics['f1_delayed'], metrics['train_rows'], metrics['accuracy'], metrics['recall_delayed']
+
+
+def test_first_fit_then_warm_start_keep_the_scoring_metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_arrivals(delay_store.SOURCE_FILE, days=20, seed=1)
+    first = delay_incremental.update()
+    f1, train_rows, _, _ = scoring_page_fields(first)
+    assert 0 <= f1 <= 1 and train_rows > 0
+
+    # Ten more days arrive in the feed: trees are added, the new days are the holdout
+    old = pd.read_csv(delay_store.SOURCE_FILE, sep=';')
+    write_arrivals("new.csv", start="2024-03-21", days=10, seed=2)
+    pd.concat([old, pd.read_csv("new.csv", sep=';')]).to_csv(delay_store.SOURCE_FILE, sep=';', index=False)
+    second = delay_incremental.update()
+    assert second != first
+    f1, updated_rows, _, _ = scoring_page_fields(second)
+    assert 0 <= f1 <= 1 and updated_rows > train_rows
+    assert delay_model.load_model_artifact(second)['metrics']['holdout_rows'] == 400
+
+    # Nothing new: the model stays as it is
+    assert delay_incremental.update() == second
+
+
+def test_empty_feed_returns_without_a_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(delay_store.SOURCE_FILE, 'w') as f:
+        f.write("STA;ATA;SDT;DLY_min;PAX;FLC;ORG;TYP;NAT;TER\n")
+    assert delay_incremental.update() is None
+    assert not os.path.exists("models")
+
+
+def test_ingest_featurizes_only_new_days_like_a_full_build(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_arrivals(delay_store.SOURCE_FILE, days=20, seed=1)
+    delay_incremental.ingest_new_rows()
+    old = pd.read_csv(delay_store.SOURCE_FILE, sep=';')
+    write_arrivals("new.csv", start="2024-03-21", days=10, seed=2)
+    pd.concat([old, pd.read_csv("new.csv", sep=';')]).to_csv(delay_store.SOURCE_FILE, sep=';', index=False)
+
+    calls = []
+    build = delay_incremental.delay_ml.build_model_frame
+    monkeypatch.setattr(delay_incremental.delay_ml, 'build_model_frame',
+                        lambda df, *args, **kwargs: calls.append(len(df)) or build(df, *args, **kwargs))
+    df_new, ranges, _ = delay_incremental.ingest_new_rows()
+    assert calls == [400] and ranges == [["2024-03-01", "2024-03-30"]]
+
+    full = build(delay_store.load_arrivals())
+    expected = full[full['STA_dt'] >= "2024-03-21"].reset_index(drop=True)
+    # (the Parquet round trip of the store may turn an all-integer category column back into integers)
+    pd.testing.assert_frame_equal(df_new.reset_index(drop=True), expected, check_dtype=False,
+                                  check_categorical=False)
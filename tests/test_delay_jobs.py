@@ -0,0 +1,26 @@
+import time
+
+import delay_jobs
+
+
+def wait_for_final_state(manager, job_id, timeout_s=60):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if status["state"] not in delay_jobs.ACTIVE_STATES:
+            return status
+        time.sleep(0.2)
+    raise TimeoutError(job_id)
+
+
+def test_job_without_the_arrivals_csv_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = delay_jobs.JobManager(max_workers=1)
+    try:
+        job_id = manager.submit(backend='random_forest')
+        status = wait_for_final_state(manager, job_id)
+    finally:
+        manager.shutdown()
+    assert status["state"] == "failed"
+    assert "File not found" in status["error"]
+    assert delay_jobs.read_job_report(job_id) is None
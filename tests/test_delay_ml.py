@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+import delay_ml
+from conftest import write_arrivals
+
+
+def stream(n_chunks=20, chunk=5_000, delayed_share=0.34, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(n_chunks):
+        yield pd.DataFrame({"row": np.arange(i * chunk, (i + 1) * chunk),
+                            delay_ml.TARGET_VAR: (rng.random(chunk) < delayed_share).astype(int)})
+
+
+def test_reservoir_keeps_the_class_prior_of_the_stream():
+    reservoir = delay_ml.ProportionalReservoir(capacity=10_000)
+    for chunk in stream():
+        reservoir.add(chunk)
+    sample = reservoir.to_frame()
+
+    assert len(sample) == 10_000
+    seen_share = reservoir.seen[1] / sum(reservoir.seen.values())
+    assert abs(sample[delay_ml.TARGET_VAR].mean() - seen_share) < 0.02
+    # Uniform over the whole stream, not biased towards early or late chunks
+    assert abs(sample["row"].mean() - 50_000) < 2_000
+    assert sample["row"].is_unique
+
+
+def test_reservoir_larger_than_the_stream_keeps_every_row():
+    reservoir = delay_ml.ProportionalReservoir(capacity=1_000_000)
+    for chunk in stream(n_chunks=3):
+        reservoir.add(chunk)
+    assert sorted(reservoir.to_frame()["row"]) == list(range(15_000))
+
+
+def test_stream_mode_features_match_full_mode_on_an_unsorted_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = write_arrivals(tmp_path / "arrivals.csv", days=60, flights_per_day=20, shuffle=True)
+
+    full, _ = delay_ml.load_model_frame_full(path)
+    stream, rows_read = delay_ml.load_model_frame_stream(path, chunksize=150, sample_size=10 ** 6)
+    assert rows_read == len(full) == len(stream)
+
+    def canonical(df):
+        return df.sort_values(list(df.columns)).reset_index(drop=True)
+    rate_cols = [c for c in full.columns if 'Verspaetungsrate' in c]
+    assert full[rate_cols].notna().all().all()
+    pd.testing.assert_frame_equal(canonical(full), canonical(stream[full.columns]), check_dtype=False,
+                                  check_categorical=False)
+
+
+def test_encoder_pools_rare_values_of_every_categorical_column():
+    df = pd.DataFrame({col: ['a'] * 30 + ['rare'] * 2 for col in delay_ml.FEATURES_CATEGORICAL})
+    for col in delay_ml.FEATURES_NUMERIC:
+        df[col] = 1.0
+    encoder = delay_ml.make_encoder().fit(df)
+    assert all(encoder.vocab_[col] == ['a'] for col in delay_ml.FEATURES_CATEGORICAL)
+    codes = encoder.transform(df)[:, len(delay_ml.FEATURES_NUMERIC):]
+    assert (codes[:30] == 0).all() and (codes[30:] == 1).all()
@@ -0,0 +1,24 @@
+import pandas as pd
+
+import delay_features
+import delay_incremental
+import delay_model
+import delay_store
+from conftest import write_arrivals
+
+
+def test_latency_check_samples_inside_the_stored_history(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    write_arrivals(delay_store.SOURCE_FILE, days=30, seed=3)
+    delay_incremental.update()
+
+    scored = []
+    score = delay_model.predict_delay_risk
+    monkeypatch.setattr(delay_model, 'predict_delay_risk',
+                        lambda flights, artifact: scored.append(flights) or score(flights, artifact))
+    capsys.readouterr()
+    delay_model.main()
+
+    first = pd.Timestamp("2024-03-30") - pd.Timedelta(days=delay_features.ROLLING_WINDOW_DAYS - 1)
+    assert f"Sampling flights from {first.date()} on" in capsys.readouterr().out
+    assert scored[0]['STA_dt'].min() >= first
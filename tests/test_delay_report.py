@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import delay_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_evaluate_is_plain_json_data():
+    y_true = np.array([0, 0, 1, 1, 1, 0])
+    report = delay_report.evaluate(y_true, np.array([0, 1, 1, 0, 1, 0]), np.array([.1, .6, .9, .4, .8, .2]))
+    assert report["confusion_matrix"]["matrix"] == [[2, 1], [1, 2]]
+    assert report["per_class"]["Delayed"]["recall"] == 2 / 3
+    assert set(report) >= {"pr_curve", "calibration", "timing_s"}
+
+
+def test_plots_render_without_pyplot():
+    # In a fresh interpreter: the Streamlit process must not pay for (or reconfigure) pyplot
+    code = ("import sys, numpy as np, delay_report\n"
+            "y = np.array([0, 1] * 20); p = np.linspace(0, 1, 40)\n"
+            "pngs = delay_report.render_all_png(delay_report.evaluate(y, (p > .5).astype(int), p))\n"
+            "assert all(png[:4] == b'\\x89PNG' for png in pngs.values()) and len(pngs) == 2\n"
+            "assert 'matplotlib.pyplot' not in sys.modules\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
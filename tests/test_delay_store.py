@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+
+import delay_store
+
+CSV = """STA;ATA;SDT;DLY_min;PAX;FLC;ORG;TYP;NAT;TER
+01.03.2024 10:00;01.03.2024 10:20;01.03.2024 08:00;20;150;LH;FRA;A320;P;1
+01.03.2024 11:00;NA;01.03.2024 09:30;NA;NA;EW;PMI;A319;P;2
+"""
+
+
+def write_csv(path, text=CSV):
+    with open(path, 'w') as f:
+        f.write(text)
+    return str(path)
+
+
+def test_load_arrivals_types_columns(tmp_path):
+    df = delay_store.load_arrivals(write_csv(tmp_path / "arrivals.csv"), cache_dir=str(tmp_path / "cache"))
+    assert list(df.columns[-3:]) == ['STA_dt', 'ATA_dt', 'SDT_dt']
+    assert df['STA_dt'].iloc[0] == pd.Timestamp(2024, 3, 1, 10)
+    assert pd.isna(df['DLY_min'].iloc[1])
+    assert isinstance(df['FLC'].dtype, pd.CategoricalDtype)
+
+
+def test_cache_is_reused_until_the_source_changes(tmp_path):
+    source = write_csv(tmp_path / "arrivals.csv")
+    cache_dir = str(tmp_path / "cache")
+    delay_store.load_arrivals(source, cache_dir=cache_dir)
+    data_path, meta_path = delay_store._store_paths(source, cache_dir)
+    assert delay_store._cache_is_valid(source, data_path, meta_path)
+
+    # Touching the file keeps the cache (same content), editing it invalidates it
+    os.utime(source, ns=(1, 1))
+    assert delay_store._cache_is_valid(source, data_path, meta_path)
+    write_csv(source, CSV.replace(";20;", ";5;"))
+    assert not delay_store._cache_is_valid(source, data_path, meta_path)
+    assert delay_store.load_arrivals(source, cache_dir=cache_dir)['DLY_min'].iloc[0] == 5
@@ -0,0 +1,36 @@
+import pytest
+
+from Object_detection import detection_cache
+from Object_detection.pipeline import VisionPipeline
+
+
+class Model:
+    def __init__(self, weights_path):
+        self.weights_path = weights_path
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    monkeypatch.setattr(detection_cache, 'CACHE_DIR', str(tmp_path / "cache"))
+    monkeypatch.setattr(detection_cache, 'HASH_INDEX_PATH', str(tmp_path / "cache" / "hashes.json"))
+    weights = tmp_path / "best.pt"
+    weights.write_bytes(b"weights")
+    return Model(str(weights))
+
+
+def test_each_decode_backend_gets_its_own_entry(synthetic_video, model):
+    opencv = detection_cache.cache_key(synthetic_video, model, decode_backend='opencv')
+    pyav = detection_cache.cache_key(synthetic_video, model, decode_backend='pyav')
+    assert opencv != pyav
+    auto = detection_cache.cache_key(synthetic_video, model)
+    assert auto == detection_cache.cache_key(synthetic_video, model,
+                                             decode_backend=detection_cache.resolve_backend('auto'))
+
+
+def test_pipeline_refuses_a_cache_of_another_decoder(synthetic_video, model, tmp_path):
+    cache = detection_cache.DetectionCache(synthetic_video, model, cache_dir=str(tmp_path / "cache"),
+                                           decode_backend='pyav')
+    with VisionPipeline(synthetic_video, infer=lambda frames: frames, live=False, decode_backend='opencv',
+                        cache=cache) as pipeline:
+        with pytest.raises(ValueError, match="pyav decoder"):
+            list(pipeline)
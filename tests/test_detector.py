@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from Object_detection import detector
+
+
+@pytest.fixture
+def runtimes(tmp_path, monkeypatch):
+    """Every runtime's model file exists; report rows are written by the test."""
+    paths = {name: str(tmp_path / name) for name in detector.RUNTIMES}
+    for path in paths.values():
+        open(path, 'w').close()
+    monkeypatch.setattr(detector, 'RUNTIMES', {name: {'path': path, 'requires': 'numpy'}
+                                               for name, path in paths.items()})
+    report_path = str(tmp_path / 'runtime_report.json')
+
+    def write_report(rows):
+        for row in rows:
+            row.setdefault('model_mtime_ns', os.stat(paths[row['runtime']]).st_mtime_ns)
+        with open(report_path, 'w') as f:
+            json.dump({"runtimes": rows}, f)
+        return report_path
+    return write_report, report_path, paths
+
+
+def row(runtime, map50, ms):
+    return {"runtime": runtime, "map50": map50, "ms_per_frame": ms}
+
+
+def test_auto_without_a_report_takes_an_fp32_runtime(runtimes):
+    _, report_path, _ = runtimes
+    assert detector.select_runtime('auto', report_path=report_path) == 'openvino'
+
+
+def test_int8_is_picked_only_within_the_map_tolerance(runtimes):
+    write_report, _, _ = runtimes
+    fast_int8_ok = write_report([row('pytorch', 0.90, 80), row('onnx', 0.90, 40), row('onnx_int8', 0.895, 20)])
+    assert detector.select_runtime('auto', report_path=fast_int8_ok, max_int8_drop=0.01) == 'onnx_int8'
+
+    fast_int8_bad = write_report([row('pytorch', 0.90, 80), row('onnx', 0.90, 40), row('onnx_int8', 0.85, 20)])
+    assert detector.select_runtime('auto', report_path=fast_int8_bad, max_int8_drop=0.01) == 'onnx'
+
+
+def test_int8_re_exported_after_the_report_is_not_trusted(runtimes):
+    write_report, _, paths = runtimes
+    report_path = write_report([row('pytorch', 0.90, 80), row('onnx_int8', 0.90, 20)])
+    os.utime(paths['onnx_int8'], ns=(1, 1))
+    assert detector.select_runtime('auto', report_path=report_path) == 'pytorch'
+
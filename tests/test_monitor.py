@@ -0,0 +1,109 @@
+import threading
+import time
+
+import numpy as np
+
+from Object_detection import detector, monitor
+from Object_detection.tracker import tracker_for
+
+NAMES = {0: 'bridge_connected', 1: 'luggage_vehicle'}
+
+
+def detections(*classes):
+    n = len(classes)
+    return detector.Detections(np.tile(np.float32([10, 10, 50, 50]), (n, 1)), np.int64(classes), np.ones(n, np.float32))
+
+
+def make_service():
+    service = monitor.MonitorService([{"stand": "A1", "source": "a1.mp4"}, {"stand": "B2", "source": "b2.mp4"}])
+    service.names = NAMES
+    for stream in service.streams:
+        stream.tracker = tracker_for(NAMES)
+    return service
+
+
+def submit(stream, index=0, pts=0.0):
+    stream.pending = {"index": index, "pts": pts, "frame": np.zeros((8, 8, 3), np.uint8), "since": 0.0,
+                      "generation": stream.generation}
+
+
+def run_worker_until(service, done, timeout=5.0):
+    thread = threading.Thread(target=service._worker_loop, args=(None,), daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    service.stop_event.set()
+    service.notify()
+    thread.join(timeout)
+    return thread
+
+
+def test_rate_counter_under_concurrent_readers():
+    counter = monitor.RateCounter(window_s=1.0)
+    errors = []
+
+    def read():
+        try:
+            for _ in range(2000):
+                counter.rate(time.perf_counter())
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(20000):
+        counter.add(time.perf_counter())
+    for reader in readers:
+        reader.join()
+    assert not errors
+    assert counter.rate(time.perf_counter() + 2.0) == 0.0
+
+
+def test_rate_counter_counts_only_the_window():
+    counter = monitor.RateCounter(window_s=2.0)
+    for now in (0.0, 0.5, 1.0, 1.5, 3.0):
+        counter.add(now)
+    assert counter.rate(3.0) == 3 / 2.0  # 1.0, 1.5, 3.0
+
+
+def test_worker_survives_a_failing_batch_and_frees_its_stands(monkeypatch):
+    service = make_service()
+    broken, healthy = service.streams
+
+    class BrokenLetterbox:
+        def prepare(self, frame):
+            raise ValueError("bad crop")
+
+    broken.letterbox = BrokenLetterbox()
+    monkeypatch.setattr(detector, 'predict', lambda model, frames: [detections(0) for _ in frames])
+    submit(broken)
+    submit(healthy)
+    thread = run_worker_until(service, lambda: broken.error is not None and not broken.in_flight)
+    assert broken.error == "bad crop" and not broken.in_flight
+    assert thread.is_alive() is False  # stopped by the test, not killed by the error
+
+    # The loop kept running: the next batch of the healthy stand is inferred
+    service.stop_event.clear()
+    broken.letterbox = None
+    submit(healthy, index=1, pts=0.1)
+    run_worker_until(service, lambda: healthy.last_result is not None)
+    assert healthy.last_result is not None and not healthy.in_flight
+
+
+def test_results_of_a_previous_pass_are_dropped():
+    service = make_service()
+    stream = service.streams[0]
+    submit(stream, index=99, pts=9.9)
+    packet, stream.pending, stream.in_flight = stream.pending, None, True
+    stream.generation += 1  # the clip restarted while the frame was in flight
+
+    stream.apply(packet, detections(0, 1))
+    assert not stream.in_flight and stream.last_result is None
+    assert stream.phases.last_pts is None and not stream.tracker.tracks
+
+    submit(stream, index=0, pts=0.0)
+    packet, stream.pending = stream.pending, None
+    stream.apply(packet, detections(0))
+    assert stream.phases.last_pts == 0.0 and stream.last_result is not None
@@ -0,0 +1,49 @@
+import pytest
+
+from Object_detection.phases import BRIDGE, CLEANING_VEHICLE, LUGGAGE_VEHICLE, Debouncer, TurnaroundPhases
+
+# (class, seconds it is visible) - luggage comes twice, with a one-frame false positive of the cleaning vehicle
+SCRIPT = [(BRIDGE, 2.0, 20.0), (CLEANING_VEHICLE, 6.0, 12.0), (CLEANING_VEHICLE, 1.0, 1.04),
+          (LUGGAGE_VEHICLE, 3.0, 8.0), (LUGGAGE_VEHICLE, 14.0, 18.0)]
+
+
+def run(step, duration=25.0):
+    phases = TurnaroundPhases()
+    for i in range(int(round(duration / step)) + 1):
+        pts = i * step
+        phases.update([label for label, start, end in SCRIPT if start <= pts + 1e-9 < end], pts)
+    return phases
+
+
+@pytest.mark.parametrize("step", [1 / 10, 1 / 30, 0.5])
+def test_timeline_is_backdated_and_independent_of_frame_rate(step):
+    timeline = run(step).timeline()
+    expected = {'DEBOARDING': (2.0, 6.0), 'CLEANING': (6.0, 12.0), 'BOARDING': (12.0, 20.0), 'LUGGAGE': (3.0, 18.0)}
+    for phase, (start, end) in expected.items():
+        assert timeline[phase]["status"] == 'done'
+        assert timeline[phase]["start"] == pytest.approx(start, abs=1e-6)
+        assert timeline[phase]["end"] == pytest.approx(end, abs=1e-6)
+    assert timeline['LUGGAGE']["intervals"] == 2
+    assert timeline['LUGGAGE']["duration"] == pytest.approx(9.0, abs=1e-6)
+
+
+def test_events_are_reported_after_the_debounce_window():
+    phases = TurnaroundPhases()
+    reported = {}
+    for i in range(101):
+        pts = i / 10
+        if phases.update([BRIDGE] if pts >= 2.0 else [], pts):
+            reported[phases.events[-1][1]] = pts
+    assert phases.events == [(2.0, 'DEBOARDING', 'start')]
+    assert reported['DEBOARDING'] == pytest.approx(2.8)  # 0.6 * 1.5 s of sightings needed first
+
+
+def test_debouncer_ignores_short_dropouts_and_flicker():
+    debouncer = Debouncer(window=1.5)
+    flips = []
+    for i in range(100):
+        pts = i / 10
+        seen = (2.0 <= pts < 8.0 and i % 10 != 0) or pts == 9.0  # one missed frame per second, one stray hit
+        if debouncer.update(seen, pts):
+            flips.append((debouncer.present, debouncer.changed_at))
+    assert flips == [(True, pytest.approx(2.1)), (False, pytest.approx(8.0))]
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from Object_detection.pipeline import FrameQueue, VisionPipeline
+
+
+def mean_infer(calls):
+    def infer(frames):
+        # Like detector.predict and the ROI predictor: a list in, one result per frame out
+        assert isinstance(frames, list)
+        calls.append(len(frames))
+        return [float(frame.mean()) for frame in frames]
+    return infer
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_offline_run_infers_every_frame_in_lists(synthetic_video, batch_size):
+    calls = []
+    with VisionPipeline(synthetic_video, infer=mean_infer(calls), live=False, batch_size=batch_size) as pipeline:
+        packets = [(p["index"], p["result"]) for p in pipeline]
+
+    assert [index for index, _ in packets] == list(range(30))
+    assert sum(calls) == 30 and max(calls) <= batch_size
+    # Results stay with their frames (gray value 8 * i, give or take the codec)
+    assert all(abs(result - index * 8) < 4 for index, result in packets)
+
+
+def test_stage_errors_reach_the_consumer(synthetic_video):
+    def broken(frames):
+        raise RuntimeError("model failed")
+
+    with VisionPipeline(synthetic_video, infer=broken, live=False) as pipeline:
+        with pytest.raises(RuntimeError, match="model failed"):
+            list(pipeline)
+
+
+def test_live_queue_drops_the_oldest_item():
+    queue = FrameQueue(maxsize=2, drop_oldest=True)
+    for i in range(4):
+        queue.put(i)
+    assert [queue.get(), queue.get()] == [2, 3] and queue.dropped == 2
+
+
+@pytest.mark.parametrize("realtime", [False, True])
+def test_live_frames_are_not_overwritten_while_held(tmp_path, realtime):
+    from conftest import write_video
+    video = write_video(tmp_path / "fast.mp4", n_frames=30, fps=100.0)
+
+    def slow_infer(frames):
+        time.sleep(0.03)
+        return [float(frame.mean()) for frame in frames]
+
+    checked = 0
+    with VisionPipeline(video, infer=slow_infer, live=True, realtime=realtime) as pipeline:
+        for packet in pipeline:
+            # The decoder laps its ring meanwhile; the held frame must still be this packet's frame
+            time.sleep(0.05)
+            assert abs(float(packet["frame"].mean()) - packet["result"]) < 1
+            assert abs(packet["result"] - packet["index"] * 8) < 4
+            checked += 1
+        stats = pipeline.stats()
+    assert checked and stats["dropped"]["decoded"] + stats["dropped"]["inferred"] + stats["dropped"]["output"]
+    assert stats["end_to_end"]["mean_ms"] >= stats["decode"]["mean_ms"]
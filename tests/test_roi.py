@@ -0,0 +1,30 @@
+import numpy as np
+
+from Object_detection import detector, roi
+
+
+def crop_result(letterbox, roi_index, frame_boxes, classes, conf):
+    """Detections of one ROI crop, given in full-frame pixels (the inverse of to_frame)."""
+    (x1, y1, _, _), scale, (left, top), _ = letterbox.geometry[roi_index]
+    xyxy = (np.float32(frame_boxes).reshape(-1, 4) - [x1, y1, x1, y1]) * scale + [left, top, left, top]
+    return detector.Detections(xyxy.astype(np.float32), np.int64(classes), np.float32(conf))
+
+
+def test_merge_reports_an_object_in_overlapping_rois_once():
+    # Two ROIs overlapping in the middle third of a 300 x 100 frame
+    letterbox = roi.RoiLetterbox([(0.0, 0.0, 2 / 3, 1.0), (1 / 3, 0.0, 1.0, 1.0)], size=64)
+    letterbox.prepare(np.zeros((100, 300, 3), np.uint8))
+    shared = [120, 20, 180, 80]
+    results = [crop_result(letterbox, 0, [shared, [10, 10, 40, 40]], [1, 0], [0.6, 0.9]),
+               crop_result(letterbox, 1, [shared, shared], [1, 0], [0.8, 0.7])]
+
+    merged = letterbox.merge(results)
+    # The shared class-1 box once (the more confident copy), a class-0 box at the same place stays
+    assert sorted((c, round(p, 2)) for c, p in zip(merged.cls.tolist(), merged.conf.tolist())) == \
+        [(0, 0.7), (0, 0.9), (1, 0.8)]
+    np.testing.assert_allclose(merged.xyxy[merged.cls == 1][0], shared, atol=1.0)
+
+
+def test_class_nms_keeps_separate_objects():
+    xyxy = np.float32([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]])
+    assert roi.class_nms(xyxy, np.int64([0, 0, 0]), np.float32([0.5, 0.9, 0.4])).tolist() == [1, 2]
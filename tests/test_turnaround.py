@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from Object_detection import turnaround
+
+
+@pytest.fixture
+def labelled_dataset(tmp_path):
+    out_dir = tmp_path / "dataset"
+    (out_dir / "labels" / "train").mkdir(parents=True)
+    (out_dir / "labels" / "train" / "frame_0000.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    return out_dir
+
+
+def test_refuses_to_wipe_a_labelled_dataset(synthetic_video, labelled_dataset):
+    with pytest.raises(FileExistsError, match="--force"):
+        turnaround.main([synthetic_video], str(labelled_dataset), interval_s=1, workers=1)
+    assert (labelled_dataset / "labels" / "train" / "frame_0000.txt").exists()
+
+
+def test_force_recreates_the_dataset(synthetic_video, labelled_dataset):
+    totals = turnaround.main([synthetic_video], str(labelled_dataset), interval_s=1, workers=1, dedup_distance=-1,
+                             force=True)
+    assert totals["train"] + totals["val"] > 0
+    assert not (labelled_dataset / "labels" / "train" / "frame_0000.txt").exists()
+    assert os.path.exists(labelled_dataset / "data.yaml")
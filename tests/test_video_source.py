@@ -0,0 +1,68 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from Object_detection.video_source import OpenCVSource, PyAVSource, keyframe_indices
+
+av = pytest.importorskip("av")
+
+
+def write_offset_video(path, n_frames=16, fps=10, start_frames=25, gop=5):
+    """Clip whose first frame has pts start_frames / fps (a non-zero stream start_time); frame i has gray 16 * i."""
+    with av.open(str(path), 'w') as container:
+        # Fixed GOP (no scene-change keyframes), so seeking has to decode forward from a keyframe
+        stream = container.add_stream('mpeg4', rate=fps, options={'g': str(gop), 'sc_threshold': '1000000000',
+                                                                   'qscale': '1'})
+        stream.width, stream.height, stream.pix_fmt = 64, 48, 'yuv420p'
+        for i in range(n_frames):
+            frame = av.VideoFrame.from_ndarray(np.full((48, 64, 3), i * 16, np.uint8), format='rgb24')
+            frame.pts, frame.time_base = start_frames + i, Fraction(1, fps)
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return str(path)
+
+
+@pytest.fixture
+def offset_video(tmp_path):
+    path = write_offset_video(tmp_path / "offset.mp4")
+    with av.open(path) as container:
+        assert container.streams.video[0].start_time  # the case under test
+    return path
+
+
+def read_after_seek(source, target):
+    source.seek(target)
+    success, index, pts, frame = source.read()
+    assert success
+    return index, pts, float(frame.mean())
+
+
+@pytest.mark.parametrize("target", [0, 7, 12, 15])
+def test_pyav_seek_lands_on_the_target_frame_despite_start_time(offset_video, target):
+    source = PyAVSource(offset_video)
+    try:
+        index, pts, gray = read_after_seek(source, target)
+    finally:
+        source.close()
+    assert index == target
+    assert pts == pytest.approx(target / 10)
+    assert gray == pytest.approx(target * 16, abs=6)
+
+
+def test_pyav_and_opencv_agree_on_indices_and_times(offset_video):
+    pyav, opencv = PyAVSource(offset_video), OpenCVSource(offset_video)
+    try:
+        for _ in range(12):
+            a, b = pyav.read(), opencv.read()
+            assert a[1] == b[1] and a[2] == pytest.approx(b[2], abs=1e-3)
+            assert np.abs(a[3].astype(int) - b[3].astype(int)).mean() < 6
+    finally:
+        pyav.close()
+        opencv.close()
+
+
+def test_keyframe_indices_start_at_frame_zero(offset_video):
+    assert keyframe_indices(offset_video) == [0, 5, 10, 15]